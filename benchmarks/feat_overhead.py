@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+    feat_overhead
+    ~~~~~~~~~~~~~
+
+    Measures the per-get overhead of Feat processing, comparing looping
+    over the stored processors (as done before processors were compiled)
+    with the fused pipeline used by Feat.post_get.
+
+    Run as::
+
+        python benchmarks/feat_overhead.py
+
+    :copyright: 2015 by Lantz Authors, see AUTHORS for more details.
+    :license: BSD, see LICENSE for more details.
+"""
+
+import timeit
+
+from lantz import Driver, Feat
+from lantz.feat import MISSING, _dget
+
+
+class Bench(Driver):
+
+    @Feat(units='ms', limits=(0, 100))
+    def plain(self):
+        return 42
+
+    @Feat(values={'low': 1, 'high': 2}, procs=((int, str), ))
+    def mapped(self):
+        return '2'
+
+
+def looped_post_get(feat, value, instance, key=MISSING):
+    for processor in reversed(_dget(feat.get_processors, instance, key)):
+        value = processor(value)
+    return value
+
+
+def main(number=100000):
+    inst = Bench()
+
+    print('{:<10} {:>14} {:>14} {:>14}'.format('feat', 'looped [us]', 'compiled [us]', 'full get [us]'))
+    for name in ('plain', 'mapped'):
+        feat = Bench._lantz_features[name]
+        raw = feat.fget(inst)
+
+        looped = timeit.timeit(lambda: looped_post_get(feat, raw, inst), number=number)
+        compiled = timeit.timeit(lambda: feat.post_get(raw, inst), number=number)
+        full = timeit.timeit(lambda: getattr(inst, name), number=number // 10)
+
+        print('{:<10} {:>14.3f} {:>14.3f} {:>14.3f}'.format(name,
+                                                          looped / number * 1e6,
+                                                          compiled / number * 1e6,
+                                                          full / (number // 10) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
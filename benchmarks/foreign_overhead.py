@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+    foreign_overhead
+    ~~~~~~~~~~~~~~~~
+
+    Measures the per-call overhead of LibraryDriver, comparing bare ctypes
+    calls, the generic wrapper and the compiled call path (SIGNATURES)
+    on functions of lantz/testsuite/simplelib.c.
+
+    The library is built with the C compiler found in the path, unless the
+    path of an already built library is given::
+
+        python benchmarks/foreign_overhead.py [simplelib.so]
+
+    :copyright: 2015 by Lantz Authors, see AUTHORS for more details.
+    :license: BSD, see LICENSE for more details.
+"""
+
+import ctypes
+import os
+import subprocess
+import sys
+import tempfile
+import timeit
+
+from lantz.foreign import LibraryDriver, RetValue, Signature
+
+
+SOURCE = os.path.join(os.path.dirname(__file__), '..', 'lantz', 'testsuite', 'simplelib.c')
+
+
+def build(folder):
+    path = os.path.join(folder, 'simplelib.so')
+    subprocess.check_call([os.environ.get('CC', 'cc'), '-O2', '-shared', '-fPIC', '-o', path, SOURCE])
+    return path
+
+
+class Wrapped(LibraryDriver):
+    pass
+
+
+class Compiled(LibraryDriver):
+
+    SIGNATURES = {'sumi13': Signature([ctypes.c_int]),
+                  'double_param': Signature([RetValue('d')])}
+
+
+def main(path, number=200000):
+    raw = ctypes.CDLL(path)
+    raw.sumi13.argtypes = [ctypes.c_int]
+    raw.double_param.argtypes = [ctypes.POINTER(ctypes.c_double)]
+    value = ctypes.c_double()
+
+    wrapped = Wrapped(library_name=path).lib
+    compiled = Compiled(library_name=path).lib
+
+    cases = (('sumi13', lambda: raw.sumi13(5),
+              lambda: wrapped.sumi13(5),
+              lambda: compiled.sumi13(5)),
+             ('double_param', lambda: (raw.double_param(ctypes.byref(value)), value.value),
+              lambda: wrapped.double_param(RetValue('d')),
+              lambda: compiled.double_param()))
+
+    print('{:<14} {:>12} {:>12} {:>14}'.format('function', 'ctypes [us]', 'wrapped [us]', 'compiled [us]'))
+    for name, *calls in cases:
+        times = [timeit.timeit(call, number=number) / number * 1e6 for call in calls]
+        print('{:<14} {:>12.3f} {:>12.3f} {:>14.3f}'.format(name, *times))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main(sys.argv[1])
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            main(build(tmp))
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+    lock_contention
+    ~~~~~~~~~~~~~~~
+
+    Measures Feat throughput when N threads read the same driver while
+    a long action holds the driver lock. Cached (read_once) and
+    concurrent feats do not acquire the lock, uncached ones do.
+
+    Run as::
+
+        python benchmarks/lock_contention.py [threads]
+
+    :copyright: 2015 by Lantz Authors, see AUTHORS for more details.
+    :license: BSD, see LICENSE for more details.
+"""
+
+import sys
+import time
+import threading
+
+from lantz import Driver, Feat, Action
+
+
+class Bench(Driver):
+
+    @Feat(read_once=True)
+    def cached(self):
+        return 42
+
+    @Feat()
+    def uncached(self):
+        time.sleep(1e-4)
+        return 42
+
+    @Feat(concurrent=True)
+    def concurrent(self):
+        time.sleep(1e-4)
+        return 42
+
+    @Action()
+    def acquire(self, duration):
+        time.sleep(duration)
+
+
+def hammer(inst, name, nthreads, duration):
+    """Read `name` from `nthreads` threads for `duration` seconds while
+    another thread runs a long action. Return the number of reads per second.
+    """
+    counts = [0] * nthreads
+    stop = threading.Event()
+
+    def _run(ndx):
+        while not stop.is_set():
+            getattr(inst, name)
+            counts[ndx] += 1
+
+    action = threading.Thread(target=inst.acquire, args=(duration / 2, ))
+    threads = [threading.Thread(target=_run, args=(ndx, )) for ndx in range(nthreads)]
+
+    action.start()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    action.join()
+
+    return sum(counts) / duration
+
+
+def main(nthreads=8, duration=1.):
+    inst = Bench()
+    inst.cached
+
+    print('{} threads, action holding the lock for {} s'.format(nthreads, duration / 2))
+    print('{:<12} {:>14}'.format('feat', 'reads/s'))
+    for name in ('cached', 'uncached', 'concurrent'):
+        print('{:<12} {:>14.0f}'.format(name, hammer(inst, name, nthreads, duration)))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
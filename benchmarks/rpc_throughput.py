@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+    rpc_throughput
+    ~~~~~~~~~~~~~~
+
+    Measures the throughput of large ONC-RPC replies (as the ones obtained
+    when reading scope curves via VXI-11) against a loopback server,
+    comparing the record reassembly of lantz.drivers.legacy.rpc with the
+    previous implementation based on bytes concatenation.
+
+    Run as::
+
+        python benchmarks/rpc_throughput.py [megabytes]
+
+    :copyright: 2015 by Lantz Authors, see AUTHORS for more details.
+    :license: BSD, see LICENSE for more details.
+"""
+
+import sys
+import time
+import struct
+import threading
+
+from lantz.drivers.legacy import rpc
+
+PROG, VERS = 0x20000000, 1
+
+
+class BenchServer(rpc.TCPServer):
+    """Procedure 1 replies with the requested number of bytes
+    split in fragments of 64 kB.
+    """
+
+    FRAGMENT_SIZE = 64 * 1024
+
+    payload = bytes(64 * 1024 * 1024)
+
+    def handle_1(self):
+        size = self.unpacker.unpack_uint()
+        self.turn_around()
+        self.packer.pack_opaque(self.payload[:size])
+
+
+class BenchClient(rpc.RawTCPClient):
+
+    def __init__(self, host, port):
+        self.packer = rpc.Packer()
+        self.unpacker = rpc.Unpacker('')
+        super().__init__(host, PROG, VERS, port)
+
+    def read(self, size):
+        return self.make_call(1, size, self.packer.pack_uint, self.unpacker.unpack_opaque)
+
+
+def _recvfrag_concat(sock):
+    header = sock.recv(4)
+    if len(header) < 4:
+        raise EOFError
+    x = struct.unpack(">I", header[0:4])[0]
+    last = ((x & 0x80000000) != 0)
+    n = int(x & 0x7fffffff)
+    frag = b''
+    while n > 0:
+        buf = sock.recv(n)
+        if not buf:
+            raise EOFError
+        n = n - len(buf)
+        frag = frag + buf
+    return last, frag
+
+
+def _recvrecord_concat(sock):
+    record = b''
+    last = 0
+    while not last:
+        last, frag = _recvfrag_concat(sock)
+        record = record + frag
+    return record
+
+
+def throughput(client, size, repeat=5):
+    """Return the throughput in MB/s reading `size` bytes.
+    """
+    tic = time.perf_counter()
+    for _ in range(repeat):
+        assert len(client.read(size)) == size
+    return size * repeat / (time.perf_counter() - tic) / 1e6
+
+
+def main(megabytes=16):
+    server = BenchServer('127.0.0.1', PROG, VERS, 0)
+    port = server.sock.getsockname()[1]
+    server.sock.listen(1)
+    threading.Thread(target=server.loop, daemon=True).start()
+
+    client = BenchClient('127.0.0.1', port)
+
+    print('{:>10} {:>16} {:>16}'.format('size (MB)', 'concat (MB/s)', 'recv_into (MB/s)'))
+    size = 1024 * 1024
+    while size <= megabytes * 1024 * 1024:
+        current = throughput(client, size)
+        rpc.recvrecord, original = _recvrecord_concat, rpc.recvrecord
+        try:
+            previous = throughput(client, size, 2 if size > 4 * 1024 * 1024 else 5)
+        finally:
+            rpc.recvrecord = original
+        print('{:>10} {:>16.1f} {:>16.1f}'.format(size // (1024 * 1024), previous, current))
+        size *= 4
+
+    client.close()
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
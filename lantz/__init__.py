@@ -22,7 +22,8 @@ ureg = UnitRegistry()
 Q_ = ureg.Quantity
 
 from .log import LOGGER
-from .driver import Driver, Feat, DictFeat, Action, initialize_many, finalize_many
+from .driver import (Driver, Feat, DictFeat, Action, initialize_many, finalize_many,
+                     ainitialize_many, afinalize_many)
 
 __all__ = ['Driver', 'Action', 'Feat', 'DictFeat', 'Q_']
 
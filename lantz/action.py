@@ -14,13 +14,14 @@ import time
 import copy
 import inspect
 import functools
+from logging import DEBUG, INFO
 
 from weakref import WeakKeyDictionary
 
 from .processors import (Processor, FromQuantityProcessor,
                          MapProcessor, RangeProcessor)
 
-from .feat import MISSING
+from .feat import MISSING, NO_LOCK
 
 
 def _dget(adict, instance=MISSING):
@@ -63,10 +64,14 @@ class Action(object):
                 changed but only tested to belong to the container.
     :param units: `Quantity` or string that can be interpreted as units.
     :param procs: Other callables to be applied to input arguments.
+    :param concurrent: the method can be called while other operations
+                       on the same driver are running, so the driver lock
+                       is not acquired.
 
     """
 
-    def __init__(self, func=None, *, values=None, units=None, limits=None, procs=None):
+    def __init__(self, func=None, *, values=None, units=None, limits=None, procs=None,
+                 concurrent=False):
 
         #: instance: key: value
         self.modifiers = WeakKeyDictionary()
@@ -78,6 +83,7 @@ class Action(object):
                                    'processors': procs}
         self.func = func
         self.args = ()
+        self.concurrent = concurrent
 
     def __call__(self, func):
         self.func = func
@@ -101,11 +107,13 @@ class Action(object):
 
         # This part calls to the underlying function wrapping
         # and timing, logging and error handling
-        with instance._lock:
-            if args or kwargs:
-                instance.log_info('Calling {} with ({}, {}))', name, args, kwargs)
-            else:
-                instance.log_info('Calling {}', name)
+        with NO_LOCK if self.concurrent else instance._lock:
+            info = instance._log_hot(INFO)
+            if info:
+                if args or kwargs:
+                    instance.log_info('Calling {} with ({}, {}))', name, args, kwargs)
+                else:
+                    instance.log_info('Calling {}', name)
 
             try:
                 values = inspect.getcallargs(self.func, *(instance, ) + args, **kwargs)
@@ -119,14 +127,15 @@ class Action(object):
                 instance.log_error('While pre-processing ({}, {}) for {}: {}', args, kwargs, name, e)
                 raise e
 
-            if args or kwargs:
+            if (args or kwargs) and instance._log_hot(DEBUG):
                 instance.log_debug('(raw) Calling {} with {}', name, t_values)
 
             try:
                 tic = time.time()
                 out = self.func(instance, *t_values)
                 instance.timing.add(name, time.time() - tic)
-                instance.log_info('{} returned {}', name, out)
+                if info:
+                    instance.log_info('{} returned {}', name, out)
 
                 return out
             except Exception as e:
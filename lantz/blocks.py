@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+    lantz.blocks
+    ~~~~~~~~~~~~
+
+    Implements reading of IEEE 488.2 binary blocks into NumPy arrays.
+
+    A definite length block is `#<n><length><data>` where `n` is the number of
+    digits of `length`. An indefinite length block is `#0<data>` and it
+    ends with the message.
+
+    :copyright: 2015 by Lantz Authors, see AUTHORS for more details.
+    :license: BSD, see LICENSE for more details.
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def read_exactly(read, size):
+    """Read exactly size bytes calling read(size) as many times as necessary.
+
+    The chunks are copied into a preallocated buffer, unless the
+    first one is already complete.
+    """
+    chunk = read(size)
+    if len(chunk) == size:
+        return chunk
+
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    position = 0
+    while True:
+        if not chunk:
+            raise EOFError('Expected {} bytes, got {}'.format(size, position))
+        view[position:position + len(chunk)] = chunk
+        position += len(chunk)
+        if position == size:
+            return buffer
+        chunk = read(size - position)
+
+
+def read_block_header(read):
+    """Read the header of a binary block.
+
+    Bytes before the `#` (e.g. the echo of the query) are discarded.
+
+    :param read: callable(size) returning at most size bytes.
+    :return: the number of bytes in the block, or None for indefinite length blocks.
+    """
+    while True:
+        char = read_exactly(read, 1)
+        if char == b'#':
+            break
+
+    digits = read_exactly(read, 1)
+    if not digits.isdigit():
+        raise ValueError('Invalid binary block header #{!r}'.format(digits))
+    digits = int(digits)
+    if not digits:
+        return None
+    return int(read_exactly(read, digits))
+
+
+def read_block(read, dtype='u1', read_rest=None):
+    """Read a binary block and return a NumPy array viewing the received data.
+
+        >>> from io import BytesIO
+        >>> read_block(BytesIO(b'#16\\x00\\x01\\x00\\x02\\x01\\x00').read, '>u2')
+        array([  1,   2, 256], dtype='>u2')
+
+    :param read: callable(size) returning at most size bytes (at least one,
+                 unless the message has ended).
+    :param dtype: data type of the elements, including the byte order
+                  (e.g. '>u2' for big endian unsigned 16 bit integers).
+    :param read_rest: callable() returning the remaining bytes of the message
+                      without the termination. It is used to read indefinite
+                      length blocks and to discard the termination after
+                      definite length blocks, so it must return without
+                      reading if the last read ended the message.
+    :rtype: numpy.ndarray
+    """
+    length = read_block_header(read)
+    if length is None:
+        if read_rest is None:
+            raise ValueError('Indefinite length blocks require read_rest')
+        data = read_rest()
+    else:
+        data = read_exactly(read, length)
+        if read_rest is not None:
+            read_rest()
+
+    return decode_block(data, dtype)
+
+
+def read_array(read, count, dtype='u1'):
+    """Read exactly count elements of binary data without header
+    and return them as a NumPy array.
+
+    :param read: callable(size) returning at most size bytes.
+    :param count: number of elements.
+    :param dtype: data type of the elements, including the byte order.
+    :rtype: numpy.ndarray
+    """
+    if np is None:
+        raise ImportError('NumPy is required to decode binary data')
+    dtype = np.dtype(dtype)
+    return decode_block(read_exactly(read, count * dtype.itemsize), dtype)
+
+
+def decode_block(data, dtype='u1'):
+    """Return a NumPy array viewing the bytes of a block without its header.
+
+    :param data: bytes-like object.
+    :param dtype: data type of the elements, including the byte order.
+    :rtype: numpy.ndarray
+    """
+    if np is None:
+        raise ImportError('NumPy is required to decode binary blocks')
+
+    dtype = np.dtype(dtype)
+    extra = len(data) % dtype.itemsize
+    if extra:
+        data = memoryview(data)[:len(data) - extra]
+    return np.frombuffer(data, dtype)
+
+
+def parse_block(message, dtype='u1'):
+    """Return a NumPy array viewing the data of a block contained in a message.
+
+        >>> parse_block(b'#14\\x00\\x01\\x00\\x02\\n', '>u2')
+        array([1, 2], dtype='>u2')
+
+    :param message: bytes-like object.
+    :param dtype: data type of the elements, including the byte order.
+    :rtype: numpy.ndarray
+    """
+    message = memoryview(message).cast('B')
+    start = bytes(message[:64]).index(b'#')
+    digits = int(bytes(message[start + 1:start + 2]))
+    if not digits:
+        data = message[start + 2:]
+        if bytes(data[-1:]) == b'\n':
+            data = data[:-1]
+    else:
+        length = int(bytes(message[start + 2:start + 2 + digits]))
+        data = message[start + 2 + digits:start + 2 + digits + length]
+        if len(data) < length:
+            raise EOFError('Expected {} bytes, got {}'.format(length, len(data)))
+    return decode_block(data, dtype)
+
+
+def scale(data, multiplier=1., offset=0., zero=0.):
+    """Convert digitizer levels to physical values using a waveform preamble::
+
+        (data - offset) * multiplier + zero
+
+    (e.g. YMU, YOFF and YZE in Tektronix oscilloscopes).
+
+    :rtype: numpy.ndarray
+    """
+    out = np.subtract(data, offset, dtype=float)
+    out *= multiplier
+    out += zero
+    return out
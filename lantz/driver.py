@@ -9,18 +9,23 @@
     :license: BSD, see LICENSE for more details.
 """
 import copy
+import time
 import atexit
+import asyncio
 import logging
 import threading
 from functools import wraps
 from concurrent import futures
-from collections import defaultdict
+from collections import defaultdict, deque, OrderedDict
 
 from .utils.qt import MetaQObject, SuperQObject, QtCore
 from .feat import Feat, DictFeat, MISSING, FeatProxy
 from .action import Action, ActionProxy
 from .stats import RunningStats
+from .executors import SerialExecutor, awaitable
+from .poller import Backoff, Wait, get_poller
 from .log import get_logger
+from .errors import LantzTimeoutError
 
 logger = get_logger('lantz.driver', False)
 
@@ -215,6 +220,44 @@ class Driver(SuperQObject, metaclass=_DriverType):
     _lantz_features = {}
     _lantz_actions = {}
 
+    #: Number of workers of a dedicated executor for asynchronous methods.
+    #: If None, calls are executed one at a time and in submission order
+    #: using threads from a process wide pool shared among drivers.
+    #: :type: int | None
+    EXECUTOR_WORKERS = None
+
+    #: Number of values kept for each timing category to calculate
+    #: percentiles (e.g. `timing.percentiles('get_eggs')`). With None only
+    #: the running statistics are kept and percentiles raise ValueError.
+    #: :type: int | None
+    TIMING_WINDOW = 32
+
+    #: If True, getting and setting feats and calling actions does not emit
+    #: DEBUG and INFO messages, even if the logger is enabled for them.
+    #: Errors are logged as usual. Can be changed per instance.
+    #: :type: bool
+    quiet = False
+
+    #: Initial interval, maximum interval (in seconds) and growth factor
+    #: of the backoff used by `poll_until` and `wait_until`.
+    #: :type: (float, float, float)
+    POLL_BACKOFF = (0.001, 0.5, 2.)
+
+    #: If not None, the traffic with the instrument is delegated to it
+    #: (e.g. lantz.trace.TraceRecorder or TraceReplayer).
+    #: Can be changed per instance.
+    trace = None
+
+    #: If not None, called by Feat.get with the feat and the key before reading
+    #: the instrument. When it returns a future, the getter is not called and
+    #: the future is returned instead of the value (see MessageBasedDriver.pipeline).
+    _defer_get = None
+
+    #: If not None, called by Feat.set with the feat, the value and the key
+    #: after writing it. When it returns True, the value is not cached
+    #: (see MessageBasedDriver.pipeline).
+    _defer_cache = None
+
     __name = ''
 
     def __new__(cls, *args, **kwargs):
@@ -222,9 +265,13 @@ class Driver(SuperQObject, metaclass=_DriverType):
         name = kwargs.pop('name', None)
 
         inst._executor = None
+        # Serializes access to the instrument. Cache hits and concurrent
+        # feats and actions do not acquire it.
         inst._lock = threading.RLock()
         inst.__unfinished_tasks = 0
-        inst.timing = RunningStats()
+        inst.__queued_tasks = 0
+        inst.__tasks_lock = threading.Lock()
+        inst.timing = RunningStats(window=cls.TIMING_WINDOW)
 
         if hasattr(inst, 'name') and inst.name:
             pass
@@ -246,6 +293,7 @@ class Driver(SuperQObject, metaclass=_DriverType):
                 if attr_value.default is MISSING:
                     feat.get_processors[MISSING][MISSING] = (_raise_must_change(attr_value.item, feat_name, 'get'), )
                     feat.set_processors[MISSING][MISSING] = (_raise_must_change(attr_value.item, feat_name, 'set'), )
+                    feat.compile_processors()
                 else:
                     feat.modifiers[MISSING][MISSING][attr_name] = attr_value.default
                     feat.rebuild(build_doc=False, store=True)
@@ -264,24 +312,56 @@ class Driver(SuperQObject, metaclass=_DriverType):
     def __submit_by_name(self, fname, *args, **kwargs):
         return self._submit(getattr(self, fname), *args, **kwargs)
 
+    def set_executor(self, executor):
+        """Set the executor used to run asynchronous methods.
+
+        :param executor: any object with the concurrent.futures.Executor interface.
+                         None to create the default one on next submission.
+        """
+        if executor is None:
+            self._submit = self._first_submit
+        else:
+            self._submit = self._notfirst_submit
+        self._executor = executor
+
     def _first_submit(self, fn, *args, **kwargs):
-        self._executor = futures.ThreadPoolExecutor(max_workers=1)
-        self._submit = self._notfirst_submit
+        if self.EXECUTOR_WORKERS:
+            executor = futures.ThreadPoolExecutor(max_workers=self.EXECUTOR_WORKERS)
+        else:
+            executor = SerialExecutor()
+        self.set_executor(executor)
         return self._notfirst_submit(fn, *args, **kwargs)
 
     def _notfirst_submit(self, fn, *args, **kwargs):
-        self.__unfinished_tasks += 1
-        fut = self._executor.submit(fn, *args, **kwargs)
+        with self.__tasks_lock:
+            self.__unfinished_tasks += 1
+            self.__queued_tasks += 1
+        fut = awaitable(self._executor.submit(self._run_task, time.time(), fn, *args, **kwargs))
         fut.add_done_callback(self._decrease_unfinished_tasks)
         return fut
 
     _submit = _first_submit
 
-    def _decrease_unfinished_tasks(self, *args):
-        self.__unfinished_tasks -= 1
+    def _run_task(self, submitted, fn, *args, **kwargs):
+        with self.__tasks_lock:
+            self.__queued_tasks -= 1
+        self.timing.add('async_wait', time.time() - submitted)
+        return fn(*args, **kwargs)
+
+    def _decrease_unfinished_tasks(self, fut):
+        with self.__tasks_lock:
+            # Futures are cancelled only before being started.
+            if fut.cancelled():
+                self.__queued_tasks -= 1
+            self.__unfinished_tasks -= 1
 
+    #: Number of submitted tasks that have not finished.
     unfinished_tasks = property(lambda self: self.__unfinished_tasks)
 
+    #: Number of submitted tasks waiting to be started.
+    #: The time spent waiting is recorded in timing under 'async_wait'.
+    queued_tasks = property(lambda self: self.__queued_tasks)
+
     def log(self, level, msg, *args, **kwargs):
         """Log with the integer severity 'level'
         on the logger corresponding to this instrument.
@@ -289,12 +369,21 @@ class Driver(SuperQObject, metaclass=_DriverType):
         :param level: severity level for this event.
         :param msg: message to be logged (can contain PEP3101 formatting codes)
         """
+        if not logger.isEnabledFor(level):
+            return
         if kwargs:
             kwargs.update(self.log_extra)
             logger.log(level, msg, *args, extra=kwargs)
         else:
             logger.log(level, msg, *args, extra=self.log_extra)
 
+    def _log_hot(self, level):
+        """Return True if feats and actions should log messages of
+        the given severity. Used to avoid building the messages arguments
+        in tight loops.
+        """
+        return not self.quiet and logger.isEnabledFor(level)
+
     def log_info(self, msg, *args, **kwargs):
         """Log with the severity 'INFO'
         on the logger corresponding to this instrument.
@@ -406,6 +495,9 @@ class Driver(SuperQObject, metaclass=_DriverType):
     def refresh(self, keys=None):
         """Refresh cache by reading values from the instrument.
 
+        Feats with a cache policy other than 'never' are only read
+        if the cached value is missing or has expired.
+
         :param keys: a string or list of strings with the properties to refresh.
                      Default None, meaning all properties.
                      If keys is a string, returns the value.
@@ -415,14 +507,32 @@ class Driver(SuperQObject, metaclass=_DriverType):
         """
         if keys:
             if isinstance(keys, (list, tuple)):
-                return tuple(getattr(self, key) for key in keys)
+                values = self._refresh_many(keys)
+                return tuple(values[key] if key in values else getattr(self, key)
+                             for key in keys)
             elif isinstance(keys, dict):
-                return {key: getattr(self, key) for key in keys.keys()}
+                values = self._refresh_many(keys.keys())
+                return {key: values[key] if key in values else getattr(self, key)
+                        for key in keys.keys()}
             elif isinstance(keys, str):
                 return getattr(self, keys)
             else:
                 raise ValueError('keys must be a (str, list, tuple or dict)')
-        return {key: getattr(self, key) for key in self._lantz_features}
+        values = self._refresh_many(self._lantz_features.keys())
+        return {key: values[key] if key in values else getattr(self, key)
+                for key in self._lantz_features}
+
+    def _refresh_many(self, keys):
+        """Read several feats at once bypassing their getters.
+
+        Drivers able to combine the reading of several feats in a single
+        operation should override this method. Feats not included in the
+        returned dictionary are read one by one.
+
+        :param keys: iterable of feat names to refresh.
+        :return: a dictionary mapping feat names to (post-processed) values.
+        """
+        return {}
 
     def refresh_async(self, keys=None, *, callback=None):
         """Asynchronous refresh cache by reading values from the instrument.
@@ -442,9 +552,109 @@ class Driver(SuperQObject, metaclass=_DriverType):
             fut.add_done_callback(callback)
         return fut
 
+    def _make_wait(self, predicate, timeout, value, deadline, expected, name):
+        if isinstance(predicate, str):
+            feat_name = predicate
+            name = name or feat_name
+            predicate = lambda: getattr(self, feat_name)
+        else:
+            name = name or getattr(predicate, '__name__', '<lambda>')
+            if name == '<lambda>':
+                name = 'condition'
+
+        if value is MISSING:
+            def check():
+                with self._lock:
+                    return bool(predicate())
+        else:
+            def check():
+                with self._lock:
+                    return predicate() == value
+
+        if timeout is not None:
+            deadline = min(deadline or float('inf'), time.monotonic() + timeout)
+
+        if expected is None:
+            expected = self._expected_wait(name)
+        else:
+            expected = getattr(expected, 'magnitude', expected)
+
+        return Wait(self, name, check, Backoff(*self.POLL_BACKOFF, expected=expected), deadline)
+
+    def _expected_wait(self, name):
+        """Return the median duration of the last waits with a given name, or None.
+        """
+        key = 'wait_' + name
+        if key not in self.timing:
+            return None
+        try:
+            return self.timing.percentiles(key, (50, ))[0]
+        except ValueError:
+            return self.timing.stats(key).mean
+
+    def poll_until(self, predicate, timeout=None, *, value=MISSING, expected=None, name=None):
+        """Check a condition in the current thread with backoff (POLL_BACKOFF)
+        until it is met.
+
+        Use it within actions and feats (which hold the driver lock),
+        otherwise prefer `wait_until`.
+
+        .. seealso:: wait_until
+
+        :return: number of checks.
+        :raises: LantzTimeoutError
+        """
+        wait = self._make_wait(predicate, timeout, value, None, expected, name)
+        while True:
+            delay = wait.next_time() - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            if wait.poll():
+                return wait.polls
+            if wait.expired():
+                raise wait.timeout_error()
+
+    def wait_until(self, predicate, timeout=None, *, value=MISSING, deadline=None,
+                   expected=None, name=None):
+        """Return a future resolved when a condition is met.
+
+        The condition is checked with exponential backoff (POLL_BACKOFF)
+        by a poller shared by all drivers, so many waits do not require
+        many threads. If the expected duration is not given, the median
+        of the last waits with the same name is used. The duration, the
+        number of checks and the overshoot (an upper bound of the time
+        between the completion and its detection) are recorded in timing
+        as wait_<name>, wait_<name>_polls and wait_<name>_overshoot.
+
+        For example::
+
+            stage.move_async(10)
+            fut = stage.wait_until('motion_done', expected=2.5)
+
+        Do not block on the future while holding the driver lock
+        (e.g. within an action), use `poll_until` instead.
+
+        :param predicate: name of a feat or callable without arguments.
+        :param timeout: maximum time to wait in seconds.
+        :param value: if given, the condition is met when the predicate
+                      is equal to it. Otherwise, when it is true.
+        :param deadline: time.monotonic value after which the wait fails.
+        :param expected: expected duration in seconds (or Quantity).
+        :param name: name used in the timing categories
+                     (by default the name of the predicate).
+        :return: future resolved with the number of checks, or failed with
+                 LantzTimeoutError.
+        :rtype: lantz.executors.Future
+        """
+        wait = self._make_wait(predicate, timeout, value, deadline, expected, name)
+        return get_poller().submit(wait)
+
     def recall(self, keys=None):
         """Return the last value seen for a feat or a collection of feats.
 
+        Values of feats with a 'ttl' cache policy are returned as MISSING
+        once they have expired.
+
         :param keys: a string or list of strings with the properties to refresh.
                      Default None all properties.
                      If keys is a string, returns the value.
@@ -454,9 +664,63 @@ class Driver(SuperQObject, metaclass=_DriverType):
 
         if keys:
             if isinstance(keys, (list, tuple, set)):
-                return {key: self._lantz_features[key].get_cache(self) for key in keys}
-            return self._lantz_features[keys].get_cache(self)
-        return {key: value.get_cache(self) for key, value in self._lantz_features.keys()}
+                return {key: self._recall(key) for key in keys}
+            return self._recall(keys)
+        return {key: self._recall(key) for key in self._lantz_features.keys()}
+
+    def _recall(self, key):
+        feat = self._lantz_features[key]
+        if not feat.is_cache_fresh(self):
+            return MISSING
+        return feat.get_cache(self)
+
+    def afeat(self, name, key=MISSING):
+        """Get the value of a feat from an asyncio coroutine.
+
+        The instrument is accessed in the executor of the driver.
+
+            >>> value = await drv.afeat('frequency')
+
+        :param name: name of the feat.
+        :param key: key for DictFeat.
+        :return: awaitable future.
+        """
+        feat = self._lantz_features[name]
+        if self._defer_get is not None:
+            fut = self._defer_get(feat, key)
+            if fut is not None:
+                return fut
+        if key is MISSING:
+            return self._submit(feat.get, self)
+        return self._submit(feat.getitem, self, key)
+
+    def aset(self, name, value, key=MISSING, *, force=False):
+        """Set the value of a feat from an asyncio coroutine.
+
+        The instrument is accessed in the executor of the driver.
+
+            >>> await drv.aset('frequency', Q_(10, 'Hz'))
+
+        :param name: name of the feat.
+        :param value: new value.
+        :param key: key for DictFeat.
+        :param force: apply change even when the cache says it is not necessary.
+        :return: awaitable future.
+        """
+        feat = self._lantz_features[name]
+        if key is MISSING:
+            return self._submit(feat.set, self, value, force)
+        return self._submit(feat.setitem, self, key, value, force)
+
+    def acall(self, name, *args, **kwargs):
+        """Call an action from an asyncio coroutine.
+
+        Equivalent to `<name>_async`, whose futures are also awaitable.
+
+        :param name: name of the action.
+        :return: awaitable future.
+        """
+        return self._submit(getattr(self, name), *args, **kwargs)
 
     @property
     def feats(self):
@@ -467,40 +731,228 @@ class Driver(SuperQObject, metaclass=_DriverType):
         return Proxy(self, self._lantz_actions, ActionProxy)
 
 
-def _solve_dependencies(dependencies, all_members=None):
-    """Solve a dependency graph.
+class _Schedule(object):
+    """Tracks which drivers of a group can be called, following a
+    dependency graph (used by initialize_many, finalize_many and
+    their asyncio versions).
+
+    Drivers are tracked by object, so drivers sharing a name are
+    scheduled independently (a dependency on a name applies to all
+    the drivers with that name).
 
-    :param dependencies: dependency dictionary. For each key, the value is
-                         an iterable indicating its dependencies.
-    :param all_members: If provided
-    :return: list of sets, each containing independent task only dependent of the
-             previous set in the list.
+    :param drivers: an iterable of drivers.
+    :param dependencies: for each driver name, an iterable with the names of
+                         the drivers that must be done before.
+    :param reverse: if True, the dependencies are used in reverse.
+    :raises: ValueError if the dependencies are circular.
+    """
+
+    def __init__(self, drivers, dependencies=None, reverse=False):
+        #: Drivers in the given order, without duplicates.
+        self.drivers = list(OrderedDict.fromkeys(drivers))
+
+        by_name = defaultdict(list)
+        for driver in self.drivers:
+            by_name[driver.name].append(driver)
+
+        #: For each driver that has not been started, the drivers that must be done before.
+        self.waiting = OrderedDict((driver, set()) for driver in self.drivers)
+        for name, others in (dependencies or {}).items():
+            for other in others:
+                for driver in by_name.get(name, ()):
+                    for dependency in by_name.get(other, ()):
+                        if reverse:
+                            self.waiting[dependency].add(driver)
+                        else:
+                            self.waiting[driver].add(dependency)
+
+        pending = {driver: set(others) for driver, others in self.waiting.items()}
+        while pending:
+            ready = [driver for driver, others in pending.items() if not others]
+            if not ready:
+                raise ValueError('Circular dependencies among {}'.format(
+                    ', '.join(driver.name for driver in self.waiting if driver in pending)))
+            for driver in ready:
+                del pending[driver]
+            for others in pending.values():
+                others.difference_update(ready)
+
+    def ready(self):
+        """Remove and return the drivers whose dependencies are done.
+        """
+        ready = [driver for driver, others in self.waiting.items() if not others]
+        for driver in ready:
+            del self.waiting[driver]
+        return ready
 
+    def done(self, driver):
+        """Release the drivers waiting for a driver.
+        """
+        for others in self.waiting.values():
+            others.discard(driver)
+
+    def fail(self, driver):
+        """Remove and return the drivers waiting, directly or not, for a driver
+        that will not be done.
+        """
+        failed = []
+        blocked = [driver]
+        while blocked:
+            current = blocked.pop()
+            for other, others in list(self.waiting.items()):
+                if current in others:
+                    del self.waiting[other]
+                    failed.append(other)
+                    blocked.append(other)
+        return failed
+
+
+def _call_in_daemon_thread(func, *args):
+    """Call func in a new daemon thread, so that a call that never returns
+    does not prevent the interpreter from exiting.
+
+    :rtype: concurrent.futures.Future
     """
-    d = dict((key, set(value)) for key, value in dependencies.items())
-    if all_members:
-        d.update({key: set() for key in all_members if key not in d})
-    r = []
-    while d:
-        # values not in keys (items without dep)
-        t = set(i for v in d.values() for i in v) - set(d.keys())
-        # and keys without value (items without dep)
-        t.update(k for k, v in d.items() if not v)
-        # can be done right away
-        r.append(t)
-        # and cleaned up
-        d = dict(((k, v - t) for k, v in d.items() if v))
-
-    return r
+    fut = futures.Future()
+    fut.set_running_or_notify_cancel()
+
+    def _run():
+        try:
+            result = func(*args)
+        except BaseException as ex:
+            fut.set_exception(ex)
+        else:
+            fut.set_result(result)
+
+    threading.Thread(target=_run, daemon=True).start()
+    return fut
+
+
+def _run_many(drivers, method, dependencies=None, reverse=False,
+              concurrent=False, max_workers=None, timeout=None,
+              on_starting=None, on_done=None, on_exception=None, on_called=None):
+    """Call a method of each driver as soon as the drivers it depends on
+    are done (dependency graph scheduler used by initialize_many and finalize_many).
+
+    :param method: name of the method to call.
+    :param dependencies: for each driver name, an iterable with the names of
+                         the drivers that must be done before.
+    :param reverse: if True, the dependencies are used in reverse.
+    :param concurrent: if True, ready drivers are called from daemon threads.
+                       Otherwise they are called one at a time in the calling thread.
+    :param max_workers: maximum number of simultaneous calls (default: one per driver).
+    :param timeout: seconds after which a running call is reported to on_exception
+                    as a LantzTimeoutError (concurrent only). The drivers depending
+                    on it are not called and are reported as failed too. The call
+                    is left running in its daemon thread.
+    :param on_called: a callable executed after each call, successful or not
+                      (but not for calls that timed out).
+    :return: for each driver name, the start time (relative to the call
+             to this function) and duration in seconds.
+    :rtype: dict
+    """
+    schedule = _Schedule(drivers, dependencies, reverse)
+    max_workers = max_workers or len(schedule.drivers) or 1
+
+    t0 = time.monotonic()
+    started = {}
+    durations = {}
+    errors = []
+
+    def _call(driver):
+        try:
+            getattr(driver, method)()
+        finally:
+            durations[driver] = time.monotonic() - started[driver]
+            driver.timing.add(method, durations[driver])
+
+    def _report(driver, ex=None):
+        if ex is None:
+            if on_done:
+                on_done(driver)
+        elif on_exception:
+            on_exception(driver, ex)
+        else:
+            errors.append(ex)
+
+    def _done(driver, ex=None):
+        schedule.done(driver)
+        if on_called:
+            on_called(driver)
+        _report(driver, ex)
+
+    def _timed_out(driver):
+        _report(driver, LantzTimeoutError('{} of {} did not finish '
+                                          'within {} seconds'.format(method, driver.name, timeout)))
+        for dependent in schedule.fail(driver):
+            _report(dependent, LantzTimeoutError('{} of {} not started: {} of {} did not finish '
+                                                 'within {} seconds'.format(method, dependent.name, method,
+                                                                            driver.name, timeout)))
+
+    queue = deque()
+    running = {}
+    while schedule.waiting or queue or running:
+        if errors:
+            # Without on_exception, the first error stops the scheduling
+            # and it is raised after the running calls are done.
+            schedule.waiting.clear()
+            queue.clear()
+        else:
+            queue.extend(schedule.ready())
+
+        while queue and not errors and (not concurrent or len(running) < max_workers):
+            driver = queue.popleft()
+            if on_starting:
+                on_starting(driver)
+            started[driver] = time.monotonic()
+            if concurrent:
+                running[_call_in_daemon_thread(_call, driver)] = driver
+                continue
+            try:
+                _call(driver)
+            except Exception as ex:
+                _done(driver, ex)
+            else:
+                _done(driver)
+            queue.extend(schedule.ready())
+
+        if not running:
+            continue
+
+        wait_time = None
+        if timeout is not None:
+            deadline = min(started[driver] for driver in running.values()) + timeout
+            wait_time = max(deadline - time.monotonic(), 0)
+
+        done, _ = futures.wait(running, wait_time, futures.FIRST_COMPLETED)
+        for fut in done:
+            _done(running.pop(fut), fut.exception())
+
+        if timeout is not None:
+            now = time.monotonic()
+            for fut, driver in list(running.items()):
+                if now - started[driver] >= timeout:
+                    del running[fut]
+                    _timed_out(driver)
+
+    if errors:
+        raise errors[0]
+
+    return {driver.name: (started[driver] - t0, durations.get(driver))
+            for driver in schedule.drivers if driver in started}
 
 
 def initialize_many(drivers, register_finalizer=True,
                     on_initializing=None, on_initialized=None, on_exception=None,
-                    concurrent=False, dependencies=None):
+                    concurrent=False, dependencies=None, max_workers=None, timeout=None):
     """Initialize a group of drivers.
 
+    Each driver is initialized as soon as its dependencies are initialized,
+    without waiting for unrelated drivers.
+
     :param drivers: an iterable of drivers.
-    :param register_finalizer: register driver.finalize method to be called at python exit.
+    :param register_finalizer: register driver.finalize method to be called at python exit
+                               (not for drivers whose initialization timed out).
     :param on_initializing: a callable to be executed BEFORE initialization.
                             It takes the driver as the first argument.
     :param on_initialized: a callable to be executed AFTER initialization.
@@ -513,69 +965,32 @@ def initialize_many(drivers, register_finalizer=True,
     :param dependencies: indicates which drivers depend on others to be initialized.
                          each key is a driver name, and the corresponding
                          value is an iterable with its dependencies.
+    :param max_workers: maximum number of drivers initialized at the same time
+                        when concurrent (default: all).
+    :param timeout: seconds after which a driver that is still initializing is reported
+                    as a LantzTimeoutError, as well as the drivers depending on it,
+                    which are not initialized (concurrent only). The initialization
+                    is left running in a daemon thread.
+    :return: for each driver name, the time in seconds at which the initialization
+             started (relative to the call) and its duration. Durations are also
+             recorded in each driver timing under 'initialize'.
+    :rtype: dict
     """
 
-    if dependencies:
-        names = {driver.name: driver for driver in drivers}
-
-        groups = _solve_dependencies(dependencies, set(names.keys()))
-        drivers = tuple(tuple(names[name] for name in group) for group in groups)
-        for subset in drivers:
-            initialize_many(subset, register_finalizer,
-                            on_initializing, on_initialized, on_exception,
-                            concurrent)
-        return
-
-    if concurrent:
-        def _finalize(d):
-            def _inner_finalize(f):
-                atexit.register(d.finalize)
-            return _inner_finalize
-
-        def _done(d):
-            def _inner(f):
-                ex = f.exception()
-                if ex:
-                    if not on_exception:
-                        raise ex
-                    on_exception(d, ex)
-                else:
-                    if on_initialized:
-                        on_initialized(d)
-            return _inner
-
-        futs = []
-        for driver in drivers:
-            if on_initializing:
-                on_initializing(driver)
-            fut = driver.initialize_async()
-            if register_finalizer:
-                fut.add_done_callback(_finalize(driver))
-            fut.add_done_callback(_done(driver))
-            futs.append(fut)
-
-        futures.wait(futs)
+    if register_finalizer:
+        def on_called(driver):
+            atexit.register(driver.finalize)
     else:
-        for driver in drivers:
-            if on_initializing:
-                on_initializing(driver)
-            try:
-                driver.initialize()
-            except Exception as ex:
-                if not on_exception:
-                    raise ex
-                on_exception(driver, ex)
-            else:
-                if on_initialized:
-                    on_initialized(driver)
+        on_called = None
 
-            if register_finalizer:
-                atexit.register(driver.finalize)
+    return _run_many(drivers, 'initialize', dependencies, False,
+                     concurrent, max_workers, timeout,
+                     on_initializing, on_initialized, on_exception, on_called)
 
 
 def finalize_many(drivers,
                   on_finalizing=None, on_finalized=None, on_exception=None,
-                  concurrent=False, dependencies=None):
+                  concurrent=False, dependencies=None, max_workers=None, timeout=None):
     """Finalize a group of drivers.
 
     :param drivers: an iterable of drivers.
@@ -592,49 +1007,95 @@ def finalize_many(drivers,
                          each key is a driver name, and the corresponding
                          value is an iterable with its dependencies.
                          The dependencies are used in reverse.
+    :param max_workers: maximum number of drivers finalized at the same time
+                        when concurrent (default: all).
+    :param timeout: seconds after which a driver that is still finalizing is reported
+                    as a LantzTimeoutError, as well as the drivers it depends on,
+                    which are not finalized (concurrent only). The finalization
+                    is left running in a daemon thread.
+    :return: for each driver name, the time in seconds at which the finalization
+             started (relative to the call) and its duration. Durations are also
+             recorded in each driver timing under 'finalize'.
+    :rtype: dict
     """
 
-    if dependencies:
-        names = {driver.name: driver for driver in drivers}
-
-        groups = _solve_dependencies(dependencies, set(names.keys()))
-        drivers = tuple(tuple(names[name] for name in group) for group in groups)
-        for subset in reversed(drivers):
-            finalize_many(subset, on_finalizing, on_finalized, on_exception, concurrent)
-        return
-
-    if concurrent:
-        def _done(d):
-            def _inner(f):
-                ex = f.exception()
-                if ex:
-                    if not on_exception:
-                        raise ex
-                    on_exception(d, ex)
-                else:
-                    if on_finalized:
-                        on_finalized(d)
-            return _inner
-
-        futs = []
-        for driver in drivers:
-            if on_finalizing:
-                on_finalizing(driver)
-            fut = driver.finalize_async()
-            fut.add_done_callback(_done(driver))
-            futs.append(fut)
-
-        futures.wait(futs)
-    else:
-        for driver in drivers:
-            if on_finalizing:
-                on_finalizing(driver)
-            try:
-                driver.finalize()
-            except Exception as ex:
-                if not on_exception:
-                    raise ex
+    return _run_many(drivers, 'finalize', dependencies, True,
+                     concurrent, max_workers, timeout,
+                     on_finalizing, on_finalized, on_exception)
+
+
+async def _arun_many(drivers, method, dependencies=None, reverse=False,
+                     on_starting=None, on_done=None, on_exception=None, on_called=None):
+    """Await the asynchronous version of a method of each driver as soon as
+    the drivers it depends on are done, following the same schedule as `_run_many`.
+    """
+    schedule = _Schedule(drivers, dependencies, reverse)
+    errors = []
+    running = {}
+    while schedule.waiting or running:
+        if errors:
+            # Without on_exception, the first error stops the scheduling
+            # and it is raised after the running calls are done.
+            schedule.waiting.clear()
+        else:
+            for driver in schedule.ready():
+                if on_starting:
+                    on_starting(driver)
+                running[asyncio.wrap_future(getattr(driver, method + '_async')())] = driver
+
+        if not running:
+            continue
+
+        done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+        for fut in done:
+            driver = running.pop(fut)
+            schedule.done(driver)
+            if on_called:
+                on_called(driver)
+            ex = fut.exception()
+            if ex is None:
+                if on_done:
+                    on_done(driver)
+            elif on_exception:
                 on_exception(driver, ex)
             else:
-                if on_finalized:
-                    on_finalized(driver)
+                errors.append(ex)
+
+    if errors:
+        raise errors[0]
+
+
+async def ainitialize_many(drivers, register_finalizer=True,
+                           on_initializing=None, on_initialized=None, on_exception=None,
+                           dependencies=None):
+    """Initialize a group of drivers from an asyncio coroutine.
+
+    Each driver is initialized as soon as its dependencies are initialized.
+    The arguments have the same meaning as in `initialize_many`.
+
+    :raises: ValueError if the dependencies are circular.
+    """
+
+    if register_finalizer:
+        def on_called(driver):
+            atexit.register(driver.finalize)
+    else:
+        on_called = None
+
+    await _arun_many(drivers, 'initialize', dependencies, False,
+                     on_initializing, on_initialized, on_exception, on_called)
+
+
+async def afinalize_many(drivers,
+                         on_finalizing=None, on_finalized=None, on_exception=None,
+                         dependencies=None):
+    """Finalize a group of drivers from an asyncio coroutine.
+
+    Each driver is finalized as soon as the drivers depending on it are finalized.
+    The arguments have the same meaning as in `finalize_many`.
+
+    :raises: ValueError if the dependencies are circular.
+    """
+
+    await _arun_many(drivers, 'finalize', dependencies, True,
+                     on_finalizing, on_finalized, on_exception)
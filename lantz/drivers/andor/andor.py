@@ -68,6 +68,8 @@ class Andor(LibraryDriver):
 
     LIBRARY_NAME = 'atcore.dll'
 
+    BLOCKING = {'AT_WaitBuffer': lambda driver: driver.command('AcquisitionStop')}
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.AT_H = ct.c_int()
@@ -147,9 +149,18 @@ class Andor(LibraryDriver):
 
     def waitbuffer(self, ptr, bufsize):
         """Wait for next buffer ready.
+
+        The wait runs in the I/O thread of the driver and it is
+        interrupted (stopping the acquisition) if the calling
+        thread receives a KeyboardInterrupt.
         """
         timeout = ct.c_int(20000)
-        self.lib.AT_WaitBuffer(self.AT_H, ct.byref(ptr), ct.byref(bufsize), timeout)
+        fut = self.lib.AT_WaitBuffer(self.AT_H, ct.byref(ptr), ct.byref(bufsize), timeout)
+        try:
+            fut.result()
+        except KeyboardInterrupt:
+            fut.cancel()
+            raise
 
     def command(self, strcommand):
         """Run command.
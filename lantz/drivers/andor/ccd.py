@@ -123,6 +123,8 @@ class CCD(LibraryDriver):
 
     LIBRARY_NAME = 'atmcd64d.dll'
 
+    BLOCKING = {'WaitForAcquisition': 'CancelWait'}
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.cameraIndex = ct.c_int(0)
@@ -744,7 +746,7 @@ class CCD(LibraryDriver):
         """
         self.lib.AbortAcquisition()
 
-    @Action()
+    @Action(concurrent=True)
     def wait_for_acquisition(self):
         """WaitForAcquisition can be called after an acquisition is started
         using StartAcquisition to put the calling thread to sleep until an
@@ -761,8 +763,40 @@ class CCD(LibraryDriver):
         If a second event occurs before the first one has been acknowledged,
         the first one will be ignored. Care should be taken in this case, as
         you may have to use CancelWait to exit the function.
+
+        The driver lock is not held while waiting, so other Feats
+        (e.g. temperature) can be used from other threads.
+        """
+        fut = self.acquisition_event()
+        try:
+            fut.result()
+        except KeyboardInterrupt:
+            fut.cancel()
+            raise
+
+    def acquisition_event(self):
+        """Return a future resolved at the next Acquisition Event.
+
+        WaitForAcquisition is called in the I/O thread of the driver and
+        cancelling the future calls CancelWait.
+
+        :rtype: lantz.executors.CancellableFuture
+        """
+        return self.lib.WaitForAcquisition()
+
+    def acquisition_done(self, timeout=None):
+        """Return a future resolved when the acquisition is finished.
+
+        Unlike wait_for_acquisition, it does not block a thread: the status
+        is polled by the poller shared among drivers, starting after the
+        exposure time.
+
+        :param timeout: maximum time to wait in seconds.
+        :rtype: lantz.executors.Future
         """
-        self.lib.WaitForAcquisition()
+        exposure = self.acquisition_timings[0]
+        return self.wait_until(lambda: self.status != 'Acquisition in progress.', timeout,
+                               expected=exposure, name='acquisition')
 
     @Action()
     def cancel_wait(self):
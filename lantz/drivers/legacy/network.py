@@ -10,10 +10,12 @@
 """
 
 import socket
+import asyncio
 
 from lantz import Driver
 from lantz.drivers.legacy.textual import TextualMixin
 from lantz.errors import LantzTimeoutError
+from lantz.trace import traced, READ, WRITE
 
 
 class LantzSocketTimeoutError(socket.timeout, LantzTimeoutError):
@@ -37,6 +39,10 @@ class TCPRawDriver(Driver):
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.host_port = (host, port)
 
+        #: Serializes the queries of asyncio coroutines.
+        self._alock = asyncio.Lock()
+
+    @traced(WRITE)
     def raw_send(self, data):
         """Send raw bytes to the instrument.
 
@@ -48,6 +54,7 @@ class TCPRawDriver(Driver):
         except socket.timeout as e:
             raise LantzSocketTimeoutError(str(e))
 
+    @traced(READ)
     def raw_recv(self, size):
         """Receive raw bytes to the instrument.
 
@@ -71,6 +78,36 @@ class TCPRawDriver(Driver):
     def is_open(self):
         return self.socket.isOpen()
 
+    async def ainitialize(self):
+        """Open a non blocking connection to be used from asyncio coroutines
+        (araw_send, araw_recv and derived methods) instead of the socket.
+        """
+        self.log_debug('Opening asyncio connection to {}', self.host_port)
+        self._reader, self._writer = await asyncio.open_connection(*self.host_port)
+
+    async def afinalize(self):
+        self.log_debug('Closing asyncio connection to {}', self.host_port)
+        self._writer.close()
+        await self._writer.wait_closed()
+
+    async def araw_send(self, data):
+        """Send raw bytes to the instrument without blocking the event loop.
+
+        :param data: bytes to be sent to the instrument.
+        :param data: bytes.
+        """
+        self._writer.write(data)
+        await self._writer.drain()
+
+    async def araw_recv(self, size):
+        """Receive raw bytes from the instrument without blocking the event loop.
+
+        :param size: maximum number of bytes to receive.
+        :return: received bytes.
+        :return type: bytes.
+        """
+        return await self._reader.read(size)
+
 
 class TCPDriver(TCPRawDriver, TextualMixin):
     """Base class for drivers that communicate with instruments via TCP.
@@ -84,3 +121,47 @@ class TCPDriver(TCPRawDriver, TextualMixin):
 
     RECV_CHUNK = 1024
 
+    async def asend(self, command, termination=None, encoding=None):
+        """Send command to the instrument without blocking the event loop.
+
+        .. seealso:: TextualMixin.send
+        """
+        if termination is None:
+            termination = self.SEND_TERMINATION
+        if encoding is None:
+            encoding = self.ENCODING
+
+        message = bytes(command + termination, encoding)
+        self.log_debug('Sending {}', message)
+        await self.araw_send(message)
+
+    async def arecv(self, termination=None, encoding=None):
+        """Receive string from instrument without blocking the event loop.
+
+        .. seealso:: TextualMixin.recv
+        """
+        termination = termination or self.RECV_TERMINATION
+        encoding = encoding or self.ENCODING
+
+        if not termination:
+            return str(await self.araw_recv(self.RECV_CHUNK), encoding)
+
+        timeout = None if self.TIMEOUT is None or self.TIMEOUT < 0 else self.TIMEOUT
+        try:
+            received = await asyncio.wait_for(self._reader.readuntil(bytes(termination, encoding)),
+                                              timeout)
+        except asyncio.TimeoutError:
+            raise LantzTimeoutError
+
+        self.log_debug('Received {!r} (len={})', received, len(received))
+        return str(received[:-len(termination)], encoding)
+
+    async def aquery(self, command, *, send_args=(None, None), recv_args=(None, None)):
+        """Send query to the instrument and return the answer
+        without blocking the event loop.
+
+        .. seealso:: TextualMixin.query
+        """
+        async with self._alock:
+            await self.asend(command, *send_args)
+            return await self.arecv(*recv_args)
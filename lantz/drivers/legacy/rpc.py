@@ -247,41 +247,100 @@ class Client:
 
 # Record-Marking standard support
 
+#: Bit of the fragment header indicating the last fragment of a record.
+LAST_FRAGMENT = 0x80000000
+
+
+def sendall(sock, buffers):
+    """Send a sequence of buffers without concatenating them,
+    using scatter/gather I/O (sendmsg) if available.
+    """
+    buffers = [memoryview(buf).cast('B') for buf in buffers if len(buf)]
+    if not hasattr(sock, 'sendmsg'):
+        for buf in buffers:
+            sock.sendall(buf)
+        return
+
+    while buffers:
+        sent = sock.sendmsg(buffers)
+        while sent:
+            size = len(buffers[0])
+            if sent < size:
+                buffers[0] = buffers[0][sent:]
+                break
+            sent -= size
+            del buffers[0]
+
+
+def recvall_into(sock, view):
+    """Receive bytes from the socket until the writable buffer is full.
+
+    :raises: EOFError if the connection is closed before.
+    """
+    view = memoryview(view).cast('B')
+    while view:
+        n = sock.recv_into(view)
+        if not n:
+            raise EOFError
+        view = view[n:]
+
+
+def _recvheader(sock):
+    header = bytearray(4)
+    recvall_into(sock, header)
+    x = struct.unpack(">I", header)[0]
+    return (x & LAST_FRAGMENT) != 0, x & ~LAST_FRAGMENT
+
+
 def sendfrag(sock, last, frag):
     x = len(frag)
     if last:
-        x = x | 0x80000000
-    header = struct.pack(">I", x)
-    sock.send(header + frag)
+        x = x | LAST_FRAGMENT
+    sendall(sock, (struct.pack(">I", x), frag))
 
 
-def sendrecord(sock, record):
-    sendfrag(sock, 1, record)
+def sendrecord(sock, record, fragment_size=None):
+    """Send a record, split in fragments of at most fragment_size bytes.
+    """
+    if not fragment_size or len(record) <= fragment_size:
+        sendfrag(sock, 1, record)
+        return
+
+    view = memoryview(record)
+    for offset in range(0, len(view), fragment_size):
+        sendfrag(sock, offset + fragment_size >= len(view),
+                 view[offset:offset + fragment_size])
 
 
 def recvfrag(sock):
-    header = sock.recv(4)
-    if len(header) < 4:
-        raise EOFError
-    x = struct.unpack(">I", header[0:4])[0]
-    last = ((x & 0x80000000) != 0)
-    n = int(x & 0x7fffffff)
-    frag = b''
-    while n > 0:
-        buf = sock.recv(n)
-        if not buf:
-            raise EOFError
-        n = n - len(buf)
-        frag = frag + buf
+    last, n = _recvheader(sock)
+    frag = bytearray(n)
+    recvall_into(sock, frag)
     return last, frag
 
 
 def recvrecord(sock):
-    record = b''
-    last = 0
+    """Receive a record, reassembling its fragments in a single
+    buffer as they arrive.
+
+    :rtype: bytearray
+    """
+    record = None
+    last = False
     while not last:
-        last, frag = recvfrag(sock)
-        record = record + frag
+        last, n = _recvheader(sock)
+        if record is None:
+            # Preallocated from the header of the first fragment,
+            # so single fragment records are received in place.
+            record = bytearray(n)
+            offset = 0
+        else:
+            # bytearray over-allocates when growing, so multi-fragment
+            # records are not copied once per fragment.
+            offset = len(record)
+            record.extend(bytes(n))
+        with memoryview(record) as view:
+            recvall_into(sock, view[offset:])
     return record
 
 
@@ -699,6 +758,9 @@ class Server:
 
 class TCPServer(Server):
 
+    #: Maximum size of the fragments in which replies are split (None for no limit).
+    FRAGMENT_SIZE = None
+
     def __init__(self, host, prog, vers, port):
         Server.__init__(self, host, prog, vers, port)
         self.connect()
@@ -725,7 +787,7 @@ class TCPServer(Server):
                 break
             reply = self.handle(call)
             if reply is not None:
-                sendrecord(sock, reply)
+                sendrecord(sock, reply, self.FRAGMENT_SIZE)
 
     def forkingloop(self):
         # Like loop but uses forksession()
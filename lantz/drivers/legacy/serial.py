@@ -15,6 +15,7 @@ import serial
 from lantz import Driver
 from lantz.drivers.legacy.textual import TextualMixin
 from lantz.errors import LantzTimeoutError
+from lantz.trace import traced, READ, WRITE
 
 from serial import SerialTimeoutException
 
@@ -88,6 +89,7 @@ class SerialDriver(TextualMixin, Driver):
 
         self.log_debug('Created pyserial port {}', self.serial.port)
 
+    @traced(WRITE)
     def raw_send(self, data):
         """Send raw bytes to the instrument.
 
@@ -100,6 +102,7 @@ class SerialDriver(TextualMixin, Driver):
         except serial.SerialTimeoutException as e:
             raise LantzSerialTimeoutError(str(e))
 
+    @traced(READ)
     def raw_recv(self, size):
         """Receive raw bytes to the instrument.
 
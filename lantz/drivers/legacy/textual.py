@@ -10,6 +10,7 @@
 """
 
 import time
+from lantz import blocks
 from lantz.errors import LantzTimeoutError
 from lantz.processors import ParseProcessor
 
@@ -44,10 +45,10 @@ class TextualMixin(object):
     #: Size in bytes of the receive chunk (-1 means all bytes in buffer)
     RECV_CHUNK = 1
 
-    #: String containing the part of the message after RECV_TERMINATION
+    #: Buffer (bytearray) containing the part of the message after RECV_TERMINATION
     #: Used in software based finding of termination character when
     #: RECV_CHUNK > 1
-    _received = ''
+    _received = None
 
     def raw_recv(self, size):
         """Receive raw bytes from the instrument. No encoding or termination
@@ -117,19 +118,117 @@ class TextualMixin(object):
         else:
             stop = time.time() + self.TIMEOUT
 
+        def _read_chunk():
+            if time.time() > stop:
+                raise LantzTimeoutError
+            return self.raw_recv(recv_chunk), False
+
+        return self._recv_until(bytes(termination, encoding), _read_chunk, encoding)
+
+    def _recv_until(self, termination, read_chunk, encoding):
+        """Receive chunks until the termination is found and return the
+        decoded message. Bytes after the termination are kept for the next call.
+
+        Chunks are accumulated in a bytearray and only the new bytes are
+        scanned for the termination, so long messages received in small
+        chunks are not copied or scanned repeatedly.
+
+        :param termination: termination bytes.
+        :param read_chunk: callable returning a tuple (bytes, end of message).
+        :param encoding: encoding to transform bytes to string.
+                         If None, the message is returned as a bytearray.
+        """
+        if self._received is None:
+            self._received = bytearray()
+        received = self._received
+
+        start = 0
+        position = received.find(termination)
+        while position < 0:
+            # The termination can start in the bytes already scanned.
+            start = max(len(received) - len(termination) + 1, start)
+            chunk, eom = read_chunk()
+            received += chunk
+            position = received.find(termination, start)
+            if eom and position < 0:
+                position = len(received)
+
+        message = received[:position]
+        # Deleting from the beginning of a bytearray does not move the leftover.
+        del received[:position + len(termination)]
+
+        if encoding is not None:
+            message = str(message, encoding)
+
+        self.log_debug('Received {!r} (len={})', message, len(message))
+
+        return message
+
+    def recv_block(self, dtype='u1', scaling=None, termination=None):
+        """Receive an IEEE 488.2 binary block (definite or indefinite length)
+        and return it as a NumPy array.
+
+        For indefinite length blocks (#0), the data is received up to
+        the termination, which therefore must not appear in the data.
+
+        :param dtype: data type of the elements, including the byte order
+                      (e.g. '>u2' for big endian unsigned 16 bit integers).
+        :param scaling: (multiplier, offset, zero) to convert the values as
+                        (value - offset) * multiplier + zero.
+        :param termination: termination character (overrides class default)
+        :rtype: numpy.ndarray
+        """
+        termination = termination or self.RECV_TERMINATION
+
+        if self.TIMEOUT is None or self.TIMEOUT < 0:
+            stop = float('+inf')
+        else:
+            stop = time.time() + self.TIMEOUT
+
+        if self._received is None:
+            self._received = bytearray()
         received = self._received
-        eom = False
-        while not (termination in received or eom):
+
+        def _read(size):
+            if received:
+                chunk = bytes(received[:size])
+                del received[:size]
+                return chunk
+            while True:
+                chunk = self.raw_recv(size)
+                if chunk:
+                    return chunk
+                if time.time() > stop:
+                    raise LantzTimeoutError
+
+        def _read_chunk():
             if time.time() > stop:
                 raise LantzTimeoutError
-            raw_received = self.raw_recv(recv_chunk)
-            received += str(raw_received, encoding)
+            return self.raw_recv(max(self.RECV_CHUNK, 1)), False
 
-        self.log_debug('Received {!r} (len={})', received, len(received))
+        if termination:
+            def _read_rest():
+                return self._recv_until(bytes(termination, self.ENCODING), _read_chunk, None)
+        else:
+            _read_rest = None
+
+        data = blocks.read_block(_read, dtype, _read_rest)
+        self.log_debug('Received block of {} bytes', data.nbytes)
+        if scaling:
+            data = blocks.scale(data, *scaling)
+        return data
 
-        received, self._received = received.split(termination, 1)
+    def query_block(self, command, dtype='u1', scaling=None, *, send_args=(None, None)):
+        """Send query to the instrument and return the binary block answer.
 
-        return received
+        .. seealso:: recv_block
+
+        :param command: command to be sent to the instrument
+        :type command: string
+        :param send_args: (termination, encoding) to override class defaults
+        """
+        self.send(command, *send_args)
+        return self.recv_block(dtype, scaling)
 
     def query(self, command, *, send_args=(None, None), recv_args=(None, None)):
         """Send query to the instrument and return the answer
@@ -14,6 +14,7 @@
     :license: BSD, see LICENSE for more details.
 """
 
+from array import array
 from collections import namedtuple, OrderedDict
 from fnmatch import fnmatch
 
@@ -23,6 +24,7 @@ from usb.util import (get_string as usb_get_string,
 
 from lantz import Driver
 from lantz.errors import LantzTimeoutError, InstrumentError
+from lantz.trace import traced, READ_INTO, WRITE
 
 
 ClassCodes = {
@@ -299,6 +301,10 @@ class USBDriver(Driver):
                  device_filters=None, timeout=None, **kwargs):
         super().__init__(**kwargs)
 
+        #: Receive buffers used by raw_recv indexed by size.
+        #: :type: dict[int, array.array]
+        self._recv_buffers = {}
+
         device_filters = device_filters or {}
         devices = self.find_devices(vendor, product, serial_number, None, **device_filters)
 
@@ -361,6 +367,7 @@ class USBDriver(Driver):
         """
         self.raw_send(data)
 
+    @traced(WRITE)
     def raw_send(self, data):
         """Send raw bytes to the instrument.
 
@@ -379,6 +386,9 @@ class USBDriver(Driver):
     def raw_recv(self, size):
         """Receive raw bytes to the instrument.
 
+        The data is received into a buffer owned by the driver, one for
+        each requested size, avoiding an allocation in every read.
+
         :param size: number of bytes to receive
         :return: received bytes
         :return type: bytes
@@ -387,9 +397,36 @@ class USBDriver(Driver):
         if size <= 0:
             size = 1
 
-        data = self.usb_recv_ep.read(size, self.TIMEOUT).tobytes()
+        try:
+            buffer = self._recv_buffers[size]
+        except KeyError:
+            buffer = self._recv_buffers[size] = array('B', bytes(size))
+
+        received = self.raw_recv_into(buffer)
+
+        return bytes(memoryview(buffer)[:received])
+
+    @traced(READ_INTO)
+    def raw_recv_into(self, buffer, endpoint=None, timeout=None):
+        """Receive raw bytes from the instrument into a preallocated buffer.
+
+        :param buffer: buffer to be filled. At most its size in bytes are received.
+                       (PyUSB requires an array.array, which can be viewed
+                       by a NumPy array without copying).
+        :type buffer: array.array
+        :param endpoint: endpoint to read from (the receive endpoint by default).
+        :param timeout: timeout in milliseconds (TIMEOUT by default).
+        :return: number of bytes received.
+        :rtype: int
+        """
+        if not isinstance(buffer, array):
+            raise TypeError('buffer must be an array.array, not {}'.format(type(buffer).__name__))
 
-        return data
+        endpoint = endpoint or self.usb_recv_ep
+        try:
+            return endpoint.read(buffer, self.TIMEOUT if timeout is None else timeout)
+        except usb.core.USBError as e:
+            raise InstrumentError(str(e))
 
     def finalize(self):
         """Close port
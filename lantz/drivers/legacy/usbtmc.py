@@ -183,11 +183,7 @@ class USBTMCDriver(USBDriver, TextualMixin):
         encoding = encoding or self.ENCODING
         recv_chunk = recv_chunk or self.RECV_CHUNK
 
-        eom = False
-
-        received = self._received
-
-        while not (termination in received or eom):
+        def _read_chunk():
             self._btag = (self._btag % 255) + 1
 
             req = BulkInMessage.build_array(self._btag, recv_chunk, None)
@@ -198,14 +194,9 @@ class USBTMCDriver(USBDriver, TextualMixin):
 
             response = BulkInMessage.from_bytes(resp)
 
-            received += str(response.data, encoding)
-            eom = response.transfer_attributes & 1
-
-        self.log_debug('Received {!r} (len={})', received, len(received))
-
-        received, self._received = received.split(termination, 1)
+            return response.data, response.transfer_attributes & 1
 
-        return received
+        return self._recv_until(bytes(termination, encoding), _read_chunk, encoding)
 
     recv.__doc__ = TextualMixin.recv.__doc__
 
@@ -12,6 +12,7 @@
 from lantz import Driver
 from lantz.drivers.legacy.textual import TextualMixin
 from lantz.errors import LantzTimeoutError
+from lantz.trace import traced, READ, WRITE
 
 import visa
 
@@ -82,6 +83,7 @@ class MessageVisaDriver(TextualMixin, Driver):
         self.resource_name = resource_name
         self.log_debug('Created Instrument {}', self.resource_name)
 
+    @traced(WRITE)
     def raw_send(self, data):
         """Send raw bytes to the instrument.
 
@@ -167,6 +169,7 @@ class SerialVisaDriver(MessageVisaDriver):
         self._init_attributes.update(kw)
 
 
+    @traced(READ)
     def raw_recv(self, size):
         """Receive raw bytes to the instrument.
 
@@ -195,6 +198,7 @@ class SerialVisaDriver(MessageVisaDriver):
 class GPIBVisaDriver(MessageVisaDriver):
 
 
+    @traced(READ)
     def raw_recv(self, size):
         """Receive raw bytes to the instrument.
 
@@ -221,6 +225,7 @@ class TCPVisaDriver(MessageVisaDriver):
 class USBVisaDriver(MessageVisaDriver):
 
 
+    @traced(READ)
     def raw_recv(self, size):
         """Receive raw bytes to the instrument.
 
@@ -17,6 +17,7 @@ import socket
 from lantz.errors import InstrumentError
 from lantz.drivers.legacy import rpc
 from lantz import Driver
+from lantz.trace import traced, READ, WRITE
 
 
 # VXI-11 RPC constants
@@ -324,6 +325,7 @@ class Vxi11Driver(Driver):
         self.client.close()
         super().finalize()
 
+    @traced(WRITE)
     def write_raw(self, data):
         """Write binary data to instrument
         """
@@ -355,6 +357,7 @@ class Vxi11Driver(Driver):
             offset += size
             num -= size
 
+    @traced(READ)
     def read_raw(self, num=-1):
         """Read binary data from instrument
         """
@@ -372,7 +375,7 @@ class Vxi11Driver(Driver):
             flags = OP_FLAG_TERMCHAR_SET
             term_char = str(self.term_char).encode('utf-8')[0]
         
-        read_data = b''
+        read_data = bytearray()
         
         while reason & (RX_END | RX_CHR) == 0:
             error, reason, data = self.client.device_read(self.link, read_len, self.io_timeout, self.lock_timeout, flags, term_char)
@@ -389,7 +392,7 @@ class Vxi11Driver(Driver):
                 if num < read_len:
                     read_len = num
             
-        return read_data
+        return bytes(read_data)
 
     def read_stb(self):
         """Read status byte
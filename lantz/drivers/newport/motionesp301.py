@@ -20,7 +20,6 @@ from lantz.serial import SerialDriver
 from lantz.visa import GPIBVisaDriver
 from lantz import Q_, ureg
 from lantz.processors import convert_to
-import time
 
 # Add generic units:
 #ureg.define('unit = unit')
@@ -116,7 +115,6 @@ class ESP301Axis(SerialDriver,object):
         self.parent = parent
         self.num = num
         self.id = id
-        self.wait_time = 0.1 # in seconds * Q_(1, 's')
         self.backlash = 0
         self.wait_until_done = True
 
@@ -271,10 +269,9 @@ class ESP301Axis(SerialDriver,object):
     # def units(self, val):
     #     self.parent.send('%SN%' % (self.num, val))
 
-    def _wait_until_done(self):
-        #wait_time = convert_to('seconds', on_dimensionless='warn')(self.wait_time)
-        while not self.motion_done:
-            time.sleep(self.wait_time) #wait_time.magnitude)
+    def _wait_until_done(self, timeout=None):
+        # Polled with backoff, starting from the median of previous moves.
+        self.poll_until('motion_done', timeout, name='motion')
 
 
 
@@ -10,14 +10,22 @@
     :license: BSD, see LICENSE for more details.
 """
 
+import ctypes
+
 from lantz import Feat, Action
 from lantz.errors import InstrumentError
-from lantz.foreign import LibraryDriver, RetValue, RetStr
+from lantz.foreign import LibraryDriver, RetValue, RetStr, Signature
 
 from .constants import Constants, Types
 
 default_buf_size = 2048
 
+#: Prototypes of the event callbacks, the first argument is the task handle.
+EveryNSamplesEventCallback = ctypes.CFUNCTYPE(Types.int32, Types.TaskHandle, Types.int32,
+                                              Types.uInt32, Types.void_p)
+DoneEventCallback = ctypes.CFUNCTYPE(Types.int32, Types.TaskHandle, Types.int32, Types.void_p)
+SignalEventCallback = ctypes.CFUNCTYPE(Types.int32, Types.TaskHandle, Types.int32, Types.void_p)
+
 _SAMPLE_MODES = {'finite': Constants.Val_FiniteSamps,
                  'continuous': Constants.Val_ContSamps,
                  'hwtimed': Constants.Val_HWTimedSinglePoint}
@@ -83,6 +91,26 @@ class _Base(LibraryDriver):
             raise InstrumentError('Could not retrieve extended error info.')
         return msg
 
+    def invalidate_metadata(self):
+        """Forget the cached metadata (the read once feats) so that
+        it is read again from the library when needed.
+        """
+        for feat in self._lantz_features.values():
+            if feat.read_once:
+                feat.clear_cache(self)
+
+    def metadata_stats(self):
+        """Return a dict mapping the name of each metadata feat to
+        the number of library calls avoided by the cache and done.
+        """
+        out = {}
+        for name, feat in self._lantz_features.items():
+            state = self.timing.get('cache_' + name)
+            if feat.read_once and state is not None:
+                hits = int(state.sum)
+                out[name] = (hits, state.count - hits)
+        return out
+
     def _return_handler(self, func_name, ret_value):
         if ret_value < 0 and func_name not in ('GetErrorString', 'GetExtendedErrorInfo'):
             msg = self._get_error_string(ret_value)
@@ -346,6 +374,7 @@ class Device(_Base):
     def reset(self):
         """Stops and deletes all tasks on a device and rests outputs to their defaults
         """
+        self.invalidate_metadata()
         return self.lib.ResetDevice()
 
 
@@ -368,6 +397,23 @@ class Task(_Base):
 
     _REGISTRY = {}
 
+    #: Functions called without a task handle.
+    _UNBOUND = ('GetErrorString', 'GetExtendedErrorInfo', 'LoadTask', 'CreateTask')
+
+    #: Functions called in every read, through the compiled call path.
+    SIGNATURES = {
+        'ReadAnalogF64': Signature([Types.TaskHandle, Types.int32, Types.float64, Types.bool32,
+                                    Types.void_p, Types.uInt32, RetValue('i32'), None]),
+        'ReadDigitalLines': Signature([Types.TaskHandle, Types.int32, Types.float64, Types.bool32,
+                                       Types.void_p, Types.uInt32, RetValue('i32'), RetValue('i32'), None]),
+        'ReadCounterU32': Signature([Types.TaskHandle, Types.int32, Types.float64,
+                                     Types.void_p, Types.uInt32, RetValue('i32'), None]),
+        'GetReadAvailSampPerChan': Signature([Types.TaskHandle, RetValue('u32')]),
+    }
+
+    #: Waits run in the I/O thread of the task, aborting the task cancels them.
+    BLOCKING = {'WaitUntilTaskDone': lambda task: task.lib.TaskControl(Constants.Val_Task_Abort)}
+
     @classmethod
     def register_class(cls, klass):
         cls._REGISTRY[klass.IO_TYPE] = klass
@@ -397,8 +443,8 @@ class Task(_Base):
                 self._create_task(name)
 
         self.sample_mode = None
-        self.channels = _ObjectDict(self._channel_names, self._create_channel_from_name, self._CHANNELS)
-        self.devices = _ObjectDict(self._device_names, Device, self._DEVICES)
+        self.channels = _ObjectDict(lambda: self.channel_names, self._create_channel_from_name, self._CHANNELS)
+        self.devices = _ObjectDict(lambda: self.device_names, Device, self._DEVICES)
 
     @property
     def task_handle(self):
@@ -407,23 +453,37 @@ class Task(_Base):
     def _preprocess_args(self, name, *args):
         """Injects device_name to all call to the library
         """
-        if name in ('GetErrorString', 'GetExtendedErrorInfo', 'LoadTask', 'CreateTask'):
+        if name in self._UNBOUND:
             return super()._preprocess_args(name, *args)
         else:
             return super()._preprocess_args(name, *((self.task_handle, ) + args))
 
+    def _bound_args(self, name):
+        if name in self._UNBOUND:
+            return ()
+        return (self.task_handle, )
+
     def _create_channel_from_name(self, name):
         return Channel(self, name=name)
 
-    def _channel_names(self):
-        """Return a tuple with the names of all virtual channels in the task.
+    @Feat(read_once=True)
+    def channel_names(self):
+        """Tuple with the names of all virtual channels in the task.
         """
         err, buf = self.lib.GetTaskChannels(*RetStr(default_buf_size))
         names = tuple(n.strip() for n in buf.split(',') if n.strip())
         return names
 
-    def _device_names(self):
-        """Return a tuple with the names of all devices in the task.
+    @Feat(read_once=True)
+    def number_of_channels(self):
+        """Number of virtual channels in the task.
+        """
+        err, value = self.lib.GetTaskNumChans(RetValue('u32'))
+        return value
+
+    @Feat(read_once=True)
+    def device_names(self):
+        """Tuple with the names of all devices in the task.
         """
         err, buf = self.lib.GetTaskDevices(*RetStr(default_buf_size))
         names = tuple(n.strip() for n in buf.split(',') if n.strip())
@@ -440,7 +500,7 @@ class Task(_Base):
         if not isinstance(channel, Channel):
             raise TypeError('Only channels may be added to a task.')
 
-        if channel.task is self.channels:
+        if channel.task is self:
             return
         elif channel.task is None:
             channel.task = self
@@ -466,6 +526,7 @@ class Task(_Base):
         if self.task_handle:
             self.lib.ClearTask()
             self.__task_handle = None
+            self.invalidate_metadata()
 
     __del__ = clear
 
@@ -503,6 +564,7 @@ class Task(_Base):
         """
 
         self.lib.StartTask()
+        self.invalidate_metadata()
 
     @Action()
     def stop(self):
@@ -520,6 +582,7 @@ class Task(_Base):
 
         """
         self.lib.StopTask()
+        self.invalidate_metadata()
 
     @Action()
     def verify(self):
@@ -570,6 +633,7 @@ class Task(_Base):
         :param new_state:
         """
         self.lib.TaskControl(new_state)
+        self.invalidate_metadata()
 
     _register_every_n_samples_event_cache = None
 
@@ -608,7 +672,7 @@ class Task(_Base):
         See also: register_signal_event, register_done_event
         """
 
-        if self.operation_direction == 'input':
+        if self.operation_direction() == 'input':
             event_type = Constants.Val_Acquired_Into_Buffer
         else:
             event_type = Constants.Val_Transferred_From_Buffer
@@ -624,11 +688,11 @@ class Task(_Base):
                 self.register_every_n_samples_event(None, samples=samples, options=options, cb_data=cb_data)
                 # TODO: check the validity of func signature
             # TODO: use wrapper function that converts cb_data argument to given Python object
-            c_func = EveryNSamplesEventCallback_map[self.CHANNEL_TYPE](func)
+            c_func = EveryNSamplesEventCallback(func)
 
         self._register_every_n_samples_event_cache = c_func
 
-        self.lib.RegisterEveryNSamplesEvent(event_type, uInt32(samples), uInt32(options), c_func, cb_data)
+        self.lib.RegisterEveryNSamplesEvent(event_type, Types.uInt32(samples), Types.uInt32(options), c_func, cb_data)
 
     _register_done_event_cache = None
 
@@ -697,13 +761,14 @@ class Task(_Base):
             if self._register_done_event_cache is not None:
                 self.register_done_event(None, options=options, cb_data=cb_data)
                 # TODO: check the validity of func signature
-            c_func = DoneEventCallback_map[self.CHANNEL_TYPE](func)
+            c_func = DoneEventCallback(func)
         self._register_done_event_cache = c_func
 
-        self.lib.RegisterDoneEvent(uInt32(options), c_func, cb_data)
+        self.lib.RegisterDoneEvent(Types.uInt32(options), c_func, cb_data)
 
     def operation_direction(self):
-        return 'input' if self.CHANNEL_TYPE else 'output'
+        io_type = getattr(self, 'IO_TYPE', None) or getattr(self, 'CHANNEL_TYPE', '')
+        return 'input' if io_type.endswith('I') else 'output'
 
     _register_signal_event_cache = None
 
@@ -758,9 +823,9 @@ class Task(_Base):
             if self._register_signal_event_cache is not None:
                 self._register_signal_event(None, signal=signal, options=options, cb_data=cb_data)
                 # TODO: check the validity of func signature
-            c_func = SignalEventCallback_map[self.CHANNEL_TYPE](func)
+            c_func = SignalEventCallback(func)
         self._register_signal_event_cache = c_func
-        self.lib.RegisterSignalEvent(signal, uInt32(options), c_func, cb_data)
+        self.lib.RegisterSignalEvent(signal, Types.uInt32(options), c_func, cb_data)
 
 
     @Action(values=(str, str, _SAMPLE_MODES, None))
@@ -1464,7 +1529,7 @@ class Task(_Base):
 
          This value is the same for all channels in the task.
         """
-        err, value = self.lib.GetReadAvailSampPerChan(*RetValue('u32'))
+        err, value = self.lib.GetReadAvailSampPerChan()
         return value
 
     def samples_per_channel_acquired(self):
@@ -1476,7 +1541,7 @@ class Task(_Base):
         err, value = self.lib.GetReadTotalSampPerChanAcquired(*RetValue('u32'))
         return value
 
-    @Action(units='seconds')
+    @Action(units='seconds', concurrent=True)
     def wait_until_done(self, timeout=-1):
         """Wait for the measurement or generation to complete. Use this
         function to ensure that the specified operation is complete
@@ -1493,6 +1558,22 @@ class Task(_Base):
           If you set timeout to 0, the function checks once and
           returns an error if the measurement or generation is not
           done.
+
+        The task lock is not held while waiting.
+        """
+        fut = self.task_done(timeout)
+        try:
+            return fut.result()
+        except KeyboardInterrupt:
+            fut.cancel()
+            raise
+
+    def task_done(self, timeout=-1):
+        """Return a future resolved when the measurement or generation
+        is complete. Cancelling it aborts the task.
+
+        :param timeout: maximum time to wait in seconds, -1 to wait indefinitely.
+        :rtype: lantz.executors.CancellableFuture
         """
         if timeout < 0:
             timeout = Constants.Val_WaitInfinitely
@@ -1527,6 +1608,7 @@ class Channel(_Base):
         if value is not None:
             self.log_debug('Creating channel {} with {}'.format(self.CREATE_FUN, self._create_args))
             value.execute_fun(self.CREATE_FUN, *self._create_args)
+            value.invalidate_metadata()
 
     def _preprocess_args(self, name, *args):
         """Injects device_name to all call to the library
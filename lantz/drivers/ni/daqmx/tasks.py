@@ -9,9 +9,13 @@
     :license: BSD, see LICENSE for more details.
 """
 
+import threading
+import time
+
 import numpy as np
 
 from lantz import Feat, Action
+from lantz.errors import InstrumentError, LantzTimeoutError
 from lantz.foreign import RetStr, RetTuple, RetValue
 
 from .base import Task, Channel
@@ -21,6 +25,48 @@ _GROUP_BY = {'scan': Constants.Val_GroupByScanNumber,
              'channel': Constants.Val_GroupByChannel}
 
 
+def _check_out(out, dtype, channels, group_by):
+    """Check that an array can be filled in place by a DAQmx read.
+
+    :param out: the array.
+    :param dtype: the data type required by the read function (None for any).
+    :param channels: number of channels in the task.
+    :param group_by: Constants.Val_GroupByScanNumber or Constants.Val_GroupByChannel.
+    :return: the number of samples per channel that fit in out.
+    """
+    if not isinstance(out, np.ndarray):
+        raise TypeError('out must be a numpy.ndarray, not {}'.format(type(out).__name__))
+    if dtype is not None and out.dtype != dtype:
+        raise TypeError('out must be of dtype {}, not {}'.format(np.dtype(dtype), out.dtype))
+    if not out.flags.c_contiguous:
+        raise ValueError('out must be C contiguous')
+    if not out.flags.writeable:
+        raise ValueError('out must be writeable')
+
+    if out.ndim == 1 and channels == 1:
+        return out.shape[0]
+    if out.ndim != 2:
+        raise ValueError('out must have 2 dimensions, not {}'.format(out.ndim))
+
+    if group_by == Constants.Val_GroupByScanNumber:
+        samples, out_channels = out.shape
+    else:
+        out_channels, samples = out.shape
+    if out_channels != channels:
+        raise ValueError('out has room for {} channels, the task has {}'.format(out_channels, channels))
+    return samples
+
+
+def _trim(data, count, samples_per_channel, group_by):
+    """Return a view of the samples actually read.
+    """
+    if count >= samples_per_channel:
+        return data
+    if group_by == Constants.Val_GroupByScanNumber or data.ndim == 1:
+        return data[:count]
+    return data[:, :count]
+
+
 
 class AnalogInputTask(Task):
     """Analog Input Task
@@ -28,6 +74,26 @@ class AnalogInputTask(Task):
 
     IO_TYPE = 'AI'
 
+    #: Number of blocks kept by start_stream.
+    RING_SIZE = 64
+
+    #: Blocks of the stream, shape (ring size, channels, samples) or
+    #: (ring size, samples, channels) when grouped by scan.
+    ring = None
+
+    #: time.monotonic() at which each block of the ring was read.
+    ring_times = None
+
+    #: Number of blocks read since start_stream.
+    acquired = 0
+
+    #: Number of blocks skipped by blocks() because they were overwritten.
+    overruns = 0
+
+    _streaming = False
+    _stream_condition = None
+    _stream_error = None
+
     @Feat()
     def max_convert_rate(self):
         """Maximum convert rate supported by the task, given the current
@@ -125,22 +191,189 @@ class AnalogInputTask(Task):
         if samples_per_channel is None:
             samples_per_channel = self.samples_per_channel_available()
 
-        number_of_channels = self.number_of_channels()
+        number_of_channels = self.number_of_channels
         if group_by == Constants.Val_GroupByScanNumber:
-            data = np.zeros((samples_per_channel, number_of_channels), dtype=np.float64)
+            data = np.empty((samples_per_channel, number_of_channels), dtype=np.float64)
         else:
-            data = np.zeros((number_of_channels, samples_per_channel), dtype=np.float64)
+            data = np.empty((number_of_channels, samples_per_channel), dtype=np.float64)
 
-        err, data, count = self.lib.ReadAnalogF64(samples_per_channel, timeout, group_by,
-                                                  data.ctypes.data, data.size, RetValue('i32'), None)
+        count = self._read_into(data, samples_per_channel, timeout, group_by)
+        return _trim(data, count, samples_per_channel, group_by)
 
-        if samples_per_channel < count:
-            if group_by == 'scan':
-                return data[:count]
-            else:
-                return data[:,:count]
+    @Action(units=(None, 'seconds', None), values=(None, None, _GROUP_BY))
+    def read_into(self, out, timeout=10.0, group_by='channel'):
+        """Read floating-point samples directly into a caller owned array
+        (e.g. a slice of a numpy.memmap or an array in shared memory),
+        filling it completely unless the timeout elapses.
+
+        :param out: C contiguous float64 array of shape (channels, samples)
+                    when grouped by channel or (samples, channels) when
+                    grouped by scan. A 1D array is accepted for single
+                    channel tasks.
+        :param timeout: see read (in seconds).
+        :param group_by: see read.
+        :return: the number of samples per channel read.
+        """
+        samples_per_channel = _check_out(out, np.float64, self.number_of_channels, group_by)
+        return self._read_into(out, samples_per_channel, timeout, group_by)
 
-        return data
+    def _read_into(self, out, samples_per_channel, timeout, group_by):
+        err, count = self.lib.ReadAnalogF64(samples_per_channel, timeout, group_by,
+                                            out.ctypes.data, out.size)
+        return count
+
+    def start_stream(self, samples_per_block, ring_size=None, timeout=10.0, group_by='channel'):
+        """Start the task and acquire continuously into a ring of
+        preallocated blocks (`ring`).
+
+        Each time the device acquires samples_per_block samples per channel,
+        they are read in place into the next block of the ring from the
+        every N samples event. The task must be configured for continuous
+        acquisition (e.g. with configure_timing_sample_clock) and the
+        DAQmx buffer should hold several blocks.
+
+        :param samples_per_block: samples per channel in each block.
+        :param ring_size: number of blocks kept (RING_SIZE by default).
+        :param timeout: maximum time to read a block in seconds.
+        :param group_by: 'channel' or 'scan' (see read).
+        """
+        if self._streaming:
+            raise RuntimeError('Stream already started')
+
+        group_by = _GROUP_BY[group_by]
+        channels = self.number_of_channels
+        ring_size = ring_size or self.RING_SIZE
+        if group_by == Constants.Val_GroupByScanNumber:
+            shape = (ring_size, samples_per_block, channels)
+        else:
+            shape = (ring_size, channels, samples_per_block)
+
+        if self.ring is None or self.ring.shape != shape:
+            self.ring = np.zeros(shape, dtype=np.float64)
+            self.ring_times = np.zeros(ring_size)
+
+        self._block_pointers = [block.ctypes.data for block in self.ring]
+        self._stream_args = (samples_per_block, timeout, group_by, self.ring[0].size)
+        self._stream_condition = threading.Condition()
+        self.acquired = 0
+        self.overruns = 0
+        self._stream_error = None
+        self._streaming = True
+
+        try:
+            self.register_every_n_samples_event(self._on_samples, samples_per_block)
+            self.start()
+        except Exception:
+            self._streaming = False
+            raise
+
+    def stop_stream(self):
+        """Stop the task and the continuous acquisition started by start_stream.
+        """
+        if not self._streaming:
+            return
+        self._streaming = False
+        try:
+            self.stop()
+            self.register_every_n_samples_event(None, self._stream_args[0])
+        finally:
+            with self._stream_condition:
+                self._stream_condition.notify_all()
+
+    def _on_samples(self, task_handle, event_type, samples, cb_data):
+        """Every N samples event callback (called from a DAQmx thread).
+        """
+        if not self._streaming:
+            return 0
+
+        samples_per_block, timeout, group_by, size = self._stream_args
+        position = self.acquired % len(self.ring)
+        condition = self._stream_condition
+        try:
+            tic = time.monotonic()
+            err, count = self.lib.ReadAnalogF64(samples_per_block, timeout, group_by,
+                                                self._block_pointers[position], size)
+            if count != samples_per_block:
+                raise InstrumentError('Read {} of {} samples per channel'.format(count, samples_per_block))
+        except Exception as e:
+            # Exceptions cannot propagate to the library.
+            self.log_error('Stream stopped: {!r}', e)
+            self._stream_error = e
+            self._streaming = False
+            with condition:
+                condition.notify_all()
+            return 0
+
+        self.ring_times[position] = now = time.monotonic()
+        self.timing.add('stream_read', now - tic)
+        with condition:
+            self.acquired += 1
+            condition.notify_all()
+        return 0
+
+    def wait_block(self, index=None, timeout=None):
+        """Wait for a block of the stream and return a view of it in the
+        ring (copy it to keep it for longer than `len(ring) - 1` blocks).
+
+        :param index: number of the block since start_stream (by default, the next one).
+        :param timeout: maximum time to wait in seconds.
+        :raises: IndexError if the block was (or is being) overwritten.
+        :rtype: numpy.ndarray
+        """
+        condition = self._stream_condition
+        if condition is None:
+            raise RuntimeError('Stream not started')
+        with condition:
+            if index is None:
+                index = self.acquired
+            if not condition.wait_for(lambda: self.acquired > index or not self._streaming, timeout):
+                raise LantzTimeoutError('Block {} not acquired in {} s'.format(index, timeout))
+            if self.acquired <= index:
+                raise RuntimeError('Stream stopped') from self._stream_error
+            # The position of block index + len(ring) is filled by the
+            # next read, once acquired == index + len(ring).
+            if self.acquired - index >= len(self.ring):
+                raise IndexError('Block {} was overwritten'.format(index))
+            return self.ring[index % len(self.ring)]
+
+    def blocks(self, start=None, timeout=None, skip_overruns=False):
+        """Iterate over the blocks of the stream until it is stopped,
+        yielding views in the ring.
+
+        Each block must be consumed (or copied) before the stream
+        overwrites it, i.e. before `len(ring) - 1` more blocks are acquired.
+
+        :param start: number of the first block (by default, the next one).
+        :param timeout: maximum time to wait for each block in seconds.
+        :param skip_overruns: if True, overwritten blocks are skipped and
+                              counted in `overruns` instead of raising IndexError.
+        """
+        condition = self._stream_condition
+        if condition is None:
+            raise RuntimeError('Stream not started')
+        index = self.acquired if start is None else start
+        while True:
+            with condition:
+                if not self._streaming and self.acquired <= index:
+                    if self._stream_error is not None:
+                        raise RuntimeError('Stream stopped') from self._stream_error
+                    return
+            try:
+                block = self.wait_block(index, timeout)
+            except IndexError:
+                if not skip_overruns:
+                    raise
+                # Resume from the oldest block that will not be overwritten soon.
+                oldest = self.acquired - len(self.ring) + 1
+                self.overruns += oldest - index
+                index = oldest
+                continue
+            except RuntimeError:
+                if self._stream_error is not None:
+                    raise
+                return
+            yield block
+            index += 1
 
 
 class AnalogOutputTask(Task):
@@ -198,7 +431,7 @@ class AnalogOutputTask(Task):
 
         data = np.asarray(data, dtype = np.float64)
 
-        number_of_channels = self.number_of_channels()
+        number_of_channels = self.number_of_channels
 
         if data.ndims == 1:
             if number_of_channels == 1:
@@ -311,24 +544,40 @@ class DigitalTask(Task):
             c = 1
             dtype = np.uint8
 
-        number_of_channels = self.number_of_channels()
+        number_of_channels = self.number_of_channels
 
         if group_by == Constants.Val_GroupByScanNumber:
-            data = np.zeros((samples_per_channel, number_of_channels),dtype=dtype)
+            data = np.empty((samples_per_channel, number_of_channels), dtype=dtype)
         else:
-            data = np.zeros((number_of_channels, samples_per_channel),dtype=dtype)
-
-        err, count, bps = self.lib.ReadDigitalLines(samples_per_channel, float64 (timeout),
-              group_by, data.ctypes.data, uInt32 (data.size * c),
-              RetValue('i32'), RetValue('i32'),
-              None
-        )
-        if count < samples_per_channel:
-            if group_by == 'scan':
-                return data[:count], bps
-            else:
-                return data[:,:count], bps
-        return data, bps
+            data = np.empty((number_of_channels, samples_per_channel), dtype=dtype)
+
+        count, bps = self._read_into(data, samples_per_channel, timeout, group_by)
+        return _trim(data, count, samples_per_channel, group_by), bps
+
+    @Action(units=(None, 'seconds', None), values=(None, None, _GROUP_BY))
+    def read_into(self, out, timeout=10.0, group_by='scan'):
+        """Read samples of the digital lines directly into a caller owned
+        array, filling it completely unless the timeout elapses.
+
+        :param out: C contiguous array of an unsigned integer dtype with
+                    one byte per line (e.g. uint8 for channels of one line),
+                    of shape (samples, channels) when grouped by scan or
+                    (channels, samples) when grouped by channel.
+                    A 1D array is accepted for single channel tasks.
+        :param timeout: see read (in seconds).
+        :param group_by: see read.
+        :return: the number of samples per channel read and
+                 the number of bytes per sample.
+        """
+        samples_per_channel = _check_out(out, None, self.number_of_channels, group_by)
+        if out.dtype.kind != 'u':
+            raise TypeError('out must be of an unsigned integer dtype, not {}'.format(out.dtype))
+        return self._read_into(out, samples_per_channel, timeout, group_by)
+
+    def _read_into(self, out, samples_per_channel, timeout, group_by):
+        err, count, bps = self.lib.ReadDigitalLines(samples_per_channel, timeout, group_by,
+                                                    out.ctypes.data, out.nbytes)
+        return count, bps
 
 
 class DigitalInputTask(DigitalTask):
@@ -396,7 +645,7 @@ class DigitalOutputTask(DigitalTask):
             'group_by_scan_number' - Group by scan number (interleaved).
         """
 
-        number_of_channels = self.get_number_of_channels()
+        number_of_channels = self.number_of_channels
 
         if np.isscalar(data):
             data = np.array([data]*number_of_channels, dtype = np.uint8)
@@ -506,12 +755,26 @@ class CounterInputTask(Task):
         if samples_per_channel is None:
             samples_per_channel = self.samples_per_channel_available()
 
-        data = np.zeros((samples_per_channel,),dtype=np.int32)
+        data = np.empty((samples_per_channel,), dtype=np.uint32)
+        count = self._read_into(data, samples_per_channel, timeout)
+        return data[:count]
 
-        err, count = self.lib.ReadCounterU32(samples_per_channel, float64(timeout),
-                                             data.ctypes.data, data.size, RetValue('i32'), None)
+    @Action(units=(None, 'seconds'))
+    def read_into(self, out, timeout=10.0):
+        """Read 32-bit integer samples directly into a caller owned
+        array, filling it completely unless the timeout elapses.
 
-        return data[:count]
+        :param out: C contiguous 1D uint32 array.
+        :param timeout: see read (in seconds).
+        :return: the number of samples read.
+        """
+        samples_per_channel = _check_out(out, np.uint32, 1, Constants.Val_GroupByChannel)
+        return self._read_into(out, samples_per_channel, timeout)
+
+    def _read_into(self, out, samples_per_channel, timeout):
+        err, count = self.lib.ReadCounterU32(samples_per_channel, timeout,
+                                             out.ctypes.data, out.size)
+        return count
 
 
 class CounterOutputTask(Task):
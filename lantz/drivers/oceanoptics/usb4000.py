@@ -11,11 +11,14 @@
 
 
 import struct
-import numpy as np
+import threading
+import time
+from array import array
 
-from pyvisa.errors import VisaIOError
+import numpy as np
 
 from lantz import Feat, DictFeat
+from lantz.errors import InstrumentError, LantzTimeoutError
 from lantz.drivers.legacy.usb import USBDriver, usb_find_desc
 
 __all__ = ['USB4000']
@@ -71,11 +74,38 @@ class USB4000(USBDriver):
     """Ocean Optics spectrometer
     """
 
+    #: Number of pixels in a spectrum.
+    PIXELS = 3840
+    #: Number of pixels read from the low endpoint (high speed USB).
+    PIXELS_LO = 1024
+    #: Default number of spectra in the acquisition ring.
+    RING_SIZE = 64
+
     def __init__(self, serial_number=None, **kwargs):
         super().__init__(vendor=0x2457, product=0x1022, serial_number=serial_number, **kwargs)
 
-        self._spec_hi = usb_find_desc(self.usb_inf, bEndpointAddress=0x82)
-        self._spec_lo = usb_find_desc(self.usb_inf, bEndpointAddress=0x86)
+        self._spec_hi = usb_find_desc(self.usb_intf, bEndpointAddress=0x82)
+        self._spec_lo = usb_find_desc(self.usb_intf, bEndpointAddress=0x86)
+
+        # Transfer buffers reused for every spectrum, viewed as pixels.
+        self._data_lo = array('B', bytes(2 * self.PIXELS_LO))
+        self._data_hi = array('B', bytes(2 * (self.PIXELS - self.PIXELS_LO)))
+        self._data_sync = array('B', bytes(1))
+        self._pixels_lo = np.frombuffer(self._data_lo, dtype='<u2')
+        self._pixels_hi = np.frombuffer(self._data_hi, dtype='<u2')
+
+        #: Ring of spectra filled by the acquisition thread.
+        #: :type: numpy.ndarray
+        self.ring = None
+        #: Acquisition time (time.monotonic) of each spectrum in the ring.
+        #: :type: numpy.ndarray
+        self.ring_times = None
+        #: Number of spectra acquired since start_acquisition.
+        self.acquired = 0
+        self._acquiring = False
+        self._acquisition_thread = None
+        self._acquisition_error = None
+        self._acquired_condition = threading.Condition()
 
         # initialize spectrometer
         self.initialize()
@@ -116,10 +146,14 @@ class USB4000(USBDriver):
             
         return config
             
+    def finalize(self):
+        self.stop_acquisition()
+        return super().finalize()
+
     def reset(self):
         self.usb.reset()
 
-    @Feat(units='degree_celsius')
+    @Feat(units='degC')
     def pcb_temperature(self):
         cmd = struct.pack('<B', 0x6C)
         self.usb_send_ep.write(cmd)        
@@ -152,31 +186,127 @@ class USB4000(USBDriver):
         cmd = struct.pack('<BH', 0x0A, mode)
         self.usb_send_ep.write(cmd)
 
-    def request_spectra(self):
+    def request_spectra(self, out=None):
+        """Request and read a spectrum.
+
+        The data is received into transfer buffers allocated once,
+        and copied into `out` (or into a new array if not given).
+
+        :param out: array of PIXELS unsigned 16 bit integers to be filled.
+        :raises: InstrumentError if the spectrum is not received
+                 or it is not synchronized.
+        :rtype: numpy.ndarray
+        """
         cmd = struct.pack('<B', 0x09)
         self.log_debug('Requesting spectra')
-        self.usb_send_ep.write(cmd)
-        
-        data = np.zeros(shape=(3840,), dtype='<u2')
-        
-        try:
-            data_lo = self._spec_lo.read(512*4, timeout=100)
-            data_hi = self._spec_hi.read(512*11, timeout=100)
+        self.raw_send(cmd)
+
+        if out is None:
+            out = np.zeros(shape=(self.PIXELS,), dtype='<u2')
+
+        self.raw_recv_into(self._data_lo, self._spec_lo, 100)
+        self.raw_recv_into(self._data_hi, self._spec_hi, 100)
+        self.raw_recv_into(self._data_sync, self._spec_hi, 100)
+
+        if self._data_sync[0] != 0x69:
+            raise InstrumentError('Spectrum not synchronized (sync byte {:#x})'.format(self._data_sync[0]))
 
-            data_sync = self._spec_hi.read(1, timeout=100)
+        out[:self.PIXELS_LO] = self._pixels_lo
+        out[self.PIXELS_LO:] = self._pixels_hi
+        self.log_debug('Obtained spectra')
 
-            assert struct.unpack('<B', data_sync)[0] == 0x69
+        return out
 
-            data[:1024], data[1024:] = np.frombuffer(data_lo, dtype='<u2'), \
-                                       np.frombuffer(data_hi, dtype='<u2')
-        except AssertionError:
-            self.log_error('Not synchronized')
-        except VisaIOError:
-            self.log_error('Timeout on usb')
-        finally:
-            self.log_debug('Obtained spectra')
+    def start_acquisition(self, ring_size=None):
+        """Acquire spectra continuously in a background thread, filling
+        a ring of preallocated spectra (`ring`).
 
-        return data
+        :param ring_size: number of spectra kept (RING_SIZE by default).
+        """
+        if self._acquiring:
+            raise RuntimeError('Acquisition already started')
+
+        ring_size = ring_size or self.RING_SIZE
+        if self.ring is None or len(self.ring) != ring_size:
+            self.ring = np.zeros((ring_size, self.PIXELS), dtype='<u2')
+            self.ring_times = np.zeros(ring_size)
+
+        self.acquired = 0
+        self._acquisition_error = None
+        self._acquiring = True
+        self._acquisition_thread = threading.Thread(target=self._acquire,
+                                                    name='{}-acquisition'.format(self.name),
+                                                    daemon=True)
+        self._acquisition_thread.start()
+
+    def stop_acquisition(self):
+        """Stop the continuous acquisition, waiting for the spectrum in progress.
+        """
+        self._acquiring = False
+        if self._acquisition_thread is not None:
+            self._acquisition_thread.join()
+            self._acquisition_thread = None
+
+    def _acquire(self):
+        ring, times = self.ring, self.ring_times
+        size = len(ring)
+        condition = self._acquired_condition
+        try:
+            while self._acquiring:
+                position = self.acquired % size
+                with self._lock:
+                    self.request_spectra(ring[position])
+                times[position] = time.monotonic()
+                with condition:
+                    self.acquired += 1
+                    condition.notify_all()
+        except Exception as e:
+            self.log_error('Acquisition stopped: {!r}', e)
+            self._acquisition_error = e
+            self._acquiring = False
+            with condition:
+                condition.notify_all()
+
+    def wait_spectrum(self, index=None, timeout=None, out=None):
+        """Wait for a spectrum of the continuous acquisition.
+
+        Without `out`, a view of the spectrum in the ring is returned. It is
+        only valid until the acquisition thread reaches its position again,
+        that is while fewer than `len(ring)` newer spectra are requested
+        (copy it, or give `out`, to keep it for longer).
+
+        :param index: number of the spectrum since start_acquisition
+                      (by default, the next one).
+        :param timeout: maximum time to wait in seconds.
+        :param out: array of PIXELS unsigned 16 bit integers in which the
+                    spectrum is copied.
+        :raises: IndexError if the spectrum was (or was being) overwritten,
+                 or the error that stopped the acquisition before the spectrum.
+        :rtype: numpy.ndarray
+        """
+        condition = self._acquired_condition
+        with condition:
+            if index is None:
+                index = self.acquired
+            if not condition.wait_for(lambda: self.acquired > index or not self._acquiring, timeout):
+                raise LantzTimeoutError('Spectrum {} not acquired in {} s'.format(index, timeout))
+            if self.acquired <= index:
+                if self._acquisition_error is not None:
+                    raise self._acquisition_error
+                raise RuntimeError('Acquisition stopped')
+
+        size = len(self.ring)
+        # The position of spectrum index + size is being filled
+        # while acquired == index + size.
+        if self.acquired - index >= size:
+            raise IndexError('Spectrum {} was overwritten'.format(index))
+        if out is None:
+            return self.ring[index % size]
+
+        out[:] = self.ring[index % size]
+        if self.acquired - index >= size:
+            raise IndexError('Spectrum {} was overwritten while copying'.format(index))
+        return out
 
     def get_status(self):
         cmd = struct.pack('<B', 0xFE)
@@ -17,7 +17,6 @@
     :license: BSD, see LICENSE for more details.
 """
 
-from time import sleep
 from collections import namedtuple
 
 import ctypes as ct
@@ -249,9 +248,8 @@ class Sensicam(LibraryDriver):
         self.exposure_time = exposure
         delay = self.coc_time()
         self.run_coc()
-        sleep(delay / 1000)
-        while not (self.image_status & Status.COC_RUNNING):
-            sleep(delay / 1000 * .1)
+        self.poll_until(lambda: self.image_status & Status.COC_RUNNING,
+                        expected=delay / 1000, name='expose')
 
     @Action()
     def read_out(self):
@@ -11,15 +11,109 @@
     :license: BSD, see LICENSE for more details.
 """
 
+import re
+
 from lantz import Action, Feat, Driver
 from lantz.drivers.ieee4882 import IEEE4882Driver
+from lantz.processors import ParseProcessor
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+_LOWERCASE = re.compile('[a-z]+')
+
+
+def short_form(command):
+    """Return the short form of a SCPI command written with the
+    optional part of each mnemonic in lowercase.
+
+        >>> short_form('MEASure:VOLTage:DC?')
+        'MEAS:VOLT:DC?'
+
+    The parameters (after the first space) are kept.
+    """
+    header, sep, parameters = command.partition(' ')
+    return _LOWERCASE.sub('', header) + sep + parameters
+
+
+def _parse_int(value):
+    try:
+        return int(value)
+    except ValueError:
+        return int(float(value))
+
+
+def _parse_bool(value):
+    value = value.strip().upper()
+    if value in ('1', 'ON'):
+        return True
+    if value in ('0', 'OFF'):
+        return False
+    raise ValueError('Invalid SCPI boolean {!r}'.format(value))
+
 
+def _parse_enum(value):
+    return value.strip().strip('"\'').upper()
 
-def build_feat(command, **kwargs):
+
+def _parse_vector(value):
+    if np is None:
+        return [float(item) for item in value.split(',')]
+    return np.array(value.split(','), dtype=float)
+
+
+def _format_vector(value):
+    return ','.join(str(item) for item in value)
+
+
+#: Parsers and formatters for each response type.
+#: :type: dict[str, (callable, callable)]
+RESPONSE_TYPES = {
+    'str': (str.strip, str),
+    'float': (float, lambda value: repr(float(value))),
+    'int': (_parse_int, lambda value: str(int(value))),
+    'bool': (_parse_bool, lambda value: '1' if value else '0'),
+    'enum': (_parse_enum, str),
+    'vector': (_parse_vector, _format_vector),
+    'block': (None, None),
+}
+
+
+def _response_functions(response):
+    """Return the (parser, formatter) for a response type.
+
+    :param response: a key of RESPONSE_TYPES, a stringparser format
+                     (e.g. '{:f},{:f}') or a callable.
+    """
+    if response is None:
+        return None, str
+    if callable(response):
+        return response, str
+    if response in RESPONSE_TYPES:
+        return RESPONSE_TYPES[response]
+    if '{' in response:
+        return ParseProcessor(response), str
+    raise ValueError('Unknown response type {!r}. '
+                     'Use one of {}, a format or a callable.'.format(response, ', '.join(RESPONSE_TYPES)))
+
+
+def build_feat(command, response=None, dtype='u1', **kwargs):
     """Builds a feat with with SCPI. Can be used as decorator
     for an empty function providing only the name and docstring.
 
-    :param command: SCPI command
+    :param command: SCPI command. Write the optional part of each mnemonic
+                    in lowercase (e.g. 'SOURce:FREQuency') to send the short
+                    form in drivers with SHORT_FORM enabled.
+    :param response: type of the response, used to parse the answer and to
+                     format the value sent by the setter. One of 'str',
+                     'float', 'int', 'bool', 'enum' (unquoted, uppercase),
+                     'vector' (comma separated floats) and 'block'
+                     (IEEE 488.2 binary block), a stringparser format or
+                     a callable. By default the answer is returned unchanged.
+    :param dtype: data type of the elements of a binary block.
 
     Keyword arguments will be given to the Feat constructor.
     (e.g. units, limits, etc)
@@ -30,33 +124,65 @@ def build_feat(command, **kwargs):
 
     Example:
 
-        @build_feat('MEAS')
+        @build_feat('MEASure:VOLTage:DC', response='float', units='V')
         def measure():
             "Meas docstring"
 
     If the command ends in ?, the Feat will be read only (no setter)
     If you want a write only Feat (no getter), append a ! to the command.
     (but consider if this is not actually an action)
+
+    The encoded commands are cached per Feat for each combination of
+    termination, encoding and short form.
     """
 
     if 'values' in kwargs and isinstance(kwargs['values'], str):
         kwargs['values'] = set(kwargs['values'].split('|'))
 
+    parse, format_value = _response_functions(response)
+
+    #: (short form, termination, encoding) -> (query bytes, setter prefix bytes, termination bytes)
+    encoded = {}
+
+    def _encoded(self):
+        resource = self.resource
+        key = (getattr(self, 'SHORT_FORM', False), resource.write_termination or '', resource.encoding)
+        try:
+            return encoded[key]
+        except KeyError:
+            short, termination, encoding = key
+            header = short_form(command) if short else command
+            query = header if header.endswith('?') else header + '?'
+            value = encoded[key] = (bytes(query + termination, encoding),
+                                    bytes(header + ' ', encoding),
+                                    bytes(termination, encoding))
+            return value
+
     def deco(func):
 
         nonlocal command
         if command.endswith('!'):
             command = command[:-1]
             getter = None
+        elif response == 'block':
+            def getter(self):
+                self.write_raw(_encoded(self)[0])
+                return self.read_block(dtype)
+        elif parse is None:
+            def getter(self):
+                self.write_raw(_encoded(self)[0])
+                return self.read()
         else:
             def getter(self):
-                return self.query(command + '?')
+                self.write_raw(_encoded(self)[0])
+                return parse(self.read())
 
-        if command.endswith('?'):
+        if command.endswith('?') or response == 'block':
             setter = None
         else:
             def setter(self, value):
-                return self.send(command + str(value))
+                _, prefix, termination = _encoded(self)
+                return self.write_raw(prefix + bytes(format_value(value), self.resource.encoding) + termination)
 
         return Feat(getter, setter, doc=func.__doc__, **kwargs)
 
@@ -68,3 +194,7 @@ class SCPIDriver(IEEE4882Driver):
 
     You can use it as a mixin class.
     """
+
+    #: Send the short form of the commands declared with build_feat
+    #: (e.g. MEAS:VOLT instead of MEASure:VOLTage), useful in slow links.
+    SHORT_FORM = False
@@ -87,12 +87,29 @@ SAMPLE_RATES = OrderedDict([
 ])
 
 
+#: Format of the points transferred with TRCL (non-IEEE binary).
+_TRCL_DTYPE = np.dtype([('mantissa', '<i2'), ('exponent', '<i2')])
+
+#: Parameter of SNAP? returning the same value as each query.
+_SNAP_PARAMETERS = {'OUTP? 1': 1, 'OUTP? 2': 2, 'OUTP? 3': 3, 'OUTP? 4': 4,
+                    'OAUX? 1': 5, 'OAUX? 2': 6, 'OAUX? 3': 7, 'OAUX? 4': 8,
+                    'FREQ?': 9, 'OUTR? 1': 10, 'OUTR? 2': 11}
+
+
 class SR830(MessageBasedDriver):
 
     DEFAULTS = {'COMMON': {'write_termination': '\n',
                            'read_termination': '\n',
                           }}
 
+    #: Read together with SNAP? (see batch_query).
+    BATCH_QUERIES = {'frequency': 'FREQ?',
+                     'x': 'OUTP? 1', 'y': 'OUTP? 2',
+                     'r': 'OUTP? 3', 'theta': 'OUTP? 4'}
+
+    #: SNAP? takes at most 6 parameters.
+    BATCH_SIZE = 6
+
 
     @Feat(units='degrees', limits=(-360, 729.99, 0.01))
     def reference_phase_shift(self):
@@ -343,8 +360,13 @@ class SR830(MessageBasedDriver):
 
     ## AUTO FUNCTIONS
 
-    def wait_bit1(self):
-        pass
+    def wait_bit1(self, timeout=None):
+        """Wait until no command execution is in progress
+        (bit 1 of the serial poll status byte), polling with backoff.
+
+        :param timeout: maximum time to wait in seconds.
+        """
+        self.poll_until(lambda: self.query('*STB? 1') == '1', timeout)
 
     @Action()
     def auto_gain_async(self):
@@ -469,6 +491,30 @@ class SR830(MessageBasedDriver):
         else:
             return self.query('OUTR? {}'.format(key))
 
+    @Feat(units='volt')
+    def x(self):
+        """In phase component of the signal.
+        """
+        return self.query('OUTP? 1')
+
+    @Feat(units='volt')
+    def y(self):
+        """Quadrature component of the signal.
+        """
+        return self.query('OUTP? 2')
+
+    @Feat(units='volt')
+    def r(self):
+        """Magnitude of the signal.
+        """
+        return self.query('OUTP? 3')
+
+    @Feat(units='degrees')
+    def theta(self):
+        """Phase of the signal.
+        """
+        return self.query('OUTP? 4')
+
     @Action()
     def measure(self, channels):
         d = {'x': '1', 'y': '2', 'r': '3', 't': '4',
@@ -477,6 +523,23 @@ class SR830(MessageBasedDriver):
         channels = ','.join(d[ch] for ch in channels)
         self.query('SNAP? {}'.format(channels))
 
+    def batch_query(self, commands):
+        """Read the values of several queries at the same instant using SNAP?.
+
+        :param commands: queries listed in _SNAP_PARAMETERS (at most 6).
+        :type commands: list[str]
+        :rtype: list[str]
+        """
+        if len(commands) == 1:
+            # SNAP? requires at least two parameters.
+            return [self.query(commands[0])]
+        parameters = ','.join(str(_SNAP_PARAMETERS[command]) for command in commands)
+        answer = self.query('SNAP? {}'.format(parameters))
+        answers = answer.split(',')
+        if len(answers) != len(commands):
+            raise ValueError('Expected {} answers for {!r}, got {!r}'.format(len(commands), commands, answer))
+        return answers
+
     # OAUX See above
 
     @Feat()
@@ -493,19 +556,31 @@ class SR830(MessageBasedDriver):
                        Defaults to the number of points in the buffer.
         :param format: Transfer format
                       'a': ASCII (slow)
-                      'b': IEEE Binary (fast) - NOT IMPLEMENTED
-                      'c': Non-IEEE Binary (fastest) - NOT IMPLEMENTED
+                      'b': IEEE Binary (fast)
+                      'c': Non-IEEE Binary (fastest)
         """
 
-        cmd = 'TRCA'
+        try:
+            cmd = {'a': 'TRCA', 'b': 'TRCB', 'c': 'TRCL'}[format.lower()]
+        except KeyError:
+            raise ValueError('{} transfer format is not implemented'.format(format))
+
         if not length:
             length = self.buffer_length
-        self.send('{}? {},{},{}'.format(cmd, channel, start, length))
+        command = '{}? {},{},{}'.format(cmd, channel, start, length)
         if cmd == 'TRCA':
-            data = self.recv()
+            data = self.query(command)
             return np.fromstring(data, sep=',') * ureg.volt
+
+        # Binary transfers have no header (see read_array).
+        self.write(command)
+        if cmd == 'TRCB':
+            # Little endian IEEE floats, without header.
+            return self.read_array(length, '<f4') * ureg.volt
         else:
-            raise ValueError('{} transfer format is not implemented'.format(format))
+            # Little endian 16 bit mantissa and exponent, without header.
+            data = self.read_array(length, _TRCL_DTYPE)
+            return np.ldexp(data['mantissa'], data['exponent'] - 124) * ureg.volt
 
     # Fast
     # STRD
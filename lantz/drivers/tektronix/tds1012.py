@@ -80,8 +80,7 @@ class TDS1012(MessageBasedDriver):
     def data_setup(self):
         """ Sets the way data is going to be encoded for sending. 
         """
-        self.send('DAT:ENC ASCI;WID 2') #ASCII is the least efficient way, but
-                                        # couldn't make the binary mode to work
+        self.send('DAT:ENC RIB;WID 2')
 
     @Action()
     def acquire_curve(self,start=1,stop=2500):
@@ -92,13 +91,11 @@ class TDS1012(MessageBasedDriver):
         self.data_setup() 
         self.send('DAT:STAR {}'.format(start))
         self.send('DAT:STOP {}'.format(stop))
-        data = self.query('CURV?')
-        data = data.split(',')
-        data = np.array(list(map(float,data)))
-        ydata = (data - parameters['YOF']) * parameters['YMU']\
-                + parameters['YZE']
-        xdata = np.arange(len(data))*parameters['XIN'] + parameters['XZE']
-        return list(xdata), list(ydata)
+        # RIB with width 2 is big endian signed 16 bit integers.
+        ydata = self.query_block('CURV?', '>i2',
+                                 scaling=(parameters['YMU'], parameters['YOF'], parameters['YZE']))
+        xdata = np.arange(len(ydata))*parameters['XIN'] + parameters['XZE']
+        return xdata, ydata
         
     
     @Action()
@@ -9,8 +9,6 @@
     :license: BSD, see LICENSE for more details.
 """
 
-import struct
-
 import numpy as np
 
 from lantz.feat import Feat
@@ -95,26 +93,15 @@ class TDS2024(MessageBasedDriver):
         """Get data.
 
             Returns:
-            xdata, data as list
+            xdata, ydata as NumPy arrays
         """
         self.dataencoding()
-        self.send('CURV?')
-        answer = self.recv()
-        numdigs = int(answer[1])
-        bytecount = int(answer[2:2+numdigs])
-        data = answer[2+numdigs:]
-        length = bytecount / 2
-        data = struct.unpack("{}H".format(length), data[0:2*length])
         params = self.acqparams()
-        data = np.array(list(map(float, data)))
-        yoff = params['YOFF?']
-        ymu = params['YMU?']
-        yze = params['YZE?']
-        xin = params['XIN?']
-        xze = params['XZE?']
-        ydata = ( data - yoff) * ymu + yze
-        xdata = np.arange(len(data)) * xin + xze
-        return list(xdata), list(data)
+        # RPB with width 2 is big endian unsigned 16 bit integers.
+        ydata = self.query_block('CURV?', '>u2',
+                                 scaling=(params['YMU?'], params['YOFF?'], params['YZE?']))
+        xdata = np.arange(len(ydata)) * params['XIN?'] + params['XZE?']
+        return xdata, ydata
 
     def _measure(self, type, source):
         self.send('MEASUrement:IMMed:TYPe {}'.format(type))
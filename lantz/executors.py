@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+    lantz.executors
+    ~~~~~~~~~~~~~~~
+
+    Implements the executors used to run the asynchronous methods of drivers.
+
+    :copyright: 2015 by Lantz Authors, see AUTHORS for more details.
+    :license: BSD, see LICENSE for more details.
+"""
+
+import asyncio
+import threading
+from collections import deque
+from concurrent import futures
+
+#: Maximum number of threads in the process wide shared pool.
+SHARED_MAX_WORKERS = 16
+
+_shared_pool = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_pool():
+    """Return the process wide thread pool, creating it if necessary.
+
+    :rtype: concurrent.futures.ThreadPoolExecutor
+    """
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None:
+            _shared_pool = futures.ThreadPoolExecutor(max_workers=SHARED_MAX_WORKERS)
+        return _shared_pool
+
+
+class Future(futures.Future):
+    """A concurrent.futures.Future that can also be awaited
+    within an asyncio event loop.
+    """
+
+    def __await__(self):
+        return asyncio.wrap_future(self).__await__()
+
+
+class CancellableFuture(Future):
+    """A Future of a call that can be interrupted while running.
+
+    Cancelling it while running calls the canceller (e.g. the abort
+    function of the instrument library), which should make the call
+    return early. The future is then cancelled when the call finishes
+    with an exception.
+
+    :param canceller: callable without arguments, or None if the running
+                      call cannot be interrupted.
+    """
+
+    def __init__(self, canceller=None):
+        super().__init__()
+        self.canceller = canceller
+
+        #: True if the canceller has been called.
+        self.interrupted = False
+
+    def cancel(self):
+        if super().cancel():
+            return True
+        if self.canceller is None or self.done():
+            return False
+        self.interrupted = True
+        self.canceller()
+        return True
+
+    def cancelled(self):
+        if super().cancelled():
+            return True
+        return self.interrupted and self.done() and isinstance(self.exception(), futures.CancelledError)
+
+    def set_exception(self, exception):
+        if self.interrupted and not isinstance(exception, futures.CancelledError):
+            cancelled = futures.CancelledError('Interrupted ({}: {})'.format(type(exception).__name__, exception))
+            cancelled.__cause__ = exception
+            exception = cancelled
+        super().set_exception(exception)
+
+
+def _copy_state(source, destination):
+    if destination.done():
+        return
+    if source.cancelled():
+        destination.cancel()
+    elif source.exception() is not None:
+        destination.set_exception(source.exception())
+    else:
+        destination.set_result(source.result())
+
+
+class _Follower(Future):
+    """An awaitable Future following the state of another future.
+    """
+
+    def __init__(self, source):
+        super().__init__()
+        self._source = source
+
+    def cancel(self):
+        # Only a source that has not started can be cancelled.
+        if not self._source.cancel():
+            return False
+        return super().cancel()
+
+
+def awaitable(fut):
+    """Return an awaitable Future that follows the state of a
+    concurrent.futures.Future. Cancelling it cancels the original one,
+    and it succeeds only if the original one is cancelled.
+
+    :type fut: concurrent.futures.Future
+    :rtype: Future
+    """
+    if isinstance(fut, Future):
+        return fut
+
+    out = _Follower(fut)
+    fut.add_done_callback(lambda source: _copy_state(source, out))
+    return out
+
+
+class SerialExecutor(futures.Executor):
+    """Executor that runs the submitted callables one at a time and in
+    submission order, borrowing threads from a (shared) pool.
+
+    Many SerialExecutors can share a pool, keeping the number of threads
+    bounded while preserving the order of the calls to each instrument.
+
+    :param pool: executor in which the callables are run.
+                 Defaults to the process wide shared pool.
+    """
+
+    def __init__(self, pool=None):
+        self._pool = pool or get_shared_pool()
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._running = False
+        self._shutdown = False
+
+    def __len__(self):
+        """Number of callables waiting to be started.
+        """
+        return len(self._queue)
+
+    def submit(self, fn, *args, **kwargs):
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError('cannot schedule new futures after shutdown')
+
+            fut = Future()
+            self._queue.append((fut, fn, args, kwargs))
+            if not self._running:
+                self._running = True
+                self._pool.submit(self._run_next)
+        return fut
+
+    def _run_next(self):
+        with self._lock:
+            fut, fn, args, kwargs = self._queue.popleft()
+
+        if fut.set_running_or_notify_cancel():
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                fut.set_exception(e)
+            else:
+                fut.set_result(result)
+
+        # Give back the thread to the pool before running the next call,
+        # so that other executors sharing the pool are not starved.
+        with self._lock:
+            if self._queue:
+                self._pool.submit(self._run_next)
+            else:
+                self._running = False
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            self._shutdown = True
+            pending = [item[0] for item in self._queue]
+        if wait and pending:
+            futures.wait(pending)
@@ -12,11 +12,13 @@
 
 import time
 import copy
+from logging import DEBUG, INFO
 from weakref import WeakKeyDictionary
 
 from . import Q_
 from .processors import (Processor, ToQuantityProcessor, FromQuantityProcessor,
-                         MapProcessor, ReverseMapProcessor, RangeProcessor)
+                         MapProcessor, ReverseMapProcessor, RangeProcessor,
+                         compose)
 
 
 class _NamedObject(object):
@@ -41,6 +43,20 @@ class _NamedObject(object):
 MISSING = _NamedObject('MISSING')
 
 
+class _NoLock(object):
+    """Context manager used in place of the driver lock
+    by feats and actions declared as concurrent.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+NO_LOCK = _NoLock()
+
+
 def _dget(adict, instance=MISSING, key=MISSING):
 
     try:
@@ -65,6 +81,20 @@ def _dset(adict, value, instance=MISSING, key=MISSING):
         adict[instance][key] = value
 
 
+def _equal(value, other):
+    """Return True if both values are equal.
+
+    Values comparing element wise (e.g. NumPy arrays) are equal only if
+    they are the same object.
+    """
+    if value is other:
+        return True
+    try:
+        return bool(value == other)
+    except ValueError:
+        return False
+
+
 class Feat(object):
     """Pimped Python property for interfacing with instruments. Can be used as
     a decorator.
@@ -87,6 +117,19 @@ class Feat(object):
                    changed but only tested to belong to the container.
     :param units: `Quantity` or string that can be interpreted as units.
     :param procs: Other callables to be applied to input arguments.
+    :param read_once: the value is read from the instrument only once
+                      (same as cache='always').
+    :param cache: cache policy used when getting the value.
+                  'always' to read from the instrument only when no value is cached.
+                  'ttl' to use the cached value if it is younger than `max_age`.
+                  'never' to always read from the instrument (default).
+    :param max_age: maximum age in seconds of a cached value to be used.
+                    Implies cache='ttl' if cache is not given.
+    :param volatile: the value might change without Lantz noticing. The cache
+                     is never used and set always writes to the instrument.
+    :param concurrent: the getter and setter can be called while other operations
+                       on the same driver are running (e.g. reads through a separate
+                       endpoint), so the driver lock is not acquired.
 
     """
 
@@ -94,7 +137,8 @@ class Feat(object):
 
     def __init__(self, fget=MISSING, fset=None, doc=None, *,
                  values=None, units=None, limits=None, procs=None,
-                 read_once=False):
+                 read_once=False, cache=None, max_age=None, volatile=False,
+                 concurrent=False):
         self.fget = fget
         self.fset = fset
         self.__doc__ = doc
@@ -103,11 +147,21 @@ class Feat(object):
         #: instance: value
         self.value = WeakKeyDictionary()
 
+        #: instance: time at which the value was cached
+        self.value_time = WeakKeyDictionary()
+
         #: instance: key: value
         self.modifiers = WeakKeyDictionary()
         self.get_processors = WeakKeyDictionary()
         self.set_processors = WeakKeyDictionary()
 
+        #: instance: key: processors fused into a single callable
+        self.get_pipeline = WeakKeyDictionary()
+        self.set_pipeline = WeakKeyDictionary()
+
+        #: instance: key: (cache mode, max_age)
+        self.cache_policy = WeakKeyDictionary()
+
         # Take documentation from fget or fset
         # if not provided explicitly.
         if self.__doc__ is None:
@@ -119,11 +173,18 @@ class Feat(object):
         self.modifiers[MISSING] = {MISSING: {'values': values,
                                              'units': units,
                                              'limits': limits,
-                                             'processors': procs}}
+                                             'processors': procs,
+                                             'cache': cache,
+                                             'max_age': max_age,
+                                             'volatile': volatile}}
         self.get_processors[MISSING] = {MISSING: ()}
         self.set_processors[MISSING] = {MISSING: ()}
+        self.get_pipeline[MISSING] = {MISSING: compose()}
+        self.set_pipeline[MISSING] = {MISSING: compose()}
+        self.cache_policy[MISSING] = {MISSING: ('never', None)}
 
         self.read_once = read_once
+        self.concurrent = concurrent
 
         self.rebuild(build_doc=True, store=True)
 
@@ -156,15 +217,58 @@ class Feat(object):
                 if setp is not None:
                     set_processors.append(Processor(setp))
 
+        cache_policy = self._build_cache_policy(modifiers)
+
         if build_doc:
             _dochelper(self)
 
         if store:
             _dset(self.get_processors, get_processors, instance, key)
             _dset(self.set_processors, set_processors, instance, key)
+            _dset(self.cache_policy, cache_policy, instance, key)
+            self.compile_processors(instance, key)
 
         return get_processors, set_processors
 
+    def _build_cache_policy(self, modifiers):
+        """Return the (mode, max_age) tuple for the given modifiers.
+        """
+        cache = modifiers.get('cache')
+        max_age = modifiers.get('max_age')
+
+        if modifiers.get('volatile'):
+            return 'volatile', None
+
+        if cache is None:
+            if max_age is not None:
+                cache = 'ttl'
+            elif self.read_once:
+                cache = 'always'
+            else:
+                cache = 'never'
+
+        if cache not in ('always', 'ttl', 'never'):
+            raise ValueError("In {}: {!r} is not a valid value for 'cache'. "
+                             "It should be either 'always', 'ttl' or 'never'".format(self.name, cache))
+
+        if cache == 'ttl' and max_age is None:
+            raise ValueError("In {}: 'max_age' must be given "
+                             "when cache='ttl'".format(self.name))
+
+        return cache, max_age
+
+    def compile_processors(self, instance=MISSING, key=MISSING):
+        """Fuse the stored get and set processors for a given instance and key
+        into a single callable each, used by `post_get` and `pre_set`.
+
+        Must be called after modifying `get_processors` or `set_processors`
+        directly (`rebuild` with store=True does it automatically).
+        """
+        get_processors = _dget(self.get_processors, instance, key)
+        set_processors = _dget(self.set_processors, instance, key)
+        _dset(self.get_pipeline, compose(*reversed(get_processors)), instance, key)
+        _dset(self.set_pipeline, compose(*set_processors), instance, key)
+
     def __call__(self, func):
         if self.fget is MISSING:
             return self.getter(func)
@@ -194,14 +298,10 @@ class Feat(object):
         return self
 
     def post_get(self, value, instance=None, key=MISSING):
-        for processor in reversed(_dget(self.get_processors, instance, key)):
-            value = processor(value)
-        return value
+        return _dget(self.get_pipeline, instance, key)(value)
 
     def pre_set(self, value, instance=None, key=MISSING):
-        for processor in _dget(self.set_processors, instance, key):
-            value = processor(value)
-        return value
+        return _dget(self.set_pipeline, instance, key)(value)
 
     def get(self, instance, owner=None, key=MISSING):
         if instance is None:
@@ -211,14 +311,24 @@ class Feat(object):
         if self.fget is None or self.fget is MISSING:
             raise AttributeError('{} is a write-only feature'.format(name))
 
-        current = self.get_cache(instance, key)
-        if self.read_once and current is not MISSING:
-            return current
+        if instance._defer_get is not None:
+            fut = instance._defer_get(self, key)
+            if fut is not None:
+                return fut
+
+        mode, max_age = _dget(self.cache_policy, instance, key)
+        if mode == 'always' or mode == 'ttl':
+            current = self.get_fresh_cache(instance, key)
+            if current is not MISSING:
+                instance.timing.add('cache_' + name, 1)
+                return current
+            instance.timing.add('cache_' + name, 0)
 
         # This part calls to the underlying get function wrapping
         # and timing, caching, logging and error handling
-        with instance._lock:
-            instance.log_info('Getting {}', name)
+        with NO_LOCK if self.concurrent else instance._lock:
+            if instance._log_hot(INFO):
+                instance.log_info('Getting {}', name)
 
             try:
                 tic = time.time()
@@ -232,16 +342,30 @@ class Feat(object):
 
             instance.timing.add('get_' + name, time.time() - tic)
 
+            return self.process_raw(instance, value, key, name)
+
+    def process_raw(self, instance, value, key=MISSING, name=None):
+        """Post-process a raw value obtained from the instrument,
+        store it in the cache and return it.
+
+        Used by `get` and by drivers that read the raw value of several
+        feats at once (see `Driver.refresh`).
+        """
+        if name is None:
+            name = self.name + ('' if key is MISSING else '[{!r}]'.format(key))
+
+        if instance._log_hot(DEBUG):
             instance.log_debug('(raw) Got {} for {}', value, name)
-            try:
-                value = self.post_get(value, instance, key)
-            except Exception as e:
-                instance.log_error('While post-processing {} for {}: {}', value, name, e)
-                raise e
+        try:
+            value = self.post_get(value, instance, key)
+        except Exception as e:
+            instance.log_error('While post-processing {} for {}: {}', value, name, e)
+            raise e
 
+        if instance._log_hot(INFO):
             instance.log_info('Got {} for {}', value, name, lantz_feat=(name, str(value)))
 
-            self.set_cache(instance, value, key)
+        self.set_cache(instance, value, key)
 
         return value
 
@@ -253,20 +377,24 @@ class Feat(object):
 
         # This part calls to the underlying get function wrapping
         # and timing, caching, logging and error handling
-        with instance._lock:
+        with NO_LOCK if self.concurrent else instance._lock:
+            info = instance._log_hot(INFO)
             current_value = self.get_cache(instance, key)
-            if not force and value == current_value:
-                instance.log_info('No need to set {} = {} (current={}, force={})', name, value, current_value, force)
+            if not force and _equal(value, current_value) and self._skip_set(instance, key):
+                if info:
+                    instance.log_info('No need to set {} = {} (current={}, force={})', name, value, current_value, force)
                 return
 
-            instance.log_info('Setting {} = {} (current={}, force={})', name, value, current_value, force)
+            if info:
+                instance.log_info('Setting {} = {} (current={}, force={})', name, value, current_value, force)
 
             try:
                 t_value = self.pre_set(value, instance, key)
             except Exception as e:
                 instance.log_error('While pre-processing {} for {}: {}', value, name, e)
                 raise e
-            instance.log_debug('(raw) Setting {} = {}', name, t_value)
+            if instance._log_hot(DEBUG):
+                instance.log_debug('(raw) Setting {} = {}', name, t_value)
 
             try:
                 tic = time.time()
@@ -280,9 +408,22 @@ class Feat(object):
 
             instance.timing.add('set_' + name, time.time() - tic)
 
-            instance.log_info('{} was set to {}', name, value, lantz_feat=(name, str(value)))
+            if info:
+                instance.log_info('{} was set to {}', name, value, lantz_feat=(name, str(value)))
+
+            if instance._defer_cache is None or not instance._defer_cache(self, value, key):
+                self.set_cache(instance, value, key)
 
-            self.set_cache(instance, value, key)
+    def _skip_set(self, instance, key=MISSING):
+        """Return True if the cached value can be trusted to skip
+        writing the same value to the instrument.
+        """
+        mode, max_age = _dget(self.cache_policy, instance, key)
+        if mode == 'volatile':
+            return False
+        if mode == 'ttl':
+            return self.get_cache_age(instance, key) < max_age
+        return True
 
     def __get__(self, instance, owner=None):
         return self.get(instance)
@@ -299,10 +440,49 @@ class Feat(object):
         except KeyError:
             return MISSING
 
+    def get_cache_age(self, instance, key=MISSING):
+        """Return the number of seconds since the cached value was stored,
+        or infinity if there is no cached value.
+        """
+        try:
+            return time.monotonic() - self.value_time[instance]
+        except KeyError:
+            return float('inf')
+
+    def get_fresh_cache(self, instance, key=MISSING):
+        """Return the cached value if the cache policy allows to use it
+        instead of reading from the instrument, MISSING otherwise.
+        """
+        mode, max_age = _dget(self.cache_policy, instance, key)
+        if mode == 'always' or mode == 'ttl':
+            current = self.get_cache(instance, key)
+            if current is not MISSING and (mode == 'always' or
+                                           self.get_cache_age(instance, key) < max_age):
+                return current
+        return MISSING
+
+    def is_cache_fresh(self, instance, key=MISSING):
+        """Return False if the cached value has expired according
+        to a 'ttl' cache policy, True otherwise.
+        """
+        mode, max_age = _dget(self.cache_policy, instance, key)
+        if mode == 'ttl':
+            return self.get_cache_age(instance, key) < max_age
+        return True
+
+    def clear_cache(self, instance, key=MISSING):
+        """Forget the cached value, so that the next get reads
+        from the instrument even if the cache policy is 'always'.
+        """
+        self.value.pop(instance, None)
+        self.value_time.pop(instance, None)
+
     def set_cache(self, instance, value, key=MISSING):
+        self.value_time[instance] = time.monotonic()
+
         old_value = self.get_cache(instance, key)
 
-        if value == old_value:
+        if _equal(value, old_value):
             return
 
         if isinstance(value, Q_):
@@ -380,10 +560,30 @@ class DictFeat(Feat):
         else:
             return self.value[instance].get(key, MISSING)
 
+    def get_cache_age(self, instance, key=MISSING):
+        try:
+            return time.monotonic() - self.value_time[instance][key]
+        except KeyError:
+            return float('inf')
+
+    def clear_cache(self, instance, key=MISSING):
+        if key is MISSING:
+            self.value.pop(instance, None)
+            self.value_time.pop(instance, None)
+        else:
+            self.value.get(instance, {}).pop(key, None)
+            self.value_time.get(instance, {}).pop(key, None)
+
     def set_cache(self, instance, value, key=MISSING):
+        now = time.monotonic()
+        if key is MISSING:
+            self.value_time[instance] = {k: now for k in value}
+        else:
+            self.value_time.setdefault(instance, {})[key] = now
+
         old_value = self.get_cache(instance, key)
 
-        if value == old_value:
+        if _equal(value, old_value):
             return
 
         if key is MISSING:
@@ -414,6 +614,12 @@ def _dochelper(feat):
         doc += ':units: {}\n'.format(modifiers['units'])
     if modifiers['limits']:
         doc += ':limits: {}\n'.format(modifiers['limits'])
+    if modifiers.get('volatile'):
+        doc += ':cache: volatile\n'
+    elif modifiers.get('max_age') is not None:
+        doc += ':cache: {} (max_age={} s)\n'.format(modifiers.get('cache') or 'ttl', modifiers['max_age'])
+    elif modifiers.get('cache'):
+        doc += ':cache: {}\n'.format(modifiers['cache'])
     if modifiers['processors']:
         docpg = []
         docps = []
@@ -459,9 +665,13 @@ class FeatProxy(object):
         if item not in _modifiers:
             raise AttributeError()
 
-        _dset(self.feat.modifiers, {item: value}, self.instance, self.key)
+        modifiers = dict(_dget(self.feat.modifiers, self.instance, self.key))
+        modifiers[item] = value
+
+        # Invalid values raise before anything is stored.
+        self.feat.rebuild(self.instance, self.key, build_doc=False, modifiers=modifiers, store=True)
 
-        self.feat.rebuild(self.instance, self.key, build_doc=False, store=True)
+        _dset(self.feat.modifiers, {item: value}, self.instance, self.key)
 
     def __getitem__(self, key):
         if not isinstance(self.feat, DictFeat):
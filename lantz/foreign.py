@@ -12,10 +12,14 @@
 import os
 import ctypes
 import inspect
+import queue
+import threading
 from ctypes.util import find_library
 from itertools import chain
 
 from lantz import Driver
+from lantz.executors import CancellableFuture
+from lantz.trace import traced, CALL
 
 
 class Wrapper(object):
@@ -51,9 +55,12 @@ class Library(object):
     :param library: ctypes library
     :param wrapper: callable that takes two arguments the name of the function
                     and the function itself. It should return a callable.
+    :param compiler: callable that takes the name of the function, the function
+                     itself and the library. It should return a callable replacing
+                     the wrapped function, or None to use the wrapper.
     """
 
-    def __init__(self, library, prefix='', wrapper=None):
+    def __init__(self, library, prefix='', wrapper=None, compiler=None):
         if isinstance(library, str):
             self.library_name = library
 
@@ -63,6 +70,7 @@ class Library(object):
                 library = ctypes.CDLL(library)
 
         self.wrapper = wrapper
+        self.compiler = compiler
         self.prefix = prefix
         self.internal = library
 
@@ -86,7 +94,10 @@ class Library(object):
 
         func = self.__get_func(name)
 
-        if self.wrapper:
+        compiled = self.compiler(name, func, self.internal) if self.compiler else None
+        if compiled is not None:
+            func = compiled
+        elif self.wrapper:
             func = Wrapper(name, func, self.wrapper)
 
         setattr(self, name, func)
@@ -166,28 +177,216 @@ class RetTuple(object):
         return tuple(self.buffer[:])
 
 
+class Signature(object):
+    """Declaration of a foreign function called through the compiled
+    call path (see LibraryDriver.SIGNATURES).
+
+    Each item of argtypes describes an argument of the function:
+
+    - a ctypes type: an argument given by the caller, or bound by the
+      driver (see LibraryDriver._bound_args).
+    - a RetValue or RetTuple: an output buffer allocated once and reused.
+      Its value is returned after the return value of the function.
+    - a RetStr: an output string buffer followed by its length.
+    - None: a NULL pointer (e.g. reserved arguments).
+
+    :param argtypes: sequence of the items described above.
+    :param restype: ctypes type of the return value.
+    """
+
+    def __init__(self, argtypes, restype=ctypes.c_int):
+        self.argtypes = tuple(argtypes)
+        self.restype = restype
+
+
+def compile_call(name, func, signature, bound=(), handler=None, driver=None, library=None):
+    """Return a callable specialized for a foreign function: it only takes
+    the input arguments, passes them together with the bound values and
+    the preallocated output buffers, and returns the same as the wrapped
+    call of a LibraryDriver (the return value, followed by the outputs
+    if there are any).
+
+    Calls of the same function are serialized when it has outputs, as the
+    buffers are shared.
+
+    :param name: name of the function (without prefix).
+    :param func: ctypes function or any callable.
+    :param signature: declaration of the arguments.
+    :type signature: Signature
+    :param bound: values of the first input arguments.
+    :param handler: callable(name, return value) used as errcheck.
+    :param driver: if given, calls are recorded when its trace is not None.
+    :param library: ctypes library from which func was taken. If given, a new
+                    function object is created so that the types and the
+                    errcheck do not affect other users of func.
+    """
+    bound = list(bound)
+    namespace = {'func': func, 'handler': handler, 'driver': driver,
+                 'CALL': CALL, 'lock': threading.Lock()}
+    params, args, outs, argtypes = [], [], [], []
+
+    for index, item in enumerate(signature.argtypes):
+        var = 'v{}'.format(index)
+        if item is None:
+            args.append('None')
+            argtypes.append(ctypes.c_void_p)
+        elif isinstance(item, (RetValue, RetTuple)):
+            namespace[var] = buffer = type(item.buffer)()
+            args.append(var)
+            argtypes.append(ctypes.POINTER(buffer._type_))
+            outs.append(('{}[0]' if isinstance(item, RetValue) else 'tuple({}[:])').format(var))
+        elif isinstance(item, RetStr):
+            namespace[var] = ctypes.create_string_buffer(item.length)
+            args.extend((var, str(item.length)))
+            argtypes.extend((ctypes.c_char_p, ctypes.c_int))
+            if item.encoding:
+                outs.append('{}.value.decode({!r})'.format(var, item.encoding))
+            else:
+                outs.append('{}.value'.format(var))
+        elif bound:
+            namespace[var] = bound.pop(0)
+            args.append(var)
+            argtypes.append(item)
+        else:
+            params.append(var)
+            args.append(var)
+            argtypes.append(item)
+
+    if isinstance(func, ctypes._CFuncPtr):
+        if library is not None:
+            func = namespace['func'] = type(func)((func.__name__, library))
+        func.argtypes = argtypes
+        func.restype = signature.restype
+        if handler is not None:
+            func.errcheck = lambda result, func, args, handler=handler: handler(name, result)
+            handler = None
+
+    expr = 'func({})'.format(', '.join(args))
+    if handler is not None:
+        expr = 'handler({!r}, {})'.format(name, expr)
+    if outs:
+        body = ('    with lock:\n'
+                '        ret = {}\n'
+                '        return ret, {}\n').format(expr, ', '.join(outs))
+    else:
+        body = '    return {}\n'.format(expr)
+
+    params = ', '.join(params)
+    source = 'def _untraced({0}):\n{1}\n'.format(params, body)
+    if driver is None:
+        source += 'call = _untraced\n'
+    else:
+        source += ('def _traced(driver, name, {0}):\n'
+                   '    return _untraced({0})\n\n'
+                   'def call({0}):\n'
+                   '    if driver.trace is not None:\n'
+                   '        return driver.trace.call(CALL, driver, _traced, ({1!r}, {0}), {{}})\n'
+                   '{2}').format(params, name, body)
+
+    exec(source, namespace)
+    call = namespace['call']
+    call.__name__ = call.__qualname__ = name
+    call.source = source
+    return call
+
+
+class IOThread(object):
+    """Runs blocking foreign calls one at a time in a daemon thread,
+    started when a call is submitted and finished after being idle.
+
+    :param name: name of the thread.
+    :param idle: seconds without calls after which the thread finishes.
+    """
+
+    def __init__(self, name, idle=10.):
+        self.name = name
+        self.idle = idle
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, fut, fn, args):
+        """Run fn(*args) setting the result or the exception of fut.
+
+        :type fut: concurrent.futures.Future
+        """
+        with self._lock:
+            self._queue.put((fut, fn, args))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+        return fut
+
+    def _run(self):
+        while True:
+            try:
+                fut, fn, args = self._queue.get(timeout=self.idle)
+            except queue.Empty:
+                with self._lock:
+                    if self._queue.empty():
+                        self._thread = None
+                        return
+                continue
+
+            if not fut.set_running_or_notify_cancel():
+                continue
+            try:
+                result = fn(*args)
+            except BaseException as e:
+                fut.set_exception(e)
+            else:
+                fut.set_result(result)
+
+
 class LibraryDriver(Driver):
     """Base class for drivers that communicate with instruments
     calling a library (dll or others)
 
     To use this class you must override LIBRARY_NAME
+
+    :param library_name: name or path of the library, tried before LIBRARY_NAME.
+    :param library: an already loaded library (e.g. a ctypes.CDLL or an object
+                    emulating it in tests), used instead of searching one.
     """
 
     #: Name of the library
     LIBRARY_NAME = ''
     LIBRARY_PREFIX = ''
 
+    #: Functions called through a callable specialized by compile_call instead
+    #: of the generic wrapper. They take only the input arguments (without the
+    #: RetValue, RetStr and RetTuple placeholders), are not logged and
+    #: str arguments are not encoded.
+    #: :type: dict[str, Signature]
+    SIGNATURES = {}
+
+    #: Functions that can block for a long time (e.g. waiting for an acquisition),
+    #: mapped to what makes them return early: the name of a function of the library
+    #: (called without arguments), a callable taking the driver, or None.
+    #: Calling them returns a lantz.executors.CancellableFuture: the call runs in the
+    #: I/O thread of the driver, so the caller does not need to hold the driver lock
+    #: (see Action concurrent) while waiting, and cancelling the future interrupts it.
+    #: :type: dict[str, str | callable | None]
+    BLOCKING = {}
+
     def __init__(self, *args, **kwargs):
         library_name = kwargs.pop('library_name', None)
+        library = kwargs.pop('library', None)
         super().__init__(*args, **kwargs)
 
+        if library is not None:
+            self.lib = Library(library, self.LIBRARY_PREFIX, self._wrapper, self._compile)
+            self.log_info('LibraryDriver created with {}', library)
+            self._add_types()
+            return
+
         folder = os.path.dirname(inspect.getfile(self.__class__))
         for name in chain(iter_lib(library_name, folder), iter_lib(self.LIBRARY_NAME, folder)):
             if name is None:
                 continue
             self.log_debug('Trying to open library: {}'.format(name))
             try:
-                self.lib = Library(name, self.LIBRARY_PREFIX, self._wrapper)
+                self.lib = Library(name, self.LIBRARY_PREFIX, self._wrapper, self._compile)
                 break
             except OSError:
                 pass
@@ -204,6 +403,52 @@ class LibraryDriver(Driver):
     def _return_handler(self, func_name, ret_value):
         return ret_value
 
+    def _bound_args(self, name):
+        """Return the values of the first arguments of a compiled function,
+        given by the driver instead of the caller (e.g. a handle).
+        """
+        return ()
+
+    def _compile(self, name, func, library):
+        signature = self.SIGNATURES.get(name)
+        if signature is None:
+            call = None
+        else:
+            if type(self)._return_handler is LibraryDriver._return_handler:
+                handler = None
+            else:
+                handler = self._return_handler
+            call = compile_call(name, func, signature, self._bound_args(name), handler, self, library)
+
+        if name in self.BLOCKING:
+            if call is None:
+                call = Wrapper(name, func, self._wrapper)
+            call = self._blocking(name, call, self.BLOCKING[name])
+        return call
+
+    _io_thread = None
+
+    def _blocking(self, name, call, canceller):
+        """Return a callable submitting the call to the I/O thread of the driver.
+        """
+        if isinstance(canceller, str):
+            cancel_name = canceller
+            canceller = lambda: getattr(self.lib, cancel_name)()
+        elif canceller is not None:
+            cancel_func = canceller
+            canceller = lambda: cancel_func(self)
+
+        if self._io_thread is None:
+            self._io_thread = IOThread('{}-io'.format(self.name))
+        io_thread = self._io_thread
+
+        def submit(*args):
+            self.log_debug('Submitting blocking call {}', name)
+            return io_thread.submit(CancellableFuture(canceller), call, args)
+
+        submit.__name__ = submit.__qualname__ = name
+        return submit
+
     def _preprocess_args(self, name, *args):
         new_args = []
         collect = []
@@ -218,6 +463,7 @@ class LibraryDriver(Driver):
 
         return new_args, collect
 
+    @traced(CALL)
     def _wrapper(self, name, func, *args):
         new_args, collect = self._preprocess_args(name, *args)
 
@@ -243,7 +489,7 @@ class LibraryDriver(Driver):
 
 def iter_lib(library_name, folder=''):
     if not library_name:
-        raise StopIteration
+        return
     if isinstance(library_name, str):
         if folder:
             yield os.path.join(folder, library_name)
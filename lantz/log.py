@@ -34,11 +34,17 @@ class _LogRecord(logging.LogRecord):
         Return the message for this LogRecord.
 
         Return the message for this LogRecord after merging any user-supplied
-        arguments with the message.
+        arguments with the message. The message is formatted only once,
+        even if the record is handled by many handlers.
         """
+        try:
+            return self._lantz_message
+        except AttributeError:
+            pass
         msg = str(self.msg)
         if self.args:
             msg = msg.format(*self.args)
+        self._lantz_message = msg
         return msg
 
 
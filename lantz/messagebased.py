@@ -9,15 +9,26 @@
     :license: BSD, see LICENSE for more details.
 """
 
-from collections import ChainMap
+from collections import ChainMap, deque
+from concurrent import futures
+from contextlib import contextmanager
+from functools import partial
+import time
 import types
+import threading
 
-import visa
+import pyvisa as visa
+from pyvisa import constants
 
-from .errors import NotSupportedError
+from . import blocks
+from .errors import LantzTimeoutError, NotSupportedError
 from .driver import Driver
+from .executors import Future
+from .feat import MISSING
 from .log import LOGGER
+from .poller import Backoff, Wait, get_poller
 from .processors import ParseProcessor
+from .trace import traced, READ, WRITE
 
 
 #: Cache of parsing functions.
@@ -40,6 +51,109 @@ def get_resource_manager():
     return _resource_manager
 
 
+#: Cache of resource information indexed by resource name.
+#: :type: dict[str, visa.highlevel.ResourceInfo]
+_RESOURCE_INFO = {}
+
+
+def get_resource_info(resource_name):
+    """Return the (cached) information about a resource.
+
+    :raises: visa.VisaIOError if the resource name is invalid.
+    """
+    try:
+        return _RESOURCE_INFO[resource_name]
+    except KeyError:
+        info = _RESOURCE_INFO[resource_name] = get_resource_manager().resource_info(resource_name)
+        return info
+
+
+class _Session(object):
+    """A resource shared among drivers.
+    """
+
+    def __init__(self):
+        #: Serializes the access to the resource.
+        self.lock = threading.RLock()
+        #: :type: pyvisa.resources.MessageBasedResource
+        self.resource = None
+        #: keyword arguments used to open the resource.
+        self.kwargs = None
+        #: Number of drivers using the resource.
+        self.count = 0
+
+
+#: Shared sessions indexed by normalized resource name.
+#: :type: dict[str, _Session]
+_SESSIONS = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+def _get_session(resource_name):
+    # Names of the same resource (e.g. GPIB::5 and GPIB0::5::INSTR) share the session.
+    key = get_resource_info(resource_name).resource_name or resource_name
+    with _SESSIONS_LOCK:
+        try:
+            return _SESSIONS[key]
+        except KeyError:
+            session = _SESSIONS[key] = _Session()
+            return session
+
+
+def open_shared_resource(resource_name, **kwargs):
+    """Return the resource shared by all drivers using the resource name,
+    opening it if necessary. Each call must be matched by a call to
+    `close_shared_resource`.
+
+    :param kwargs: keyword arguments passed to the Resource constructor
+                   when the resource is opened.
+    :rtype: pyvisa.resources.MessageBasedResource
+    """
+    session = _get_session(resource_name)
+    with session.lock:
+        if not session.count:
+            session.resource = get_resource_manager().open_resource(resource_name, **kwargs)
+            session.kwargs = kwargs
+        elif kwargs != session.kwargs:
+            LOGGER.warning('{} is already open with {}, ignoring {}',
+                           resource_name, session.kwargs, kwargs)
+        session.count += 1
+        return session.resource
+
+
+def close_shared_resource(resource_name):
+    """Release the resource shared by all drivers using the resource name,
+    closing it if it is no longer used.
+    """
+    session = _get_session(resource_name)
+    with session.lock:
+        if not session.count:
+            raise ValueError('{} is not open'.format(resource_name))
+        session.count -= 1
+        if not session.count:
+            session.resource.close()
+            session.resource = None
+
+
+class _Pipeline(object):
+    """Commands and queries of a pipeline block (see MessageBasedDriver.pipeline).
+    """
+
+    def __init__(self, depth):
+        #: Encoded commands waiting to be sent.
+        self.writes = deque()
+        #: (future, recv_args) of the queries waiting for an answer, in order.
+        self.pending = deque()
+        #: Number of pending queries that have been sent.
+        self.sent = 0
+        #: Maximum number of queries waiting for an answer.
+        self.depth = depth
+        #: Thread that opened the pipeline.
+        self.thread = threading.current_thread()
+        #: (feat, value, key) of the feats set, cached once their commands are sent.
+        self.cache = []
+
+
 class MessageBasedDriver(Driver):
     """Base class for message based drivers using PyVISA as underlying library.
 
@@ -73,6 +187,59 @@ class MessageBasedDriver(Driver):
     #: :type: str | list | tuple | None
     MODEL_CODE = None
 
+    #: Feats that can be read together in a single round trip by `refresh`.
+    #: Maps the feat name to the query command. The answer to the command
+    #: must be the same raw value returned by the feat getter.
+    #: For example::
+    #:
+    #:       {'frequency': 'FREQ?',
+    #:        'amplitude': 'VOLT?'}
+    #:
+    #: :type: dict[str, str] | None
+    BATCH_QUERIES = None
+
+    #: Separator used to join the batched queries and to split the answer.
+    #: :type: str
+    BATCH_SEPARATOR = ';'
+
+    #: Maximum number of queries sent in a single message (None for unlimited).
+    #: :type: int | None
+    BATCH_SIZE = None
+
+    #: If True, drivers with the same resource name (e.g. the modules of a
+    #: mainframe or the axes of a controller) share a single session, which is
+    #: opened by the first driver to initialize and closed by the last one to
+    #: finalize. The access to the instrument is serialized among them.
+    #: :type: bool
+    SHARED_SESSION = False
+
+    #: Maximum number of queries sent and waiting for an answer
+    #: when pipelining (see `pipeline`).
+    #: :type: int
+    PIPELINE_DEPTH = 16
+
+    #: Mechanism used by `operation_complete`: 'srq' to wait for a VISA
+    #: service request event, 'poll' to poll the event status register or
+    #: None to use service requests if the resource supports them.
+    #: :type: str | None
+    COMPLETION = None
+
+    #: Commands and queries waiting to be sent when pipelining.
+    _pipeline = None
+
+    #: True if the last binary read received the END indicator.
+    _read_ended = False
+
+    #: True if service request events are enabled, False if they are not
+    #: supported by the resource and None if they have not been tried yet.
+    _srq_enabled = None
+
+    #: Futures waiting for an operation complete event.
+    _completion_waiters = ()
+
+    #: Future of the wait polling the event status register.
+    _completion_poller = None
+
     #: Stores a reference to a PyVISA ResourceManager.
     #: :type: visa.ResourceManager
     __resource_manager = None
@@ -295,12 +462,16 @@ class MessageBasedDriver(Driver):
 
         self.__resource_manager = get_resource_manager()
         try:
-            resource_info = self.__resource_manager.resource_info(resource_name)
+            resource_info = get_resource_info(resource_name)
         except visa.VisaIOError:
             raise ValueError('The resource name is invalid')
 
         super().__init__(name=name)
 
+        if self.SHARED_SESSION:
+            # Drivers sharing the session also share the lock.
+            self._lock = _get_session(resource_name).lock
+
         # This is to avoid accidental modifications of the class value by an instance.
         self.DEFAULTS = types.MappingProxyType(self.DEFAULTS or {})
 
@@ -324,11 +495,25 @@ class MessageBasedDriver(Driver):
         super().initialize()
         self.log_debug('Opening resource {}', self.resource_name)
         self.log_debug('Setting {}', list(self.resource_kwargs.items()))
-        self.resource = get_resource_manager().open_resource(self.resource_name, **self.resource_kwargs)
+        if self.SHARED_SESSION:
+            self.resource = open_shared_resource(self.resource_name, **self.resource_kwargs)
+        else:
+            self.resource = get_resource_manager().open_resource(self.resource_name, **self.resource_kwargs)
 
     def finalize(self):
+        if self._srq_enabled:
+            try:
+                self.resource.disable_event(constants.EventType.service_request,
+                                            constants.EventMechanism.handler)
+                self.resource.uninstall_handler(constants.EventType.service_request, self._on_srq)
+            except Exception as e:
+                self.log_debug('Could not disable service requests: {!r}', e)
+            self._srq_enabled = None
         self.log_debug('Closing resource {}', self.resource_name)
-        self.resource.close()
+        if self.SHARED_SESSION:
+            close_shared_resource(self.resource_name)
+        else:
+            self.resource.close()
         super().finalize()
 
     def query(self, command, *, send_args=(None, None), recv_args=(None, None)):
@@ -341,9 +526,405 @@ class MessageBasedDriver(Driver):
         :param recv_args: (termination, encoding) to override class defaults
         """
 
+        if self._pipeline_owner():
+            fut = self.query_pipelined(command, send_args=send_args, recv_args=recv_args)
+            self.flush()
+            while not fut.done() and self._pipeline.pending:
+                self._read_pipelined()
+            return fut.result()
+
         self.write(command, *send_args)
         return self.read(*recv_args)
 
+    @contextmanager
+    def pipeline(self, depth=None):
+        """Context manager to pipeline the communication with instruments
+        that accept back-to-back commands and answer queries in order.
+
+        Within the block, written commands are queued and sent together
+        when an answer is needed, when `depth` queries are waiting for an
+        answer or at the end of the block. Answers are matched to queries
+        in order. Reading a feat listed in BATCH_QUERIES (directly or with
+        `afeat`) returns a future resolved with its value when the answer
+        arrives; other feats are read by their getters, which send the queued
+        commands and wait for the answer. For example::
+
+            with inst.pipeline():
+                for value in values:
+                    inst.frequency = value
+                futs = [inst.query_pipelined('MEAS?') for _ in range(10)]
+                amplitude = inst.amplitude
+            results = [fut.result() for fut in futs] + [amplitude.result()]
+
+        The pipeline belongs to the thread that opened it. The driver lock is
+        held until the end of the block, so other threads wait to communicate
+        with the instrument (and the futures of asynchronous methods submitted
+        within the block are resolved after it).
+
+        If the block raises an exception, the queued commands are discarded
+        and their queries are cancelled. Errors of the instrument are detected
+        when the commands are sent, which is later than without pipelining.
+        Values of feats set within the block are cached only after all the
+        commands have been sent.
+
+        :param depth: maximum number of queries waiting for an answer
+                      (defaults to PIPELINE_DEPTH).
+        """
+        with self._lock:
+            if self._pipeline is not None:
+                # Nested block.
+                yield
+                return
+
+            self._pipeline = pipeline = _Pipeline(depth or self.PIPELINE_DEPTH)
+            self._defer_get = self._get_pipelined
+            self._defer_cache = self._cache_pipelined
+            try:
+                yield
+            except BaseException:
+                self._abort_pipeline()
+                raise
+            else:
+                self._drain()
+                for feat, value, key in pipeline.cache:
+                    feat.set_cache(self, value, key)
+            finally:
+                self._pipeline = None
+                del self._defer_get
+                del self._defer_cache
+
+    def _pipeline_owner(self):
+        """Return True if the calling thread opened the current pipeline.
+
+        Other threads wait for the pipeline to finish (its thread holds the lock).
+        """
+        pipeline = self._pipeline
+        if pipeline is None:
+            return False
+        if pipeline.thread is threading.current_thread():
+            return True
+        with self._lock:
+            return False
+
+    def query_pipelined(self, command, *, send_args=(None, None), recv_args=(None, None)):
+        """Queue a query and return a future that is resolved with the answer
+        when it is received. Outside a `pipeline` block, the query is done immediately.
+
+        :param command: command to be sent to the instrument
+        :type command: string
+
+        :param send_args: (termination, encoding) to override class defaults
+        :param recv_args: (termination, encoding) to override class defaults
+        :rtype: lantz.executors.Future
+        """
+        fut = Future()
+        if not self._pipeline_owner():
+            try:
+                fut.set_result(self.query(command, send_args=send_args, recv_args=recv_args))
+            except Exception as e:
+                fut.set_exception(e)
+            return fut
+
+        pipeline = self._pipeline
+        self.write(command, *send_args)
+        pipeline.pending.append((fut, recv_args))
+        if len(pipeline.pending) >= pipeline.depth:
+            self.flush()
+            while len(pipeline.pending) >= pipeline.depth:
+                self._read_pipelined()
+        return fut
+
+    def _get_pipelined(self, feat, key):
+        """Return a future resolved with the value of a feat listed in
+        BATCH_QUERIES, queried through the pipeline. None for other feats,
+        which are read by their getters.
+        """
+        if key is not MISSING or not self._pipeline_owner():
+            return None
+        command = (self.BATCH_QUERIES or {}).get(feat.name)
+        if command is None:
+            return None
+
+        fut = Future()
+        current = feat.get_fresh_cache(self)
+        if current is not MISSING:
+            fut.set_result(current)
+            return fut
+        self.query_pipelined(command).add_done_callback(partial(self._process_pipelined, feat, fut))
+        return fut
+
+    def _cache_pipelined(self, feat, value, key):
+        """Called by Feat.set with the value set. Within the pipeline, the
+        cached value is cleared and the new one is cached at the end of the block.
+        """
+        if not self._pipeline_owner():
+            return False
+        feat.clear_cache(self, key)
+        self._pipeline.cache.append((feat, value, key))
+        return True
+
+    def _process_pipelined(self, feat, fut, answer):
+        if answer.cancelled():
+            fut.cancel()
+        elif answer.exception() is not None:
+            fut.set_exception(answer.exception())
+        else:
+            try:
+                fut.set_result(feat.process_raw(self, answer.result()))
+            except Exception as e:
+                fut.set_exception(e)
+
+    def flush(self):
+        """Send the commands queued while pipelining in a single message.
+        """
+        with self._lock:
+            pipeline = self._pipeline
+            if pipeline is None or not pipeline.writes:
+                return
+            writes = pipeline.writes
+            message = b''.join(writes)
+            self.log_debug('Writing {} pipelined messages ({} bytes)', len(writes), len(message))
+            writes.clear()
+            tic = time.time()
+            self._write_bytes(message)
+            pipeline.sent = len(pipeline.pending)
+            self.timing.add('pipeline_flush', time.time() - tic)
+
+    def _read_pipelined(self):
+        """Read the answer to the oldest query waiting for one.
+        """
+        pipeline = self._pipeline
+        pending = pipeline.pending
+        fut, recv_args = pending.popleft()
+        pipeline.sent -= 1
+        try:
+            fut.set_result(self._read(*recv_args))
+        except Exception as e:
+            fut.set_exception(e)
+            # The answers of the other queries sent can no longer be matched.
+            # They are discarded, so that the following reads are in step.
+            failed = [pending.popleft()[0] for _ in range(pipeline.sent)]
+            pipeline.sent = 0
+            self._discard_answers(len(failed))
+            for other in failed:
+                other.set_exception(e)
+
+    def _discard_answers(self, count):
+        """Read off the answers to count queries, clearing the
+        device if they cannot be read.
+        """
+        try:
+            for _ in range(count):
+                self.resource.read_raw()
+        except Exception as e:
+            self.log_debug('Could not read off {} answers ({!r}), clearing the device', count, e)
+            try:
+                self.resource.clear()
+            except Exception as e:
+                self.log_warning('Could not clear the device: {!r}', e)
+
+    def _drain(self):
+        """Send the queued commands and read the answers of all pending queries.
+        """
+        with self._lock:
+            pipeline = self._pipeline
+            if pipeline is None:
+                return
+            self.flush()
+            while pipeline.pending:
+                self._read_pipelined()
+
+    def _abort_pipeline(self):
+        """Discard the queued commands, cancelling their queries, and read
+        the answers of the queries already sent.
+        """
+        pipeline = self._pipeline
+        pipeline.writes.clear()
+        pending = pipeline.pending
+        while len(pending) > pipeline.sent:
+            pending.pop()[0].cancel()
+        try:
+            self._drain()
+        except Exception as e:
+            self.log_debug('While reading the answers of an aborted pipeline: {!r}', e)
+
+    def operation_complete(self, command=None, timeout=None):
+        """Send a command followed by *OPC and return a future that is
+        resolved when the instrument reports that all pending operations
+        are complete.
+
+        The completion is signaled by a service request (SRQ) when the
+        resource supports VISA events and otherwise the event status register
+        is polled by the shared poller (see COMPLETION and wait_until). Notice that the status
+        registers of the instrument are cleared (*CLS).
+
+        Futures of many instruments can be waited at once::
+
+            futs = [inst.operation_complete('INIT') for inst in instruments]
+            concurrent.futures.wait(futs)
+
+        :param command: command starting the operation.
+        :param timeout: time in seconds after which the future fails
+                        with LantzTimeoutError.
+        :rtype: lantz.executors.Future
+        """
+        fut = Future()
+        start = time.monotonic()
+        fut.add_done_callback(lambda _: self.timing.add('operation_complete', time.monotonic() - start))
+
+        with self._lock:
+            srq = self._completion_mechanism() == 'srq'
+            self.write('*CLS')
+            self.write('*ESE 1')
+            if srq:
+                self.write('*SRE 32')
+            if command:
+                self.write(command)
+            if not self._completion_waiters:
+                self._completion_waiters = []
+            self._completion_waiters.append(fut)
+            self.write('*OPC')
+            self.flush()
+
+        if timeout is not None:
+            # A single check at the deadline, scheduled by the shared poller.
+            expiry = Wait(self, 'operation_complete_timeout', lambda: False,
+                          Backoff(timeout, timeout, 1, expected=timeout), start + timeout)
+            get_poller().submit(expiry).add_done_callback(lambda _: self._fail_completion(fut, timeout))
+            fut.add_done_callback(lambda _: expiry.future.cancel())
+
+        if not srq:
+            self._start_completion_poller()
+
+        return fut
+
+    def _completion_mechanism(self):
+        if self.COMPLETION == 'poll':
+            return 'poll'
+
+        if self._srq_enabled is None:
+            try:
+                self.resource.install_handler(constants.EventType.service_request, self._on_srq)
+                self.resource.enable_event(constants.EventType.service_request,
+                                           constants.EventMechanism.handler)
+                self._srq_enabled = True
+            except Exception as e:
+                self.log_debug('Service requests are not available: {!r}', e)
+                self._srq_enabled = False
+
+        if self._srq_enabled:
+            return 'srq'
+        if self.COMPLETION == 'srq':
+            raise NotSupportedError('{} does not support service requests'.format(self.resource_name))
+        return 'poll'
+
+    def _resolve_completion(self):
+        with self._lock:
+            waiters, self._completion_waiters = self._completion_waiters, ()
+        for fut in waiters:
+            if not fut.done():
+                try:
+                    fut.set_result(None)
+                except futures.InvalidStateError:
+                    pass
+
+    def _fail_completion(self, fut, timeout):
+        if fut.done():
+            return
+        with self._lock:
+            if fut in self._completion_waiters:
+                self._completion_waiters.remove(fut)
+        try:
+            fut.set_exception(LantzTimeoutError('Operation not complete in {} s'.format(timeout)))
+        except futures.InvalidStateError:
+            pass
+
+    def _on_srq(self, resource, event, user_handle):
+        # Called by VISA in its own thread. The serial poll
+        # clears the service request.
+        try:
+            if resource.read_stb() & 32:
+                self._resolve_completion()
+        except Exception as e:
+            self.log_error('While handling service request: {!r}', e)
+
+    def _start_completion_poller(self):
+        with self._lock:
+            if self._completion_poller is not None:
+                return
+            self._completion_poller = fut = self.wait_until(self._check_completion,
+                                                            name='operation_complete_poll')
+        fut.add_done_callback(self._completion_polled)
+
+    def _check_completion(self):
+        with self._lock:
+            if all(fut.done() for fut in self._completion_waiters):
+                # Cancelled or timed out.
+                self._completion_waiters = ()
+                return True
+            if int(self.query('*ESR?')) & 1:
+                self._resolve_completion()
+                return True
+        return False
+
+    def _completion_polled(self, fut):
+        error = fut.exception()
+        with self._lock:
+            self._completion_poller = None
+            if error is not None:
+                self.log_error('While polling operation complete: {!r}', error)
+                waiters, self._completion_waiters = self._completion_waiters, ()
+            else:
+                waiters = ()
+            pending = bool(self._completion_waiters)
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_exception(error)
+        if pending:
+            self._start_completion_poller()
+
+    def batch_query(self, commands):
+        """Send several queries in a single message and return
+        the list of answers.
+
+        The default implementation joins the commands with BATCH_SEPARATOR
+        (e.g. SCPI compound queries) and splits the answer using the same
+        separator. Override it for instruments with a dedicated command
+        (e.g. SNAP? in Stanford Research lock-ins).
+
+        :param commands: query commands.
+        :type commands: list[str]
+        :rtype: list[str]
+        """
+        answer = self.query(self.BATCH_SEPARATOR.join(commands))
+        answers = answer.split(self.BATCH_SEPARATOR)
+        if len(answers) != len(commands):
+            raise ValueError('Expected {} answers for {!r}, got {!r}'.format(len(commands), commands, answer))
+        return answers
+
+    def _refresh_many(self, keys):
+        batch = self.BATCH_QUERIES
+        if not batch:
+            return {}
+
+        feats = self._lantz_features
+        keys = [key for key in keys
+                if key in batch and feats[key].get_fresh_cache(self) is MISSING]
+        if len(keys) < 2:
+            return {}
+
+        size = self.BATCH_SIZE or len(keys)
+        values = {}
+        with self._lock:
+            for start in range(0, len(keys), size):
+                chunk = keys[start:start + size]
+                tic = time.time()
+                answers = self.batch_query([batch[key] for key in chunk])
+                self.timing.add('batch_query', time.time() - tic)
+                for key, answer in zip(chunk, answers):
+                    values[key] = feats[key].process_raw(self, answer)
+        return values
+
     def parse_query(self, command, *,
                     send_args=(None, None), recv_args=(None, None),
                     format=None):
@@ -372,9 +953,121 @@ class MessageBasedDriver(Driver):
         :return: number of bytes sent.
 
         """
+        if self._pipeline_owner():
+            resource = self.resource
+            termination = resource.write_termination if termination is None else termination
+            return self.write_raw(bytes(command + termination, encoding or resource.encoding))
+
         self.log_debug('Writing {!r}', command)
+        return self._write(command, termination, encoding)
+
+    @traced(WRITE)
+    def _write(self, command, termination=None, encoding=None):
         return self.resource.write(command, termination, encoding)
 
+    def write_raw(self, message):
+        """Send bytes to the instrument.
+
+        :param message: bytes to be sent, including the termination.
+        :type message: bytes
+
+        :return: number of bytes sent.
+        """
+        if self._pipeline_owner():
+            self.log_debug('Queueing {!r}', message)
+            self._pipeline.writes.append(message)
+            return len(message)
+
+        self.log_debug('Writing {!r}', message)
+        return self._write_bytes(message)
+
+    @traced(WRITE)
+    def _write_bytes(self, message):
+        return self.resource.write_raw(message)
+
+    def _block_readers(self):
+        """Return the callables used to read binary data from the resource:
+        read(size), returning at most size bytes, and read_rest(), returning
+        the rest of the message without the termination (nothing if the
+        last read ended the message).
+        """
+        if self._pipeline_owner():
+            self._drain()
+        self._read_ended = False
+        return self._read_bytes, self._read_rest
+
+    @traced(READ)
+    def _read_bytes(self, size):
+        data, status = self.resource.visalib.read(self.resource.session, size)
+        # Only the END indicator ends the message: a termination character
+        # read within the size is part of the binary data.
+        self._read_ended = status == constants.StatusCode.success
+        return data
+
+    @traced(READ)
+    def _read_rest(self):
+        if self._read_ended:
+            return b''
+
+        resource = self.resource
+        visalib, session = resource.visalib, resource.session
+        chunks = []
+        while True:
+            data, status = visalib.read(session, resource.chunk_size)
+            chunks.append(data)
+            if status != constants.StatusCode.success_max_count_read:
+                break
+        data = b''.join(chunks)
+        termination = resource.read_termination
+        if termination and data.endswith(bytes(termination, 'ascii')):
+            return memoryview(data)[:-len(termination)]
+        return data
+
+    def read_block(self, dtype='u1', scaling=None):
+        """Read an IEEE 488.2 binary block (definite or indefinite length)
+        and return it as a NumPy array.
+
+        The data is read straight into a single buffer which is viewed
+        by the array (no per element conversion). Notice that for indefinite
+        length blocks (#0) the termination character should not be enabled.
+
+        :param dtype: data type of the elements, including the byte order
+                      (e.g. '>u2' for big endian unsigned 16 bit integers).
+        :param scaling: (multiplier, offset, zero) to convert the values as
+                        (value - offset) * multiplier + zero.
+        :rtype: numpy.ndarray
+        """
+        read, read_rest = self._block_readers()
+        data = blocks.read_block(read, dtype, read_rest)
+        self.log_debug('Read block of {} bytes', data.nbytes)
+        if scaling:
+            data = blocks.scale(data, *scaling)
+        return data
+
+    def read_array(self, count, dtype='u1'):
+        """Read binary data without header (e.g. SR830 TRCB?) and return
+        it as a NumPy array.
+
+        :param count: number of elements.
+        :param dtype: data type of the elements, including the byte order.
+        :rtype: numpy.ndarray
+        """
+        data = blocks.read_array(self._block_readers()[0], count, dtype)
+        self.log_debug('Read array of {} bytes', data.nbytes)
+        return data
+
+    def query_block(self, command, dtype='u1', scaling=None, *, send_args=(None, None)):
+        """Send query to the instrument and return the binary block answer.
+
+        .. seealso:: read_block
+
+        :param command: command to be sent to the instrument
+        :type command: string
+        :param send_args: (termination, encoding) to override class defaults
+        """
+        self.write(command, *send_args)
+        return self.read_block(dtype, scaling)
+
     def read(self, termination=None, encoding=None):
         """Receive string from instrument.
 
@@ -383,6 +1076,14 @@ class MessageBasedDriver(Driver):
         :param encoding: encoding to transform bytes to string (overrides class default)
         :return: string encoded from received bytes
         """
+        if self._pipeline_owner():
+            # Answers to queued queries arrive first.
+            self._drain()
+
+        return self._read(termination, encoding)
+
+    @traced(READ)
+    def _read(self, termination=None, encoding=None):
         ret =  self.resource.read(termination, encoding)
         self.log_debug('Read {!r}', ret)
         return ret
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+    lantz.poller
+    ~~~~~~~~~~~~
+
+    Implements a poller that waits for conditions of many drivers
+    (e.g. a motion is done or an acquisition is ready) from a single thread.
+
+    The condition is checked in a thread of the shared pool (see
+    lantz.executors) and the next check is scheduled with an exponential
+    backoff. If the expected duration of the wait is known (given, or
+    learned from previous waits of the same name), the first check is
+    delayed until then.
+
+    :copyright: 2015 by Lantz Authors, see AUTHORS for more details.
+    :license: BSD, see LICENSE for more details.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from concurrent import futures
+
+from .errors import LantzTimeoutError
+from .executors import Future, get_shared_pool
+
+
+class Backoff(object):
+    """Delays between the checks of a condition.
+
+    :param interval: initial interval in seconds.
+    :param max_interval: maximum interval in seconds.
+    :param factor: growth factor of the interval.
+    :param expected: expected duration of the wait in seconds. If given,
+                     the first check is done after it and the interval
+                     starts from a fraction of it.
+    """
+
+    __slots__ = ('interval', 'max_interval', 'factor', 'first')
+
+    #: Fraction of the expected duration used as initial interval.
+    EXPECTED_FRACTION = 0.05
+
+    def __init__(self, interval, max_interval, factor, expected=None):
+        self.max_interval = max_interval
+        self.factor = factor
+        if expected:
+            self.first = expected
+            self.interval = min(max(interval, expected * self.EXPECTED_FRACTION), max_interval)
+        else:
+            self.first = 0.
+            self.interval = interval
+
+    def __iter__(self):
+        yield self.first
+        interval = self.interval
+        while True:
+            yield interval
+            interval = min(interval * self.factor, self.max_interval)
+
+
+class Wait(object):
+    """A condition of a driver being waited.
+
+    :param driver: driver in which timing the efficiency of the wait is recorded.
+    :param name: name of the wait (used in timing categories).
+    :param check: callable returning True when the wait is over.
+    :param backoff: delays between checks.
+    :type backoff: Backoff
+    :param deadline: time.monotonic value after which the wait fails.
+    """
+
+    def __init__(self, driver, name, check, backoff, deadline=None):
+        self.driver = driver
+        self.name = name
+        self.check = check
+        self.delays = iter(backoff)
+        self.deadline = deadline
+        self.future = Future()
+        self.start = self.last_check = time.monotonic()
+        self.polls = 0
+
+    def next_time(self):
+        """Return the time of the next check.
+        """
+        when = time.monotonic() + next(self.delays)
+        if self.deadline is not None:
+            when = min(when, self.deadline)
+        return when
+
+    def poll(self):
+        """Check the condition, recording the statistics of the wait when done.
+
+        :return: True if done.
+        """
+        self.polls += 1
+        previous, self.last_check = self.last_check, time.monotonic()
+        if not self.check():
+            return False
+
+        now = time.monotonic()
+        timing = self.driver.timing
+        timing.add('wait_' + self.name, now - self.start)
+        timing.add('wait_{}_polls'.format(self.name), self.polls)
+        # Upper bound of the time elapsed between the completion and its detection.
+        timing.add('wait_{}_overshoot'.format(self.name), now - previous)
+        return True
+
+    def expired(self):
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def timeout_error(self):
+        return LantzTimeoutError('{} not done after {:.3f} s ({} polls)'.format(self.name,
+                                                                               time.monotonic() - self.start,
+                                                                               self.polls))
+
+
+class Poller(object):
+    """Schedules the checks of many waits from a single thread.
+
+    :param pool: executor in which the conditions are checked.
+                 Defaults to the process wide shared pool.
+    """
+
+    def __init__(self, pool=None):
+        self._pool = pool or get_shared_pool()
+        self._heap = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def __len__(self):
+        """Number of scheduled checks.
+        """
+        return len(self._heap)
+
+    def submit(self, wait):
+        """Start waiting.
+
+        :type wait: Wait
+        :rtype: lantz.executors.Future
+        """
+        wait.future.add_done_callback(self._discard)
+        self._schedule(wait, wait.next_time())
+        return wait.future
+
+    def _discard(self, fut):
+        # Cancelled waits are removed instead of kept until their next check.
+        if not fut.cancelled():
+            return
+        with self._condition:
+            heap = [item for item in self._heap if item[2].future is not fut]
+            if len(heap) != len(self._heap):
+                self._heap[:] = heap
+                heapq.heapify(self._heap)
+                self._condition.notify()
+
+    def _schedule(self, wait, when):
+        with self._condition:
+            heapq.heappush(self._heap, (when, next(self._counter), wait))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='lantz-poller', daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def _run(self):
+        heap = self._heap
+        while True:
+            with self._condition:
+                while True:
+                    if not heap:
+                        self._condition.wait()
+                        continue
+                    delay = heap[0][0] - time.monotonic()
+                    if delay <= 0:
+                        break
+                    self._condition.wait(delay)
+                _, _, wait = heapq.heappop(heap)
+
+            if not wait.future.done():
+                self._pool.submit(self._check, wait)
+
+    def _check(self, wait):
+        fut = wait.future
+        if fut.done():
+            return
+        try:
+            done = wait.poll()
+        except Exception as e:
+            _set(fut.set_exception, e)
+            return
+
+        if done:
+            _set(fut.set_result, wait.polls)
+        elif wait.expired():
+            _set(fut.set_exception, wait.timeout_error())
+        else:
+            self._schedule(wait, wait.next_time())
+
+
+def _set(setter, value):
+    try:
+        setter(value)
+    except futures.InvalidStateError:
+        # Cancelled in the meantime.
+        pass
+
+
+_poller = None
+_poller_lock = threading.Lock()
+
+
+def get_poller():
+    """Return the process wide poller, creating it if necessary.
+
+    :rtype: Poller
+    """
+    global _poller
+    with _poller_lock:
+        if _poller is None:
+            _poller = Poller()
+        return _poller
@@ -9,6 +9,11 @@
 
 import warnings
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 from . import Q_
 from .log import LOGGER as _LOG
 from stringparser import Parser
@@ -32,10 +37,102 @@ def _getitem(a, b):
 
 getitem = _getitem
 
+
+def compose(*funcs):
+    """Return a single callable that applies funcs from left to right.
+
+    Identity processors are dropped and short chains are unrolled,
+    so calling the result does not loop over a list of processors.
+
+        >>> compose(float, abs)('-3')
+        3.0
+        >>> compose() is _do_nothing
+        True
+    """
+    funcs = tuple(func for func in funcs if func is not _do_nothing)
+
+    if not funcs:
+        return _do_nothing
+
+    if len(funcs) == 1:
+        return funcs[0]
+
+    if len(funcs) == 2:
+        first, second = funcs
+
+        def _inner(value):
+            return second(first(value))
+        return _inner
+
+    if len(funcs) == 3:
+        first, second, third = funcs
+
+        def _inner(value):
+            return third(second(first(value)))
+        return _inner
+
+    def _inner(value):
+        for func in funcs:
+            value = func(value)
+        return value
+    return _inner
+
+
+def _as_float(value):
+    """Return value as a float or, for NumPy arrays, as a float array
+    (without copying if it is already one).
+    """
+    if np is not None and isinstance(value, np.ndarray):
+        return value.astype(float, copy=False)
+    return float(value)
+
+
+#: Cache of conversion factors indexed by (source units, target units).
+#: None indicates that the conversion is not a multiplication (e.g. temperatures).
+_FACTORS = {}
+
+
+def conversion_factor(source, target):
+    """Return the factor to multiply a magnitude in source units
+    to obtain the magnitude in target units, or None if the conversion
+    cannot be done by a multiplication. The result is cached.
+
+        >>> conversion_factor(Q_(1, 'V').units, Q_(1, 'mV').units)
+        1000.0
+
+    :raises: :class:`ValueError` (pint.DimensionalityError)
+             if the units are incompatible.
+    """
+    key = (source, target)
+    try:
+        return _FACTORS[key]
+    except KeyError:
+        pass
+
+    factor = Q_(1., source).to(target).magnitude
+    if Q_(0., source).to(target).magnitude != 0:
+        factor = None
+    _FACTORS[key] = factor
+    return factor
+
+
+def _magnitude_in(value, units):
+    """Return the magnitude of the quantity value expressed in units,
+    using a single multiplication (vectorized for NumPy arrays).
+    """
+    factor = conversion_factor(value.units, units)
+    if factor is None:
+        return value.to(units).magnitude
+    return value.magnitude * factor
+
+
 def convert_to(units, on_dimensionless='warn', on_incompatible='raise',
                return_float=False):
     """Return a function that convert a Quantity to to another units.
 
+    NumPy arrays are converted with a single multiplication by a
+    conversion factor that is calculated once per pair of units.
+
     :param units: string or Quantity specifying the target units
     :param on_dimensionless: how to proceed when a dimensionless number
                              number is given.
@@ -66,11 +163,13 @@ def convert_to(units, on_dimensionless='warn', on_incompatible='raise',
         raise ValueError("{} is not a valid value for 'units'. "
                          "It should be either str or Quantity")
 
+    target, scale = units.units, units.magnitude
+
     if return_float:
         def _inner(value):
             if isinstance(value, Q_):
                 try:
-                    return value.to(units).magnitude
+                    return _magnitude_in(value, target)
                 except ValueError as e:
                     if on_incompatible == 'raise':
                         raise ValueError(e)
@@ -91,13 +190,19 @@ def convert_to(units, on_dimensionless='warn', on_incompatible='raise',
                         _LOG.warn(msg)
 
                 # on_incompatible == 'ignore'
-                return float(value)
+                return _as_float(value)
         return _inner
     else:
+        def _attach(magnitude):
+            # Attaching the units does not copy NumPy arrays.
+            if scale == 1:
+                return Q_(magnitude, target)
+            return Q_(magnitude * scale, target)
+
         def _inner(value):
             if isinstance(value, Q_):
                 try:
-                    return value.to(units)
+                    return Q_(_magnitude_in(value, target), target)
                 except ValueError as e:
                     if on_incompatible == 'raise':
                         raise ValueError(e)
@@ -107,7 +212,7 @@ def convert_to(units, on_dimensionless='warn', on_incompatible='raise',
                         _LOG.warn(msg)
 
                 # on_incompatible == 'ignore'
-                return float(value.magnitude) * units
+                return _attach(_as_float(value.magnitude))
             else:
                 if not units.dimensionless:
                     if on_dimensionless == 'raise':
@@ -118,7 +223,7 @@ def convert_to(units, on_dimensionless='warn', on_incompatible='raise',
                         _LOG.warn(msg)
 
                 # on_incompatible == 'ignore'
-                return float(value) * units
+                return _attach(_as_float(value))
         return _inner
 
 
@@ -9,6 +9,8 @@
     :license: BSD, see LICENSE for more details.
 """
 
+import threading
+from array import array
 from collections import namedtuple
 
 #: Data structure
@@ -27,30 +29,88 @@ def stats(state):
     if not state.count:
         return Stats(0, 0, 0, 0, 0, 0)
 
-    mean = state.sum / state.count
-    std = (float(state.sum2 - 2.0 * state.sum * mean + state.count * mean ** 2.0) / float(state.count)) ** 0.5
     return Stats(state.last, state.count,
-                 mean, std, state.min, state.max)
+                 state.mean, (state.m2 / state.count) ** 0.5, state.min, state.max)
+
+
+def window_stats(state):
+    """Return the statistics for the values in the window of given state.
+
+    :param state: state
+    :type state: RunningState
+    :return: statistics
+    :rtype: Stats named tuple
+    """
+    values = state.values
+    if not values:
+        return Stats(0, 0, 0, 0, 0, 0)
+
+    count = len(values)
+    mean = sum(values) / count
+    std = (sum((value - mean) ** 2 for value in values) / count) ** 0.5
+    return Stats(state.last, count, mean, std, min(values), max(values))
+
+
+def percentile(values, q):
+    """Return the q-th percentile of a sorted sequence,
+    linearly interpolating between the closest ranks (as numpy does).
+
+    >>> percentile([1, 2, 3, 4], 50)
+    2.5
+
+    :param values: sorted sequence.
+    :param q: percentile (between 0 and 100).
+    """
+    if not values:
+        return 0
+    position = (len(values) - 1) * q / 100.
+    low = int(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
 
 
 class RunningState(object):
     """Accumulator for events.
 
+    The mean and the variance are updated using Welford's algorithm,
+    which is numerically stable for a large number of events.
+
     :param value: first value to add.
+    :param window: if given, the last `window` values are kept to
+                   calculate percentiles and windowed statistics.
+    :param alpha: if given, smoothing factor (0 < alpha <= 1) of
+                  an exponentially weighted mean and variance.
     """
 
-    def __init__(self, value=None):
+    __slots__ = ('last', 'count', 'sum', 'mean', 'm2', 'min', 'max',
+                 'window', 'values', 'alpha', 'ewm', 'ewv')
+
+    def __init__(self, value=None, window=None, alpha=None):
+        self.last = 0
+        self.count = 0
+        self.sum = 0
+        self.mean = 0.
+        self.m2 = 0.
+        self.min = float('inf')
+        self.max = float('-inf')
+
+        #: Maximum number of values kept.
+        self.window = window
+        #: Ring buffer with the last values (None if window is not given).
+        self.values = array('d') if window else None
+
+        self.alpha = alpha
+        #: Exponentially weighted mean and variance (None if alpha is not given).
+        self.ewm = self.ewv = None
+
         if value is not None:
             self.add(value)
 
-    def __getattr__(self, key):
-        if key in ('last', 'count', 'sum', 'sum2'):
-            return 0
-        if key == 'min':
-            return float('inf')
-        if key == 'max':
-            return float('-inf')
-        raise AttributeError('{} is not a valid attribute of RunningState'.format(key))
+    @property
+    def sum2(self):
+        """Sum of the squares of the values.
+        """
+        return self.m2 + self.count * self.mean ** 2
 
     def add(self, value):
         """Add to the accumulator.
@@ -60,25 +120,68 @@ class RunningState(object):
         self.last = value
         self.count += 1
         self.sum += value
-        self.sum2 += value * value
-        self.min = min(self.min, value)
-        self.max = max(self.max, value)
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+        values = self.values
+        if values is not None:
+            if len(values) < self.window:
+                values.append(value)
+            else:
+                values[(self.count - 1) % self.window] = value
+
+        if self.alpha is not None:
+            if self.ewm is None:
+                self.ewm, self.ewv = value, 0.
+            else:
+                delta = value - self.ewm
+                increment = self.alpha * delta
+                self.ewm += increment
+                self.ewv = (1 - self.alpha) * (self.ewv + delta * increment)
+
+    def percentiles(self, qs=(50, 95, 99)):
+        """Return the percentiles of the values in the window.
+
+        :param qs: percentiles to calculate (between 0 and 100).
+        :rtype: tuple
+        """
+        if self.values is None:
+            raise ValueError('percentiles require a window')
+        values = sorted(self.values)
+        return tuple(percentile(values, q) for q in qs)
 
 
 class RunningStats(dict):
     """Accumulator for categorized event statistics.
+
+    :param window: number of values kept by each accumulator to
+                   calculate percentiles and windowed statistics.
+    :param alpha: smoothing factor of exponentially weighted statistics.
     """
 
+    def __init__(self, window=None, alpha=None):
+        super().__init__()
+        self.window = window
+        self.alpha = alpha
+        # Events are added from many threads (e.g. the executor of a driver).
+        self._lock = threading.Lock()
+
     def add(self, key, value):
         """Add an event to a given accumulator.
 
         :param key: category to which the event should be added.
         :param value: value of the event.
         """
-        if key in self:
-            super().__getitem__(key).add(value)
-        else:
-            super().__setitem__(key, RunningState(value))
+        with self._lock:
+            if key in self:
+                super().__getitem__(key).add(value)
+            else:
+                super().__setitem__(key, RunningState(value, self.window, self.alpha))
 
     def stats(self, key):
         """Return the statistics for the current accumulator.
@@ -86,3 +189,22 @@ class RunningStats(dict):
         :rtype: Stats.
         """
         return stats(super().__getitem__(key))
+
+    def window_stats(self, key):
+        """Return the statistics for the last values of the current accumulator.
+
+        :rtype: Stats.
+        """
+        return window_stats(super().__getitem__(key))
+
+    def percentiles(self, key, qs=(50, 95, 99)):
+        """Return percentiles of the last values of the current accumulator.
+
+        For example, for a Feat named `eggs`::
+
+            p50, p95, p99 = driver.timing.percentiles('get_eggs')
+
+        :param qs: percentiles to calculate (between 0 and 100).
+        :rtype: tuple
+        """
+        return super().__getitem__(key).percentiles(qs)
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+import time
+import doctest
+import unittest
+
+import numpy as np
+
+from lantz import blocks
+
+
+def chunked(data, size):
+    """Return a read(size) callable returning data in chunks of at most size bytes.
+    """
+    position = [0]
+
+    def _read(n):
+        out = data[position[0]:position[0] + min(n, size)]
+        position[0] += len(out)
+        return out
+    return _read
+
+
+class BlocksTest(unittest.TestCase):
+
+    def test_docs(self):
+        doctest.testmod(blocks)
+
+    def test_definite(self):
+        curve = np.arange(-1250, 1250, dtype='>i2')
+        message = b'CURV #45000' + curve.tobytes() + b'\n'
+        for size in (1, 7, 64, 10000):
+            rest = []
+            read = chunked(message, size)
+            out = blocks.read_block(read, '>i2', lambda: rest.append(read(10)))
+            np.testing.assert_equal(out, curve)
+            self.assertEqual(rest, [b'\n'])
+
+        np.testing.assert_equal(blocks.parse_block(message, '>i2'), curve)
+        self.assertRaises(EOFError, blocks.read_block, chunked(message[:100], 10), '>i2')
+        self.assertRaises(EOFError, blocks.parse_block, message[:100], '>i2')
+        self.assertRaises(ValueError, blocks.read_block, chunked(b'#A', 10))
+
+    def test_indefinite(self):
+        data = np.linspace(0, 1, 100, dtype='<f4')
+        read = chunked(b'#0' + data.tobytes() + b'\n', 32)
+        out = blocks.read_block(read, '<f4', lambda: b''.join(iter(lambda: read(1000), b''))[:-1])
+        np.testing.assert_equal(out, data)
+        np.testing.assert_equal(blocks.parse_block(b'#0' + data.tobytes() + b'\n', '<f4'), data)
+        self.assertRaises(ValueError, blocks.read_block, chunked(b'#0123', 10))
+
+    def test_read_array(self):
+        data = np.arange(10, dtype='<f4')
+        np.testing.assert_equal(blocks.read_array(chunked(data.tobytes(), 3), 10, '<f4'), data)
+
+    def test_scale(self):
+        out = blocks.scale(np.array([0, 10, 20], dtype='>u2'), 0.5, 10, 1)
+        np.testing.assert_equal(out, [-4, 1, 6])
+        self.assertEqual(out.dtype, float)
+
+    def test_speed(self):
+        curve = np.arange(2500, dtype='>u2')
+        message = b'#45000' + curve.tobytes() + b'\n'
+        N = 100
+        tic = time.perf_counter()
+        for _ in range(N):
+            read = chunked(message, len(message))
+            blocks.scale(blocks.read_block(read, '>u2', lambda: read(1)), 0.1, 2, 0.)
+        # Generous bound (typically tens of microseconds).
+        self.assertLess((time.perf_counter() - tic) / N, 1e-3)
+
+
+if __name__ == '__main__':
+    unittest.main()
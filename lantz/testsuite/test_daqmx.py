@@ -0,0 +1,363 @@
+# -*- coding: utf-8 -*-
+
+import ctypes
+import threading
+import unittest
+from concurrent import futures
+
+import numpy as np
+
+from lantz import Q_
+from lantz.drivers.ni.daqmx import (AnalogInputTask, Constants, CounterInputTask,
+                                    DigitalInputTask)
+
+
+def _set(buffer, value):
+    buffer[0] = value
+    return 0
+
+
+class FakeFunction(object):
+    """A function of the stand-in library, counting the calls.
+    """
+
+    def __init__(self, name, func, calls):
+        self.name = name
+        self.func = func
+        self.calls = calls
+
+    def __call__(self, *args):
+        self.calls.append(self.name)
+        return self.func(*args)
+
+
+class FakeDAQmx(object):
+    """Stand-in for the DAQmx library producing a ramp of synthetic samples
+    (channel * 1000 + sample number) when acquire is called.
+    """
+
+    def __init__(self, channels=2):
+        self.channels = channels
+        self.produced = 0
+        self.consumed = 0
+        self.callback = None
+        self.running = False
+        self.calls = []
+        self.waiting = threading.Event()
+        self.done = threading.Event()
+        self.aborted = False
+        #: Timeouts passed to the read functions.
+        self.timeouts = []
+
+        for name in ('DAQmxCreateAIVoltageChan', 'DAQmxReadAnalogScalarF64'):
+            setattr(self, name, lambda *args: 0)
+        for name in dir(self):
+            if name.startswith('DAQmx'):
+                setattr(self, name, FakeFunction(name[5:], getattr(self, name), self.calls))
+
+    def DAQmxCreateTask(self, name, handle):
+        return _set(handle, 1)
+
+    def DAQmxGetTaskName(self, handle, buffer, size):
+        buffer.value = b'fake'
+        return 0
+
+    def DAQmxGetTaskNumChans(self, handle, value):
+        return _set(value, self.channels)
+
+    def DAQmxGetTaskChannels(self, handle, buffer, size):
+        buffer.value = ', '.join('ai{}'.format(i) for i in range(self.channels)).encode('ascii')
+        return 0
+
+    def DAQmxTaskControl(self, handle, action):
+        if action == Constants.Val_Task_Abort:
+            self.aborted = True
+            self.done.set()
+        return 0
+
+    def DAQmxWaitUntilTaskDone(self, handle, timeout):
+        self.waiting.set()
+        self.done.wait(5)
+        return -200088 if self.aborted else 0
+
+    def DAQmxGetErrorString(self, code, buffer, size):
+        message = 'Error {}'.format(code).encode('ascii')
+        if buffer is None:
+            return len(message) + 1
+        buffer.value = message
+        return 0
+
+    def DAQmxRegisterEveryNSamplesEvent(self, handle, event_type, samples, options, func, cb_data):
+        self.event_type = event_type
+        self.callback = func
+        return 0
+
+    def DAQmxStartTask(self, handle):
+        self.running = True
+        return 0
+
+    def DAQmxStopTask(self, handle):
+        self.running = False
+        return 0
+
+    def DAQmxClearTask(self, handle):
+        return 0
+
+    def DAQmxReadAnalogF64(self, handle, samples, timeout, group_by, pointer, size, read, reserved):
+        self.timeouts.append(timeout)
+        samples = min(samples, self.produced - self.consumed, size // self.channels)
+        data = np.ctypeslib.as_array((ctypes.c_double * size).from_address(pointer))
+        values = (np.arange(self.consumed, self.consumed + samples) +
+                  1000. * np.arange(self.channels)[:, None])
+        if group_by == Constants.Val_GroupByScanNumber:
+            data[:values.size] = values.T.ravel()
+        else:
+            data.reshape(self.channels, -1)[:, :samples] = values
+        self.consumed += samples
+        return _set(read, samples)
+
+    def DAQmxReadDigitalLines(self, handle, samples, timeout, group_by, pointer, size, read,
+                              bytes_per_sample, reserved):
+        self.timeouts.append(timeout)
+        samples = min(samples, size // self.channels)
+        data = np.ctypeslib.as_array((ctypes.c_uint8 * size).from_address(pointer))
+        # One byte per sample: the sample number plus 10 times the channel.
+        values = (np.arange(samples) + 10 * np.arange(self.channels)[:, None]).astype('u1')
+        if group_by == Constants.Val_GroupByScanNumber:
+            data[:values.size] = values.T.ravel()
+        else:
+            data.reshape(self.channels, -1)[:, :samples] = values
+        _set(read, samples)
+        return _set(bytes_per_sample, 1)
+
+    def DAQmxReadCounterU32(self, handle, samples, timeout, pointer, size, read, reserved):
+        self.timeouts.append(timeout)
+        samples = min(samples, size, self.produced)
+        data = np.ctypeslib.as_array((ctypes.c_uint32 * size).from_address(pointer))
+        data[:samples] = np.arange(samples) * 3
+        return _set(read, samples)
+
+    def DAQmxGetReadAvailSampPerChan(self, handle, value):
+        return _set(value, self.produced - self.consumed)
+
+    def acquire(self, samples, every):
+        for _ in range(samples // every):
+            self.produced += every
+            self.callback(1, self.event_type, every, None)
+
+
+class DAQmxStreamTest(unittest.TestCase):
+
+    def setUp(self):
+        self.lib = FakeDAQmx()
+        self.task = AnalogInputTask(library=self.lib)
+
+    def tearDown(self):
+        self.task.clear()
+
+    def expected(self, start, samples):
+        return np.arange(start, start + samples) + 1000. * np.arange(2)[:, None]
+
+    def test_stream(self):
+        task, lib = self.task, self.lib
+        task.start_stream(10, ring_size=4)
+        self.assertTrue(lib.running)
+        self.assertEqual(lib.event_type, Constants.Val_Acquired_Into_Buffer)
+        self.assertEqual(task.ring.shape, (4, 2, 10))
+        ring = task.ring
+
+        lib.acquire(30, 10)
+        self.assertEqual(task.acquired, 3)
+        np.testing.assert_equal(task.wait_block(0, timeout=0), self.expected(0, 10))
+        block = task.wait_block(2, timeout=0)
+        np.testing.assert_equal(block, self.expected(20, 10))
+        self.assertIs(block.base, ring)
+
+        lib.calls.clear()
+        lib.acquire(10, 10)
+        # The position of block 0 is the next to be filled.
+        self.assertRaises(IndexError, task.wait_block, 0, 0)
+        np.testing.assert_equal(task.wait_block(1, timeout=0), self.expected(10, 10))
+        lib.acquire(10, 10)
+        self.assertEqual(lib.calls, ['ReadAnalogF64'] * 2)
+        self.assertIs(task.ring, ring)
+        self.assertRaises(IndexError, task.wait_block, 1, 0)
+
+        task.stop_stream()
+        self.assertFalse(lib.running)
+        self.assertIsNone(lib.callback)
+
+    def test_blocks(self):
+        task, lib = self.task, self.lib
+        task.start_stream(5, ring_size=3, group_by='scan')
+        lib.acquire(25, 5)
+        task.stop_stream()
+
+        blocks = task.blocks(start=0, skip_overruns=True)
+        np.testing.assert_equal(next(blocks), self.expected(15, 5).T)
+        self.assertEqual(task.overruns, 3)
+        self.assertEqual(len(list(blocks)), 1)
+
+        self.assertRaises(IndexError, list, task.blocks(start=0))
+
+    def test_not_started(self):
+        self.assertRaises(RuntimeError, self.task.wait_block, 0, 0)
+        self.assertRaises(RuntimeError, list, self.task.blocks())
+
+    def test_error(self):
+        task, lib = self.task, self.lib
+        task.start_stream(10, ring_size=2)
+        lib.produced = 5
+        lib.callback(1, lib.event_type, 10, None)
+        self.assertIsInstance(task._stream_error, Exception)
+        self.assertRaises(RuntimeError, task.wait_block, 0, 0)
+        self.assertRaises(RuntimeError, list, task.blocks())
+
+
+class DAQmxReadIntoTest(unittest.TestCase):
+
+    def setUp(self):
+        self.lib = FakeDAQmx()
+        self.tasks = []
+
+    def tearDown(self):
+        for task in self.tasks:
+            task.clear()
+
+    def create(self, task_class):
+        task = task_class(library=self.lib)
+        self.tasks.append(task)
+        return task
+
+    def test_analog(self):
+        task, lib = self.create(AnalogInputTask), self.lib
+        lib.produced = 15
+        storage = np.zeros((4, 2, 5))
+        self.assertEqual(task.read_into(storage[1], timeout=0.5), 5)
+        np.testing.assert_equal(storage[1], np.arange(5) + 1000. * np.arange(2)[:, None])
+        self.assertFalse(storage[0].any())
+
+        out = np.zeros((5, 2))
+        self.assertEqual(task.read_into(out, group_by='scan'), 5)
+        np.testing.assert_equal(out, (np.arange(5, 10) + 1000. * np.arange(2)[:, None]).T)
+
+        data = task.read()
+        np.testing.assert_equal(data, np.arange(10, 15) + 1000. * np.arange(2)[:, None])
+
+        lib.produced += 2
+        out = np.zeros((2, 5))
+        self.assertEqual(task.read_into(out), 2)
+
+    def test_analog_checks(self):
+        task = self.create(AnalogInputTask)
+        self.assertRaises(TypeError, task.read_into, [0.] * 10)
+        self.assertRaises(TypeError, task.read_into, np.zeros((2, 5), dtype='f4'))
+        self.assertRaises(ValueError, task.read_into, np.zeros((5, 2)).T)
+        self.assertRaises(ValueError, task.read_into, np.zeros((3, 5)))
+        self.assertRaises(ValueError, task.read_into, np.zeros(10))
+        self.assertRaises(ValueError, task.read_into, np.zeros((2, 5)), group_by='scan')
+        readonly = np.zeros((2, 5))
+        readonly.flags.writeable = False
+        self.assertRaises(ValueError, task.read_into, readonly)
+        self.assertEqual(self.lib.calls.count('ReadAnalogF64'), 0)
+
+    def test_digital(self):
+        task = self.create(DigitalInputTask)
+        out = np.zeros((4, 2), dtype='u1')
+        self.assertEqual(task.read_into(out), (4, 1))
+        np.testing.assert_equal(out, [[0, 10], [1, 11], [2, 12], [3, 13]])
+        self.assertRaises(TypeError, task.read_into, np.zeros((4, 2), dtype='i1'))
+        self.assertRaises(TypeError, task.read_into, [0] * 8)
+
+    def test_counter(self):
+        task = self.create(CounterInputTask)
+        self.lib.produced = 3
+        out = np.zeros(5, dtype='u4')
+        self.assertEqual(task.read_into(out), 3)
+        np.testing.assert_equal(out, [0, 3, 6, 0, 0])
+        self.assertRaises(TypeError, task.read_into, np.zeros(5, dtype='i4'))
+        self.assertRaises(TypeError, task.read_into, [0] * 5)
+        np.testing.assert_equal(task.read(2), [0, 3])
+        self.assertIn('read_into', task.actions)
+
+    def test_quantity_timeout(self):
+        out = np.zeros((2, 5))
+        task = self.create(AnalogInputTask)
+        task.read_into(out, timeout=Q_(500, 'ms'))
+        task = self.create(DigitalInputTask)
+        task.read_into(np.zeros((4, 2), dtype='u1'), timeout=Q_(1, 's'))
+        task = self.create(CounterInputTask)
+        task.read_into(np.zeros(5, dtype='u4'), timeout=Q_(2, 's'))
+        self.assertEqual(self.lib.timeouts, [0.5, 1., 2.])
+
+
+class DAQmxMetadataTest(unittest.TestCase):
+
+    def setUp(self):
+        self.lib = FakeDAQmx()
+        self.task = AnalogInputTask(library=self.lib)
+
+    def tearDown(self):
+        self.task.clear()
+
+    def test_steady_state(self):
+        task, lib = self.task, self.lib
+        lib.produced = 20
+        out = np.zeros((2, 5))
+        task.read_into(out)
+        lib.calls.clear()
+        for _ in range(3):
+            task.read_into(out)
+        self.assertEqual(lib.calls, ['ReadAnalogF64'] * 3)
+        self.assertEqual(task.metadata_stats()['number_of_channels'], (3, 1))
+
+    def test_names(self):
+        task, lib = self.task, self.lib
+        self.assertEqual(task.channel_names, ('ai0', 'ai1'))
+        self.assertIn('ai1', task.channels)
+        self.assertNotIn('ai2', task.channels)
+        self.assertEqual(lib.calls.count('GetTaskChannels'), 1)
+
+    def test_invalidate(self):
+        task, lib = self.task, self.lib
+        self.assertEqual(task.number_of_channels, 2)
+        lib.channels = 3
+        self.assertEqual(task.number_of_channels, 2)
+        task.commit()
+        self.assertEqual(task.number_of_channels, 3)
+        lib.channels = 1
+        task.stop()
+        self.assertEqual(task.number_of_channels, 1)
+        self.assertEqual(lib.calls.count('GetTaskNumChans'), 3)
+
+
+class DAQmxWaitTest(unittest.TestCase):
+
+    def setUp(self):
+        self.lib = FakeDAQmx()
+        self.task = AnalogInputTask(library=self.lib)
+
+    def tearDown(self):
+        self.task.clear()
+
+    def test_wait_until_done(self):
+        with futures.ThreadPoolExecutor(1) as executor:
+            fut = executor.submit(self.task.wait_until_done, Q_(10, 's'))
+            self.assertTrue(self.lib.waiting.wait(5))
+            # The task lock is not held while waiting.
+            self.assertEqual(self.task.number_of_channels, 2)
+            self.lib.done.set()
+            self.assertEqual(fut.result(5), 0)
+        self.assertFalse(self.lib.aborted)
+
+    def test_cancel(self):
+        fut = self.task.task_done()
+        self.assertTrue(self.lib.waiting.wait(5))
+        self.assertTrue(fut.cancel())
+        self.assertRaises(futures.CancelledError, fut.result, 5)
+        self.assertTrue(self.lib.aborted)
+        self.assertIn('TaskControl', self.lib.calls)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,15 @@
 # -*- coding: utf-8 -*-
 
+import asyncio
+import threading
 import unittest
 from time import sleep
+from unittest import mock
 
 from lantz import Driver, Feat, Action, Q_
-from lantz.driver import Self
+from lantz.driver import Self, ainitialize_many, afinalize_many, initialize_many, finalize_many
+from lantz.errors import LantzTimeoutError
+from lantz.feat import MISSING
 
 SLEEP = .1
 WAIT = .2
@@ -144,6 +149,209 @@ class DriverTest(unittest.TestCase):
         sleep(2 * SLEEP + WAIT)
         self.assertEqual(obj.unfinished_tasks, 0)
 
+    def test_shared_executor(self):
+        objs = [aDriver(True) for _ in range(3)]
+        for obj in objs:
+            obj.update_async({'eggs': 1})
+            obj.update_async({'eggs': 2})
+        self.assertIs(type(objs[0]._executor), type(objs[1]._executor))
+        self.assertIsNot(objs[0]._executor, objs[1]._executor)
+
+        sleep(.5 * SLEEP)
+        self.assertEqual(objs[0].queued_tasks, 1)
+        sleep(SLEEP)
+        for obj in objs:
+            self.assertEqual(obj._eggs, 1)
+            self.assertEqual(obj.queued_tasks, 0)
+        sleep(SLEEP + WAIT)
+        for obj in objs:
+            self.assertEqual(obj._eggs, 2)
+            self.assertEqual(obj.unfinished_tasks, 0)
+            self.assertEqual(obj.timing.stats('async_wait').count, 2)
+
+    def test_dedicated_executor(self):
+
+        class PoolDriver(aDriver):
+            EXECUTOR_WORKERS = 2
+
+        obj = PoolDriver(True)
+        obj.update_async({'eggs': 1})
+        obj.update_async({'ham': 2})
+        sleep(SLEEP + WAIT)
+        self.assertEqual((obj._eggs, obj._ham), (1, 2))
+        self.assertEqual(obj._executor._max_workers, 2)
+
+    def test_cancel_running(self):
+
+        class PoolDriver(aDriver):
+            EXECUTOR_WORKERS = 2
+
+        obj = PoolDriver(True)
+        running = obj.update_async({'eggs': 1})
+        sleep(.5 * SLEEP)
+        self.assertFalse(running.cancel())
+        self.assertFalse(running.cancelled())
+        self.assertEqual((obj.queued_tasks, obj.unfinished_tasks), (0, 1))
+        self.assertIsNone(running.result(SLEEP + WAIT))
+        self.assertEqual((obj.queued_tasks, obj.unfinished_tasks), (0, 0))
+        self.assertEqual(obj._eggs, 1)
+
+    def test_cancel_queued(self):
+        obj = aDriver(True)
+        obj.update_async({'eggs': 1})
+        queued = obj.update_async({'eggs': 2})
+        sleep(.5 * SLEEP)
+        self.assertTrue(queued.cancel())
+        self.assertTrue(queued.cancelled())
+        sleep(SLEEP + WAIT)
+        self.assertEqual((obj.queued_tasks, obj.unfinished_tasks), (0, 0))
+        self.assertEqual(obj._eggs, 1)
+
+    def test_asyncio(self):
+        objs = [aDriver(True) for _ in range(3)]
+
+        async def _run():
+            await asyncio.gather(*(obj.aset('eggs', n) for n, obj in enumerate(objs)))
+            values = await asyncio.gather(*(obj.afeat('eggs') for obj in objs))
+            results = await asyncio.gather(objs[0].run2_async(2), objs[1].acall('run2', 3))
+            return values, results
+
+        values, results = asyncio.run(_run())
+        self.assertEqual(values, [0, 1, 2])
+        self.assertEqual(results, [84, 126])
+
+    def test_ainitialize_many(self):
+        order = []
+
+        class InitDriver(aDriver):
+
+            def initialize(self):
+                sleep(SLEEP if self.name == 'slow' else 0)
+                if self.name == 'broken':
+                    raise ValueError
+                order.append('init ' + self.name)
+
+            def finalize(self):
+                order.append('fin ' + self.name)
+
+        objs = [InitDriver(name=name) for name in ('slow', 'fast', 'child')]
+        dependencies = {'child': ('fast', )}
+
+        asyncio.run(ainitialize_many(objs, register_finalizer=False, dependencies=dependencies))
+        self.assertEqual(order, ['init fast', 'init child', 'init slow'])
+
+        del order[:]
+        asyncio.run(afinalize_many(objs, dependencies=dependencies))
+        self.assertLess(order.index('fin child'), order.index('fin fast'))
+
+        # Circular dependencies are reported before initializing any driver.
+        del order[:]
+        self.assertRaises(ValueError, asyncio.run,
+                          ainitialize_many(objs, register_finalizer=False,
+                                           dependencies={'child': ('fast', ), 'fast': ('child', )}))
+        self.assertRaises(ValueError, asyncio.run,
+                          afinalize_many(objs, dependencies={'child': ('child', )}))
+        self.assertEqual(order, [])
+
+        # Errors are reported and do not stop the other drivers.
+        exceptions = []
+        asyncio.run(ainitialize_many(objs + [InitDriver(name='broken')], register_finalizer=False,
+                                     on_exception=lambda driver, ex: exceptions.append(driver.name)))
+        self.assertEqual(exceptions, ['broken'])
+        self.assertEqual(sorted(order), ['init child', 'init fast', 'init slow'])
+
+    def test_initialize_many(self):
+        order = []
+
+        class ManyDriver(aDriver):
+
+            def initialize(self):
+                sleep({'slow': 3 * SLEEP, 'fast': SLEEP}.get(self.name, 0))
+                order.append('init ' + self.name)
+
+            def finalize(self):
+                order.append('fin ' + self.name)
+
+        objs = [ManyDriver(name=name) for name in ('slow', 'fast', 'child', 'grandchild')]
+        dependencies = {'child': ('fast', ), 'grandchild': ('child', )}
+
+        # Children do not wait for unrelated drivers.
+        times = initialize_many(objs, register_finalizer=False, concurrent=True,
+                                dependencies=dependencies)
+        self.assertEqual(order, ['init fast', 'init child', 'init grandchild', 'init slow'])
+        self.assertEqual(set(times.keys()), {'slow', 'fast', 'child', 'grandchild'})
+        self.assertAlmostEqual(times['child'][0], SLEEP, delta=SLEEP / 2)
+        self.assertAlmostEqual(times['slow'][1], 3 * SLEEP, delta=SLEEP / 2)
+        self.assertEqual(objs[0].timing.stats('initialize').count, 1)
+
+        del order[:]
+        finalize_many(objs, dependencies=dependencies)
+        self.assertLess(order.index('fin grandchild'), order.index('fin child'))
+        self.assertLess(order.index('fin child'), order.index('fin fast'))
+
+        # Bounded workers and serial initialization follow dependencies.
+        for kwargs in ({'concurrent': True, 'max_workers': 1}, {}):
+            del order[:]
+            initialize_many(objs[1:], register_finalizer=False,
+                            dependencies={'fast': ('grandchild', ), 'grandchild': ('child', )},
+                            **kwargs)
+            self.assertEqual(order, ['init child', 'init grandchild', 'init fast'])
+
+        self.assertRaises(ValueError, initialize_many, objs, register_finalizer=False,
+                          dependencies={'child': ('fast', ), 'fast': ('child', )})
+
+    def test_initialize_many_errors(self):
+        order = []
+
+        class ManyDriver(aDriver):
+
+            def initialize(self):
+                sleep(3 * SLEEP if self.name == 'slow' else 0)
+                if self.name == 'broken':
+                    raise ValueError
+                order.append('init ' + self.name)
+
+        objs = [ManyDriver(name=name) for name in ('slow', 'broken', 'other', 'child')]
+        exceptions = []
+        with mock.patch('atexit.register') as register:
+            initialize_many(objs, concurrent=True, timeout=SLEEP,
+                            dependencies={'child': ('slow', )},
+                            on_exception=lambda driver, ex: exceptions.append((driver.name, type(ex))))
+        # The driver depending on the one that timed out is not initialized.
+        self.assertEqual(sorted(exceptions), [('broken', ValueError), ('child', LantzTimeoutError),
+                                              ('slow', LantzTimeoutError)])
+        # Finalizers are not registered for the calls that timed out
+        # (the finalize action is bound to the driver with a partial).
+        self.assertEqual(sorted(finalize.args[0].name for (finalize, ), _ in register.call_args_list),
+                         ['broken', 'other'])
+        self.assertEqual(order, ['init other'])
+        sleep(3 * SLEEP)
+        self.assertEqual(order, ['init other', 'init slow'])
+
+        self.assertRaises(ValueError, initialize_many, objs[1:], register_finalizer=False)
+
+    def test_initialize_many_threads(self):
+        threads = []
+
+        class ThreadDriver(aDriver):
+
+            def initialize(self):
+                threads.append(threading.current_thread())
+
+        # Drivers sharing a name are all initialized.
+        objs = [ThreadDriver(name='same') for _ in range(3)]
+        initialize_many(objs, register_finalizer=False, concurrent=True, timeout=SLEEP)
+        self.assertEqual(len(threads), 3)
+        # Calls that do not finish do not prevent the interpreter from exiting.
+        self.assertTrue(all(thread.daemon for thread in threads))
+
+    def test_timing_window(self):
+        obj = aDriver()
+        for _ in range(40):
+            obj.run()
+        self.assertEqual(len(obj.timing['run'].values), aDriver.TIMING_WINDOW)
+        self.assertEqual(len(obj.timing.percentiles('run')), 3)
+
     def test_refresh(self):
         obj = aDriver()
         obj._eggs = 1
@@ -169,6 +377,30 @@ class DriverTest(unittest.TestCase):
         fut = obj.refresh_async({'eggs': None, 'ham': None})
         self.assertEqual(fut.result(), {'eggs': 3, 'ham': 23})
 
+    def test_refresh_many(self):
+
+        class BatchDriver(aDriver):
+
+            batched = 0
+
+            def _refresh_many(self, keys):
+                keys = [key for key in keys if key in ('eggs', 'ham')]
+                self.batched += 1
+                return {key: self._lantz_features[key].process_raw(self, getattr(self, '_' + key))
+                        for key in keys}
+
+        obj = BatchDriver()
+        changed = []
+        obj.eggs_changed.connect(lambda new, old: changed.append((new, old)))
+        obj._eggs = 2
+        obj._ham = 22
+        self.assertEqual(obj.refresh(('eggs', 'ham')), (2, 22))
+        self.assertEqual(obj.batched, 1)
+        self.assertEqual(obj.recall(('eggs', 'ham')), {'eggs': 2, 'ham': 22})
+        self.assertEqual(changed, [(2, MISSING)])
+        self.assertEqual(obj.refresh('eggs'), 2)
+        self.assertEqual(obj.batched, 1)
+
     def test_derived_class(self):
 
         class X(Driver):
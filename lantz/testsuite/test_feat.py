@@ -2,6 +2,7 @@
 
 import time
 import logging
+import threading
 import unittest
 
 from lantz import Driver, Feat, Q_
@@ -126,6 +127,121 @@ class FeatTest(unittest.TestCase):
         self.assertEqual(obj.serialno, 23199292)
         self.assertEqual(obj.serialno, 23199292)
 
+    def test_clear_cache(self):
+
+        class SpamClearCache(Driver):
+
+            reads = 0
+
+            @Feat(read_once=True)
+            def serialno(self):
+                self.reads += 1
+                return self.reads
+
+        obj = SpamClearCache()
+        self.assertEqual(obj.serialno, 1)
+        self.assertEqual(obj.serialno, 1)
+        SpamClearCache.serialno.clear_cache(obj)
+        self.assertEqual(obj.serialno, 2)
+
+    def test_cache_policy(self):
+
+        class Spam(Driver):
+
+            _reads = 0
+            _writes = 0
+
+            @Feat(max_age=.05)
+            def eggs(self_):
+                self_._reads += 1
+                return 9
+
+            @eggs.setter
+            def eggs(self_, value):
+                self_._writes += 1
+
+            @Feat(volatile=True)
+            def ham(self_):
+                self_._reads += 1
+                return 9
+
+            @ham.setter
+            def ham(self_, value):
+                self_._writes += 1
+
+        obj = Spam()
+        self.assertEqual(obj.eggs, 9)
+        self.assertEqual(obj.eggs, 9)
+        self.assertEqual(obj._reads, 1)
+        obj.eggs = 9
+        self.assertEqual(obj._writes, 0)
+        self.assertEqual(obj.recall('eggs'), 9)
+        stats = obj.timing.stats('cache_eggs')
+        self.assertEqual((stats.count, stats.mean), (2, .5))
+
+        time.sleep(.06)
+        self.assertEqual(obj.recall('eggs'), MISSING)
+        obj.eggs = 9
+        self.assertEqual(obj._writes, 1)
+        self.assertEqual(obj.eggs, 9)
+        self.assertEqual(obj._reads, 1)
+
+        obj.feats.eggs.cache = 'never'
+        self.assertEqual(obj.eggs, 9)
+        self.assertEqual(obj._reads, 2)
+        obj.feats.eggs.cache = 'always'
+        self.assertEqual(obj.eggs, 9)
+        self.assertEqual(obj._reads, 2)
+        self.assertRaises(ValueError, setattr, obj.feats.eggs, 'cache', 'sometimes')
+        self.assertEqual(obj.feats.eggs.cache, 'always')
+        # The feat can still be rebuilt.
+        obj.feats.eggs.units = 's'
+        obj.feats.eggs.cache = 'never'
+        self.assertEqual(obj.eggs, Q_(9, 's'))
+        self.assertEqual(obj._reads, 3)
+
+        obj._reads = 0
+        self.assertEqual(obj.ham, 9)
+        self.assertEqual(obj.ham, 9)
+        self.assertEqual(obj._reads, 2)
+        obj.ham = 9
+        self.assertEqual(obj._writes, 2)
+
+    def test_concurrent(self):
+
+        class Spam(Driver):
+
+            @Feat(read_once=True)
+            def serialno(self_):
+                return 42
+
+            @Feat(concurrent=True)
+            def eggs(self_):
+                return 9
+
+            @Feat()
+            def ham(self_):
+                return 8
+
+        obj = Spam()
+        self.assertEqual(obj.serialno, 42)
+
+        def _get(name, out):
+            out[name] = getattr(obj, name)
+
+        out = {}
+        with obj._lock:
+            threads = [threading.Thread(target=_get, args=(name, out))
+                       for name in ('serialno', 'eggs', 'ham')]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(.1)
+            self.assertEqual(out, {'serialno': 42, 'eggs': 9})
+
+        threads[-1].join()
+        self.assertEqual(out['ham'], 8)
+
     def test_limits(self):
 
         class Spam(Driver):
@@ -270,6 +386,70 @@ class FeatTest(unittest.TestCase):
                                        '(raw) Setting eggs = 10',
                                        'eggs was set to 10'])
 
+    def test_quiet(self):
+
+        hdl = MemHandler()
+
+        logger = get_logger('lantz.driver', False)
+        logger.addHandler(hdl)
+        level = logger.level
+        logger.setLevel(logging.DEBUG)
+
+        class QuietDriver(Driver):
+
+            @Feat
+            def eggs(self_):
+                return 9
+
+            @eggs.setter
+            def eggs(self_, value):
+                if value < 0:
+                    raise ValueError
+
+        try:
+            obj = QuietDriver(name='quiet')
+            obj.quiet = True
+            x = obj.eggs
+            obj.eggs = x + 1
+            self.assertRaises(ValueError, setattr, obj, 'eggs', -1)
+        finally:
+            logger.removeHandler(hdl)
+            logger.setLevel(level)
+
+        self.assertEqual(hdl.history, ['Created quiet',
+                                       'While setting eggs to -1. '])
+
+    def test_logging_overhead(self):
+
+        logger = get_logger('lantz.driver', False)
+        level = logger.level
+        logger.setLevel(logging.WARNING)
+
+        class OverheadDriver(Driver):
+
+            @Feat()
+            def eggs(self_):
+                return 9
+
+        obj = OverheadDriver()
+        fget = OverheadDriver.eggs.fget
+        N = 2000
+        try:
+            tic = time.perf_counter()
+            for _ in range(N):
+                fget(obj)
+            direct = time.perf_counter() - tic
+
+            tic = time.perf_counter()
+            for _ in range(N):
+                obj.eggs
+            through_feat = time.perf_counter() - tic
+        finally:
+            logger.setLevel(level)
+
+        # Generous bound (typically < 10 us) to avoid spurious failures in slow machines.
+        self.assertLess((through_feat - direct) / N, 100e-6)
+
     def test_units(self):
 
         hdl = MemHandler()
@@ -456,6 +636,35 @@ class FeatTest(unittest.TestCase):
         self.assertNotEqual(x.eggs, y.eggs)
         self.assertEqual(str(x.eggs.units), 'second')
 
+    def test_pipeline(self):
+
+        class Spam(Driver):
+
+            _eggs = 2
+
+            @Feat(values={'low': 1, 'high': 2}, procs=((int, str), ))
+            def eggs(self_):
+                return str(self_._eggs)
+
+            @eggs.setter
+            def eggs(self_, value):
+                self_._eggs = value
+
+        x = Spam()
+        y = Spam()
+        pipeline = Spam.eggs.get_pipeline[MISSING][MISSING]
+        self.assertEqual(pipeline('1'), 'low')
+        self.assertEqual(x.eggs, 'high')
+        x.eggs = 'low'
+        self.assertEqual(x._eggs, '1')
+
+        x.feats.eggs.values = {'LOW': 1, 'HIGH': 2}
+        self.assertIsNot(Spam.eggs.get_pipeline[x][MISSING], pipeline)
+        self.assertIs(Spam.eggs.get_pipeline[MISSING][MISSING], pipeline)
+        self.assertEqual(x.eggs, 'LOW')
+        y._eggs = 1
+        self.assertEqual(y.eggs, 'low')
+
 
 
 if __name__ == '__main__':
@@ -1,11 +1,20 @@
 # -*- coding: utf-8 -*-
 
+import asyncio
 import ctypes
+import os
+import tempfile
+import threading
 import unittest
 
 from array import array
+from concurrent import futures
 
-from lantz.foreign import LibraryDriver, RetStr, RetTuple, RetValue, TYPES
+from lantz import Action, Feat
+from lantz.errors import InstrumentError
+from lantz.foreign import (LibraryDriver, RetStr, RetTuple, RetValue, Signature,
+                           TYPES, compile_call)
+from lantz.trace import TraceRecorder, read_trace, CALL
 
 class Array(array):
 
@@ -20,6 +29,17 @@ class MyDriver(LibraryDriver):
 
     LIBRARY_NAME = 'simplelib.dylib'
 
+class MyCompiledDriver(LibraryDriver):
+
+    LIBRARY_NAME = 'simplelib.dylib'
+
+    SIGNATURES = {'sumi13': Signature([ctypes.c_int]),
+                  'double_param': Signature([RetValue('d')]),
+                  'double_array_length_param': Signature([RetTuple('d', 4), ctypes.c_int]),
+                  'write_in_charp': Signature([RetStr(13)]),
+                  'sum_double_array_length': Signature([ctypes.c_void_p, ctypes.c_int],
+                                                       ctypes.c_double)}
+
 class MyWrongDriver(LibraryDriver):
 
     LIBRARY_NAME = 'no_simplelib.dylib'
@@ -107,4 +127,159 @@ class ForeignTest(unittest.TestCase):
         ret, value = self.driver.lib.double_param(RetValue('d'))
         self.assertEqual((ret, value, type(value)), (1, 7., float))
 
+    def test_compiled(self):
+        lib = MyCompiledDriver().lib
+        self.assertEqual(lib.sumi13(5), 18)
+        self.assertEqual(lib.double_param(), (1, 7.))
+        self.assertEqual(lib.double_array_length_param(4), (1, (0., 1., 2., 3.)))
+        self.assertEqual(lib.write_in_charp(), (1, '28G11AC10T32'))
+
+        value = (ctypes.c_double * 3)(1, 2, 3)
+        self.assertEqual(lib.sum_double_array_length(ctypes.addressof(value), 3), 6.)
+        self.assertIsNone(lib.internal.sum_double_array_length.argtypes)
+
+
+class CompileCallTest(unittest.TestCase):
+
+    def test_python_function(self):
+        def func(handle, x, out, reserved):
+            out[0] = x * 2
+            return handle
+
+        call = compile_call('func', func, Signature([ctypes.c_int, ctypes.c_int, RetValue('i32'), None]),
+                            bound=(7, ), handler=lambda name, ret: -ret)
+        self.assertEqual(call(4), (-7, 8))
+        self.assertEqual(call.__name__, 'func')
+
+    def test_errcheck(self):
+        prototype = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_int, ctypes.POINTER(ctypes.c_double))
+
+        def func(x, out):
+            out[0] = x / 2
+            return x
+
+        def handler(name, ret):
+            if ret < 0:
+                raise ValueError(name)
+            return ret
+
+        call = compile_call('half', prototype(func), Signature([ctypes.c_int, RetValue('d')]),
+                            handler=handler)
+        self.assertEqual(call(3), (3, 1.5))
+        self.assertRaises(ValueError, call, -1)
+
+    def test_trace(self):
+        driver = LibraryDriver.__new__(LibraryDriver)
+        driver.name = 'traced'
+        driver.trace = None
+        call = compile_call('add', lambda x, y: x + y, Signature([ctypes.c_int, ctypes.c_int]),
+                            driver=driver)
+        self.assertEqual(call(1, 2), 3)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'foreign.trace')
+            driver.trace = TraceRecorder(path, 4096)
+            self.assertEqual(call(3, 4), 7)
+            driver.trace.close()
+            records = read_trace(path)
+        self.assertEqual([(r.kind, r.name, r.data) for r in records], [(CALL, 'traced', 'add\n7')])
+
+
 
+
+class FakeCamera(object):
+    """Library emulating a camera that waits for acquisitions in WaitForAcquisition.
+    """
+
+    def __init__(self):
+        self.waiting = threading.Event()
+        self.event = threading.Event()
+        self.cancelled = False
+
+    def WaitForAcquisition(self):
+        self.waiting.set()
+        self.event.wait(5)
+        self.event.clear()
+        return 1 if self.cancelled else 0
+
+    def CancelWait(self):
+        self.cancelled = True
+        self.event.set()
+        return 0
+
+    def GetTemperature(self):
+        return -70
+
+    def acquire(self):
+        self.event.set()
+
+
+class MyCamera(LibraryDriver):
+
+    BLOCKING = {'WaitForAcquisition': 'CancelWait'}
+
+    def _return_handler(self, func_name, ret_value):
+        if ret_value and func_name != 'GetTemperature':
+            raise InstrumentError(func_name)
+        return ret_value
+
+    @Action(concurrent=True)
+    def wait_for_acquisition(self):
+        return self.lib.WaitForAcquisition().result(5)
+
+    @Feat()
+    def temperature(self):
+        return self.lib.GetTemperature()
+
+
+class BlockingCallTest(unittest.TestCase):
+
+    def setUp(self):
+        self.fake = FakeCamera()
+        self.camera = MyCamera(library=self.fake)
+
+    def test_result(self):
+        fut = self.camera.lib.WaitForAcquisition()
+        self.assertTrue(self.fake.waiting.wait(5))
+        self.assertFalse(fut.done())
+        self.fake.acquire()
+        self.assertEqual(fut.result(5), 0)
+        self.assertFalse(fut.cancelled())
+
+    def test_cancel(self):
+        fut = self.camera.lib.WaitForAcquisition()
+        self.assertTrue(self.fake.waiting.wait(5))
+        self.assertTrue(fut.cancel())
+        self.assertRaises(futures.CancelledError, fut.result, 5)
+        self.assertTrue(fut.cancelled())
+        self.assertTrue(self.fake.cancelled)
+        self.assertIsInstance(fut.exception().__cause__, InstrumentError)
+
+    def test_cancel_pending(self):
+        first = self.camera.lib.WaitForAcquisition()
+        second = self.camera.lib.WaitForAcquisition()
+        self.assertTrue(self.fake.waiting.wait(5))
+        self.assertTrue(second.cancel())
+        self.assertFalse(self.fake.cancelled)
+        self.fake.acquire()
+        self.assertEqual(first.result(5), 0)
+        self.assertTrue(second.cancelled())
+
+    def test_responsive(self):
+        waiter = threading.Thread(target=self.camera.wait_for_acquisition)
+        waiter.start()
+        self.assertTrue(self.fake.waiting.wait(5))
+        self.assertTrue(self.camera._lock.acquire(timeout=1))
+        self.camera._lock.release()
+        self.assertEqual(self.camera.temperature, -70)
+        self.fake.acquire()
+        waiter.join(5)
+        self.assertFalse(waiter.is_alive())
+
+    def test_await(self):
+        async def wait():
+            fut = self.camera.lib.WaitForAcquisition()
+            self.fake.acquire()
+            return await fut
+
+        self.assertEqual(asyncio.run(wait()), 0)
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+
+import os
+import threading
+import unittest
+from concurrent import futures
+from time import sleep
+
+import numpy as np
+import pyvisa
+
+from lantz import Feat, Q_
+from lantz import messagebased
+from lantz.errors import LantzTimeoutError, NotSupportedError
+from lantz.feat import MISSING
+from lantz.messagebased import MessageBasedDriver
+
+try:
+    import pyvisa_sim
+except ImportError:
+    pyvisa_sim = None
+
+#: Devices simulated by pyvisa-sim.
+SIM_DEVICES = os.path.join(os.path.dirname(__file__), 'sim_devices.yaml')
+
+
+class SimDriver(MessageBasedDriver):
+
+    DEFAULTS = {'COMMON': {'write_termination': '\n',
+                           'read_termination': '\n',
+                           'timeout': 200}}
+
+    BATCH_QUERIES = {'frequency': 'FREQ?', 'amplitude': 'AMP?'}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        #: Messages written to the resource.
+        self.sent = []
+
+    def _write_bytes(self, message):
+        self.sent.append(message)
+        return super()._write_bytes(message)
+
+    def _write(self, command, termination=None, encoding=None):
+        self.sent.append(command)
+        return super()._write(command, termination, encoding)
+
+    @Feat(units='Hz')
+    def frequency(self):
+        return self.query('FREQ?')
+
+    @frequency.setter
+    def frequency(self, value):
+        self.write('FREQ {:.1f}'.format(value))
+
+    @Feat(units='V')
+    def amplitude(self):
+        return self.query('AMP?')
+
+    @amplitude.setter
+    def amplitude(self, value):
+        self.write('AMP {:.2f}'.format(value))
+
+    @Feat()
+    def idn(self):
+        return self.query('*IDN?')
+
+
+@unittest.skipIf(pyvisa_sim is None, 'pyvisa-sim is not installed')
+class SimTestCase(unittest.TestCase):
+    """Runs drivers against the devices simulated by pyvisa-sim.
+    """
+
+    def setUp(self):
+        # Restored after the drivers are finalized by the cleanups.
+        self.addCleanup(self._restore, messagebased._resource_manager)
+        messagebased._resource_manager = pyvisa.ResourceManager(SIM_DEVICES + '@sim')
+        messagebased._RESOURCE_INFO.clear()
+
+    def _restore(self, resource_manager):
+        messagebased._resource_manager = resource_manager
+        messagebased._RESOURCE_INFO.clear()
+
+    def open(self, cls=SimDriver, resource_name='GPIB0::8::INSTR', **kwargs):
+        driver = cls(resource_name, **kwargs)
+        driver.initialize()
+        self.addCleanup(driver.finalize)
+        return driver
+
+
+class PipelineTest(SimTestCase):
+
+    def test_order(self):
+        inst = self.open()
+        with inst.pipeline():
+            inst.frequency = Q_(20, 'Hz')
+            first = inst.query_pipelined('FREQ?')
+            inst.amplitude = Q_(2, 'V')
+            amplitude = inst.amplitude
+            idn = inst.query_pipelined('*IDN?')
+            self.assertEqual(inst.sent, [])
+            self.assertFalse(first.done())
+            # Cached once sent.
+            self.assertIs(inst.recall('frequency'), MISSING)
+            # Feats without a query in BATCH_QUERIES are read by their getters.
+            self.assertEqual(inst.idn, 'Lantz,Sim,0,1.0')
+            self.assertEqual(len(inst.sent), 1)
+        self.assertEqual(inst.sent, [b'FREQ 20.0\nFREQ?\nAMP 2.00\nAMP?\n*IDN?\n*IDN?\n'])
+        self.assertEqual(first.result(), '20.0')
+        self.assertEqual(amplitude.result(), Q_(2, 'V'))
+        self.assertEqual(inst.recall('amplitude'), Q_(2, 'V'))
+        self.assertEqual(idn.result(), 'Lantz,Sim,0,1.0')
+        self.assertEqual(inst.recall('frequency'), Q_(20, 'Hz'))
+        self.assertEqual(inst.frequency, Q_(20, 'Hz'))
+
+    def test_depth(self):
+        inst = self.open()
+        with inst.pipeline(depth=2):
+            futs = [inst.query_pipelined('*IDN?') for _ in range(5)]
+            # At most two queries waiting for an answer.
+            self.assertEqual(inst.sent, [b'*IDN?\n*IDN?\n', b'*IDN?\n', b'*IDN?\n', b'*IDN?\n'])
+            self.assertEqual([fut.done() for fut in futs], [True, True, True, True, False])
+        self.assertEqual({fut.result() for fut in futs}, {'Lantz,Sim,0,1.0'})
+
+    def test_read_error(self):
+        inst = self.open()
+        with inst.pipeline():
+            bad = inst.query_pipelined('BAD?')
+            lost = inst.query_pipelined('FREQ?')
+        self.assertRaises(UnicodeDecodeError, bad.result)
+        self.assertRaises(UnicodeDecodeError, lost.result)
+        # The answers to the failed queries have been discarded.
+        self.assertEqual(inst.idn, 'Lantz,Sim,0,1.0')
+
+    def test_exception_in_block(self):
+        inst = self.open()
+        inst.frequency = Q_(30, 'Hz')
+        with self.assertRaises(ZeroDivisionError):
+            with inst.pipeline():
+                sent = inst.query_pipelined('*IDN?')
+                inst.flush()
+                inst.frequency = Q_(40, 'Hz')
+                queued = inst.query_pipelined('FREQ?')
+                1 / 0
+        self.assertEqual(sent.result(), 'Lantz,Sim,0,1.0')
+        self.assertTrue(queued.cancelled())
+        self.assertEqual(inst.sent[-1], b'*IDN?\n')
+        # The value of the discarded command is not cached.
+        self.assertIs(inst.recall('frequency'), MISSING)
+        self.assertEqual(inst.refresh('frequency'), Q_(30, 'Hz'))
+
+    def test_other_thread(self):
+        inst = self.open()
+        with futures.ThreadPoolExecutor(1) as executor:
+            with inst.pipeline():
+                inst.query_pipelined('*IDN?')
+                other = executor.submit(inst.write, 'AMP 3.00')
+                self.assertRaises(futures.TimeoutError, other.result, .1)
+                self.assertEqual(inst.sent, [])
+            other.result()
+        self.assertEqual(inst.sent, [b'*IDN?\n', 'AMP 3.00'])
+
+
+class BlockTest(SimTestCase):
+
+    def test_terminated(self):
+        inst = self.open()
+        np.testing.assert_array_equal(inst.query_block('CURV?'), list(b'ABCD'))
+        # The termination was read with the block.
+        self.assertEqual(inst.query('*IDN?'), 'Lantz,Sim,0,1.0')
+
+    def test_end_with_data(self):
+        inst = self.open(resource_name='GPIB0::9::INSTR', read_termination=None)
+        # The END indicator is received with the last byte of the block,
+        # so nothing else is read (which would time out).
+        np.testing.assert_array_equal(inst.query_block('CURV?'), list(b'ABCD'))
+        # Without read termination, the whole message is data.
+        np.testing.assert_array_equal(inst.query_block('WAV?'), list(b'AB\n'))
+
+
+class BatchQueryTest(SimTestCase):
+
+    def test_refresh(self):
+        inst = self.open()
+        values = inst.refresh(('frequency', 'amplitude'))
+        self.assertEqual(values, (Q_(1500, 'Hz'), Q_(0.25, 'V')))
+        # A single message and the answer split for each feat.
+        self.assertEqual(inst.sent, ['FREQ?;AMP?'])
+        self.assertEqual(inst.recall('amplitude'), Q_(0.25, 'V'))
+
+    def test_wrong_answer(self):
+        inst = self.open()
+        self.assertEqual(inst.batch_query(['FREQ?', 'AMP?']), ['1500.0', '0.25'])
+        self.assertRaises(ValueError, inst.batch_query, ['FREQ?', 'AMP?', '*IDN?'])
+
+
+class CompletionTest(SimTestCase):
+
+    def open(self, *args, **kwargs):
+        inst = super().open(*args, **kwargs)
+        inst.write('ESR 0')
+        return inst
+
+    def wait_poller(self, inst):
+        poller = inst._completion_poller
+        if poller is not None:
+            poller.result(5)
+
+    def test_poll(self):
+        inst = self.open()
+        fut = inst.operation_complete('INIT', timeout=5)
+        sleep(.1)
+        self.assertFalse(fut.done())
+        inst.write('ESR 1')
+        self.assertIsNone(fut.result(5))
+        self.assertEqual(inst.sent[1:5], ['*CLS', '*ESE 1', 'INIT', '*OPC'])
+        self.assertNotIn('*SRE 32', inst.sent)
+        self.assertEqual(inst.timing.stats('operation_complete').count, 1)
+        self.wait_poller(inst)
+
+    def test_timeout(self):
+        inst = self.open()
+        fut = inst.operation_complete(timeout=.2)
+        self.assertRaises(LantzTimeoutError, fut.result, 5)
+        self.assertGreaterEqual(inst.timing.stats('operation_complete').last, .2)
+        # The poll stops once no future is waiting.
+        self.wait_poller(inst)
+        self.assertEqual(inst._completion_waiters, ())
+
+    def test_mechanism(self):
+        inst = self.open()
+        # pyvisa-sim does not support service requests.
+        self.assertEqual(inst._completion_mechanism(), 'poll')
+        self.assertIs(inst._srq_enabled, False)
+
+        class SRQDriver(SimDriver):
+            COMPLETION = 'srq'
+
+        inst = self.open(SRQDriver)
+        self.assertRaises(NotSupportedError, inst.operation_complete)
+
+
+class SharedDriver(SimDriver):
+
+    SHARED_SESSION = True
+
+
+class SharedSessionTest(SimTestCase):
+
+    def test_shared(self):
+        first = SharedDriver('GPIB0::8::INSTR')
+        # Another name of the same resource.
+        second = SharedDriver('GPIB::8')
+        self.assertIs(first._lock, second._lock)
+
+        first.initialize()
+        second.initialize()
+        session = messagebased._SESSIONS['GPIB0::8::INSTR']
+        self.assertEqual(session.count, 2)
+        self.assertIs(first.resource, second.resource)
+
+        # The resource is closed when the last driver is finalized.
+        second.finalize()
+        self.assertEqual(session.count, 1)
+        self.assertEqual(first.query('*IDN?'), 'Lantz,Sim,0,1.0')
+        first.finalize()
+        self.assertEqual(session.count, 0)
+        self.assertIsNone(session.resource)
+        self.assertRaises(ValueError, first.finalize)
+
+        # And opened again by the next one.
+        second.initialize()
+        self.addCleanup(second.finalize)
+        self.assertEqual(session.count, 1)
+        self.assertEqual(second.query('*IDN?'), 'Lantz,Sim,0,1.0')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import unittest
+
+from lantz.drivers.legacy.network import TCPDriver
+from lantz.errors import LantzTimeoutError
+
+
+class EchoInstrument(object):
+    """Answers each line received with 'echo <line>', sent in two chunks
+    split within the termination. Lines starting with 'QUIET' are not answered.
+    """
+
+    def __init__(self, termination=b'\r\n'):
+        self.termination = termination
+        self.server = None
+        self.received = []
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, '127.0.0.1', 0)
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readuntil(b'\n')
+                self.received.append(line)
+                if line.startswith(b'QUIET'):
+                    continue
+                answer = b'echo ' + line[:-1] + self.termination
+                writer.write(answer[:-1])
+                await writer.drain()
+                await asyncio.sleep(0.01)
+                writer.write(answer[-1:])
+                await writer.drain()
+        except asyncio.IncompleteReadError:
+            pass
+        finally:
+            writer.close()
+
+
+class EchoDriver(TCPDriver):
+
+    RECV_TERMINATION = '\r\n'
+    TIMEOUT = 0.2
+
+
+class TCPDriverTest(unittest.TestCase):
+
+    def run_with_driver(self, coroutine):
+        """Run coroutine(driver) with a driver connected to an EchoInstrument.
+        """
+        instrument = EchoInstrument()
+
+        async def _run():
+            host, port = await instrument.start()
+            driver = EchoDriver(host, port)
+            self.addCleanup(driver.socket.close)
+            await driver.ainitialize()
+            try:
+                return await coroutine(driver)
+            finally:
+                await driver.afinalize()
+                await instrument.stop()
+
+        return asyncio.run(_run()), instrument
+
+    def test_lock(self):
+        # Available before ainitialize.
+        driver = EchoDriver()
+        self.addCleanup(driver.socket.close)
+        self.assertIsInstance(driver._alock, asyncio.Lock)
+
+    def test_aquery(self):
+
+        async def _query(driver):
+            return await driver.aquery('A')
+
+        answer, instrument = self.run_with_driver(_query)
+        self.assertEqual(answer, 'echo A')
+        self.assertEqual(instrument.received, [b'A\n'])
+
+    def test_concurrent_aquery(self):
+
+        async def _query(driver):
+            return await asyncio.gather(*(driver.aquery(command) for command in 'ABC'))
+
+        answers, instrument = self.run_with_driver(_query)
+        # Each answer matches its query.
+        self.assertEqual(answers, ['echo A', 'echo B', 'echo C'])
+
+    def test_arecv(self):
+
+        async def _recv(driver):
+            await driver.asend('A')
+            await driver.asend('B')
+            # The termination is received in two chunks.
+            return [await driver.arecv(), await driver.arecv()]
+
+        answers, _ = self.run_with_driver(_recv)
+        self.assertEqual(answers, ['echo A', 'echo B'])
+
+    def test_arecv_timeout(self):
+
+        async def _recv(driver):
+            await driver.asend('QUIET')
+            with self.assertRaises(LantzTimeoutError):
+                await driver.arecv()
+            return await driver.aquery('A')
+
+        answer, _ = self.run_with_driver(_recv)
+        self.assertEqual(answer, 'echo A')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+import time
+import unittest
+from concurrent import futures
+
+from lantz import Driver, Feat
+from lantz.errors import LantzTimeoutError
+from lantz.poller import Backoff, get_poller
+
+
+class PolledDriver(Driver):
+
+    POLL_BACKOFF = (0.001, 0.02, 2.)
+
+    def __init__(self, duration=0.05, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.duration = duration
+        self.started = time.monotonic()
+        self.checks = 0
+
+    @Feat()
+    def done(self):
+        self.checks += 1
+        return time.monotonic() - self.started >= self.duration
+
+    @Feat()
+    def state(self):
+        return 'idle' if self.done else 'moving'
+
+
+class PollerTest(unittest.TestCase):
+
+    def test_backoff(self):
+        delays = iter(Backoff(0.001, 0.01, 2.))
+        self.assertEqual([next(delays) for _ in range(6)], [0., 0.001, 0.002, 0.004, 0.008, 0.01])
+
+        delays = iter(Backoff(0.001, 0.5, 2., expected=1.))
+        self.assertEqual([next(delays) for _ in range(3)], [1., 0.05, 0.1])
+
+    def test_wait_feat(self):
+        obj = PolledDriver(0.05)
+        fut = obj.wait_until('done')
+        polls = fut.result(1)
+        self.assertEqual(polls, obj.checks)
+        self.assertLess(polls, 15)
+        self.assertGreaterEqual(obj.timing.stats('wait_done').last, 0.05)
+        self.assertEqual(obj.timing.stats('wait_done_polls').last, polls)
+        self.assertLessEqual(obj.timing.stats('wait_done_overshoot').last, 0.05)
+
+        # The expected duration is learned from previous waits.
+        obj.started = time.monotonic()
+        obj.checks = 0
+        self.assertLessEqual(obj.wait_until('done').result(1), 5)
+
+    def test_value_and_callable(self):
+        obj = PolledDriver(0.02)
+        self.assertGreater(obj.wait_until('state', value='idle').result(1), 0)
+        self.assertIn('wait_state', obj.timing)
+
+        obj.started = time.monotonic()
+        obj.wait_until(lambda: obj.done, name='custom').result(1)
+        self.assertIn('wait_custom', obj.timing)
+
+    def test_many(self):
+        drivers = [PolledDriver(0.01 * n, name='polled{}'.format(n)) for n in range(20)]
+        tic = time.monotonic()
+        futs = [driver.wait_until('done') for driver in drivers]
+        done, not_done = futures.wait(futs, 2)
+        self.assertFalse(not_done)
+        self.assertLess(time.monotonic() - tic, 1)
+        self.assertEqual(len(get_poller()), 0)
+
+    def test_timeout(self):
+        obj = PolledDriver(10)
+        fut = obj.wait_until('done', 0.05)
+        self.assertRaises(LantzTimeoutError, fut.result, 1)
+
+        self.assertRaises(LantzTimeoutError, obj.poll_until, 'done', 0.05)
+
+    def test_cancel(self):
+        obj = PolledDriver(10)
+        fut = obj.wait_until('done')
+        self.assertTrue(fut.cancel())
+        time.sleep(0.05)
+        checks = obj.checks
+        time.sleep(0.05)
+        self.assertEqual(obj.checks, checks)
+        # Not kept scheduled.
+        self.assertEqual(len(get_poller()), 0)
+
+    def test_poll_until(self):
+        obj = PolledDriver(0.02)
+        self.assertEqual(obj.poll_until('done'), obj.checks)
+        self.assertRaises(ZeroDivisionError, obj.poll_until, lambda: 1 / 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
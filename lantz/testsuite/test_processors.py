@@ -3,6 +3,8 @@
 import unittest
 import doctest
 
+import numpy as np
+
 from lantz import Q_
 
 import lantz.processors as processors
@@ -45,5 +47,31 @@ class TestProcessors(unittest.TestCase):
 
         self.assertRaises(ValueError, processors.convert_to(V, on_dimensionless='raise'), 1000)
 
+    def test_arrays(self):
+        values = np.linspace(0, 1, 1000)
+
+        out = processors.convert_to(mv, on_dimensionless='ignore')(values)
+        self.assertIs(out.magnitude, values)
+        self.assertEqual(out.units, mv.units)
+
+        out = processors.convert_to(mv)(Q_(values, 'V'))
+        np.testing.assert_allclose(out.magnitude, values * 1000)
+        self.assertEqual(out.units, mv.units)
+
+        out = processors.convert_to(mv, return_float=True)(Q_(values, 'V'))
+        np.testing.assert_allclose(out, values * 1000)
+
+        out = processors.convert_to('degC', return_float=True)(Q_(values, 'kelvin'))
+        np.testing.assert_allclose(out, values - 273.15)
+
+        self.assertIs(processors.convert_to(V, return_float=True, on_dimensionless='ignore')(values), values)
+        ints = np.arange(10)
+        np.testing.assert_equal(processors.convert_to(V, return_float=True, on_dimensionless='ignore')(ints), ints)
+
+    def test_conversion_factor(self):
+        self.assertEqual(processors.conversion_factor(V.units, mv.units), 1000)
+        self.assertIn((V.units, mv.units), processors._FACTORS)
+        self.assertIsNone(processors.conversion_factor(Q_(1, 'degC').units, Q_(1, 'kelvin').units))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+import socket
+import struct
+import unittest
+
+from lantz.drivers.legacy import rpc
+
+
+class ShortSocket(object):
+    """Wraps a socket, sending and receiving at most `size` bytes per call.
+    """
+
+    def __init__(self, sock, size):
+        self.sock = sock
+        self.size = size
+        self.calls = 0
+
+    def sendmsg(self, buffers):
+        self.calls += 1
+        data = b''.join(bytes(buf) for buf in buffers)[:self.size]
+        return self.sock.send(data)
+
+    def recv_into(self, view):
+        self.calls += 1
+        return self.sock.recv_into(view, min(len(view), self.size))
+
+
+class RecordTest(unittest.TestCase):
+
+    def setUp(self):
+        self.a, self.b = socket.socketpair()
+        self.addCleanup(self.a.close)
+        self.addCleanup(self.b.close)
+
+    def test_single_fragment(self):
+        rpc.sendrecord(self.a, b'spam')
+        self.assertEqual(self.b.recv(100), struct.pack('>I', rpc.LAST_FRAGMENT | 4) + b'spam')
+
+        rpc.sendrecord(self.a, b'eggs')
+        self.assertEqual(rpc.recvrecord(self.b), b'eggs')
+
+    def test_multiple_fragments(self):
+        record = bytes(range(256)) * 4 + b'tail'
+        rpc.sendrecord(self.a, record, fragment_size=100)
+        rpc.sendrecord(self.a, b'next', fragment_size=100)
+
+        self.assertEqual(rpc.recvrecord(self.b), record)
+        self.assertEqual(rpc.recvrecord(self.b), b'next')
+
+    def test_fragment_headers(self):
+        rpc.sendrecord(self.a, b'0123456789', fragment_size=4)
+        expected = b''.join(struct.pack('>I', last | len(frag)) + frag
+                            for last, frag in ((0, b'0123'), (0, b'4567'),
+                                               (rpc.LAST_FRAGMENT, b'89')))
+        self.assertEqual(self.b.recv(100), expected)
+
+    def test_partial_send(self):
+        sock = ShortSocket(self.a, 3)
+        record = b'partial sendmsg'
+        rpc.sendrecord(sock, record, fragment_size=6)
+        # Fragments of 6, 6 and 3 bytes with their 4 byte headers,
+        # sent 3 bytes at a time.
+        self.assertEqual(sock.calls, 4 + 4 + 3)
+        self.assertEqual(rpc.recvrecord(self.b), record)
+
+    def test_short_recv(self):
+        record = b'short recv_into' * 10
+        rpc.sendrecord(self.a, record, fragment_size=7)
+        sock = ShortSocket(self.b, 2)
+        self.assertEqual(rpc.recvrecord(sock), record)
+        self.assertGreater(sock.calls, len(record) // 2)
+
+    def test_closed(self):
+        self.a.sendall(struct.pack('>I', rpc.LAST_FRAGMENT | 10) + b'short')
+        self.a.close()
+        self.assertRaises(EOFError, rpc.recvrecord, self.b)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+import doctest
+import unittest
+
+import numpy as np
+
+from lantz import Driver, Q_
+from lantz.drivers import scpi
+from lantz.drivers.scpi import build_feat, short_form
+
+
+class FakeResource(object):
+
+    write_termination = '\n'
+    encoding = 'ascii'
+
+
+class SCPIFakeDriver(Driver):
+
+    SHORT_FORM = False
+
+    def __init__(self, answers=(), *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.resource = FakeResource()
+        self.answers = list(answers)
+        self.sent = []
+
+    def write_raw(self, message):
+        self.sent.append(message)
+        return len(message)
+
+    def read(self):
+        return self.answers.pop(0)
+
+    def read_block(self, dtype):
+        return np.frombuffer(self.answers.pop(0), dtype)
+
+    @build_feat('SOURce:FREQuency', response='float', units='Hz')
+    def frequency(self):
+        "Frequency"
+
+    @build_feat('OUTPut', response='bool')
+    def output(self):
+        "Output"
+
+    @build_feat('FUNCtion', response='enum', values={'sine': 'SIN', 'square': 'SQU'})
+    def function(self):
+        "Function"
+
+    @build_feat('FETCh?', response='vector')
+    def fetch(self):
+        "Fetch"
+
+    @build_feat('CURVe', response='block', dtype='>i2')
+    def curve(self):
+        "Curve"
+
+    @build_feat('STATus?', response='{:d},{:d}')
+    def status(self):
+        "Status"
+
+    @build_feat('COUNt', response='int')
+    def count(self):
+        "Count"
+
+
+class SCPITest(unittest.TestCase):
+
+    def test_docs(self):
+        doctest.testmod(scpi)
+
+    def test_short_form(self):
+        self.assertEqual(short_form('SOURce1:FREQuency:CW 10'), 'SOUR1:FREQ:CW 10')
+        self.assertEqual(short_form('*IDN?'), '*IDN?')
+
+    def test_get(self):
+        obj = SCPIFakeDriver(['+1.000000E+03\n', 'ON', '"SQU"', '1.5,2,-3e-1',
+                              np.arange(3, dtype='>i2').tobytes(), '3,4', '+2.0E+00'])
+        self.assertEqual(obj.frequency.magnitude, 1000.)
+        self.assertIs(obj.output, True)
+        self.assertEqual(obj.function, 'square')
+        np.testing.assert_equal(obj.fetch, [1.5, 2, -0.3])
+        np.testing.assert_equal(obj.curve, [0, 1, 2])
+        self.assertEqual(obj.status, [3, 4])
+        self.assertEqual(obj.count, 2)
+        self.assertEqual(obj.sent, [b'SOURce:FREQuency?\n', b'OUTPut?\n', b'FUNCtion?\n',
+                                    b'FETCh?\n', b'CURVe?\n', b'STATus?\n', b'COUNt?\n'])
+
+    def test_set(self):
+        obj = SCPIFakeDriver()
+        obj.frequency = Q_(20, 'Hz')
+        obj.output = False
+        obj.function = 'sine'
+        obj.count = 3
+        self.assertEqual(obj.sent, [b'SOURce:FREQuency 20.0\n', b'OUTPut 0\n',
+                                    b'FUNCtion SIN\n', b'COUNt 3\n'])
+
+        with self.assertRaises(AttributeError):
+            obj.fetch = [1, 2]
+
+    def test_short_commands(self):
+        obj = SCPIFakeDriver(['1'] * 2)
+        obj.SHORT_FORM = True
+        obj.resource.write_termination = '\r\n'
+        obj.output
+        obj.frequency = Q_(1, 'Hz')
+        self.assertEqual(obj.sent, [b'OUTP?\r\n', b'SOUR:FREQ 1.0\r\n'])
+
+    def test_unknown_response(self):
+        self.assertRaises(ValueError, build_feat, 'FREQ', response='complex')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from lantz import Q_
+from lantz.drivers.stanford.sr830 import SR830
+from lantz.testsuite.test_messagebased import SimTestCase
+
+
+class SR830Test(SimTestCase):
+
+    def open(self):
+        return super().open(SR830, 'GPIB0::10::INSTR')
+
+    def test_refresh(self):
+        inst = self.open()
+        with mock.patch.object(inst, 'query', wraps=inst.query) as query:
+            frequency, x, r = inst.refresh(['frequency', 'x', 'r'])
+        query.assert_called_once_with('SNAP? 9,1,3')
+        self.assertEqual(frequency, Q_(1000., 'Hz'))
+        self.assertEqual(x, Q_(0.001, 'volt'))
+        self.assertEqual(r, Q_(0.0022, 'volt'))
+        # The values are cached.
+        self.assertEqual(inst.recall('x'), Q_(0.001, 'volt'))
+
+    def test_single(self):
+        inst = self.open()
+        self.assertEqual(inst.batch_query(['OUTP? 1']), ['0.001'])
+
+    def test_read_buffer(self):
+        inst = self.open()
+        np.testing.assert_allclose(inst.read_buffer(1, 0, 3).to('volt').magnitude, [0.1, 0.2, 0.3])
+        np.testing.assert_equal(inst.read_buffer(2, 4, 1, format='b').to('volt').magnitude,
+                                np.frombuffer(b'AAAA', '<f4'))
+        # Unlike the instrument, the simulated device terminates binary answers.
+        self.assertEqual(inst.read(), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+import threading
 import unittest
 
 import numpy as np
@@ -30,3 +31,64 @@ class StatsTest(unittest.TestCase):
                 self.assertAlmostEqual(s.std, np.std(values[:ndx]))
                 self.assertAlmostEqual(s.min, np.min(values[:ndx]))
                 self.assertAlmostEqual(s.max, np.max(values[:ndx]))
+
+    def test_precision(self):
+        x = RunningStats()
+        values = 1e9 + np.random.random(10000)
+        for value in values:
+            x.add('key', value)
+        s = x.stats('key')
+        self.assertAlmostEqual(s.mean, np.mean(values), places=5)
+        self.assertAlmostEqual(s.std, np.std(values), places=5)
+
+    def test_window(self):
+        x = RunningStats(window=10)
+        values = np.random.random(35)
+        for ndx, value in enumerate(values, 1):
+            x.add('key', value)
+            last = values[max(0, ndx - 10):ndx]
+            self.assertEqual(sorted(x['key'].values), sorted(last))
+
+            s = x.window_stats('key')
+            self.assertEqual(s.count, len(last))
+            self.assertAlmostEqual(s.mean, np.mean(last))
+            self.assertAlmostEqual(s.std, np.std(last))
+            self.assertAlmostEqual(s.min, np.min(last))
+            self.assertAlmostEqual(s.max, np.max(last))
+
+            for value, expected in zip(x.percentiles('key'), np.percentile(last, (50, 95, 99))):
+                self.assertAlmostEqual(value, expected)
+
+        self.assertEqual(x.stats('key').count, 35)
+
+        x = RunningStats()
+        x.add('key', 1)
+        self.assertRaises(ValueError, x.percentiles, 'key')
+
+    def test_exponential(self):
+        x = RunningStats(alpha=0.5)
+        for value in (1., 2., 4.):
+            x.add('key', value)
+        self.assertAlmostEqual(x['key'].ewm, 2.75)
+        self.assertGreater(x['key'].ewv, 0)
+
+    def test_slots(self):
+        x = RunningStats()
+        x.add('key', 1)
+        self.assertFalse(hasattr(x['key'], '__dict__'))
+
+    def test_threads(self):
+        x = RunningStats(window=10)
+
+        def _add():
+            for value in range(1000):
+                x.add(value % 3, value)
+
+        threads = [threading.Thread(target=_add) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sum(x.stats(key).count for key in range(3)), 8000)
+        self.assertEqual(sum(x[key].sum for key in range(3)), 8 * sum(range(1000)))
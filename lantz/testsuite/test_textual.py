@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from lantz import Driver
+from lantz.drivers.legacy.textual import TextualMixin
+from lantz.errors import LantzTimeoutError
+
+
+class ChunkedDriver(Driver, TextualMixin):
+    """Receives the given chunks, one per raw_recv call.
+    """
+
+    RECV_TERMINATION = '\r\n'
+    RECV_CHUNK = 4
+    TIMEOUT = 0.05
+
+    def __init__(self, *chunks, **kwargs):
+        super().__init__(**kwargs)
+        self.chunks = list(chunks)
+        self.calls = 0
+
+    def raw_recv(self, size):
+        self.calls += 1
+        if not self.chunks:
+            return b''
+        return self.chunks.pop(0)
+
+
+class RecvUntilTest(unittest.TestCase):
+
+    def test_split_termination(self):
+        inst = ChunkedDriver(b'abc\r', b'\ndef\r', b'\n')
+        self.assertEqual(inst.recv(), 'abc')
+        self.assertEqual(inst.recv(), 'def')
+        self.assertEqual(inst.calls, 3)
+
+    def test_termination_after_partial_match(self):
+        # The first carriage return is data, the second starts the termination.
+        inst = ChunkedDriver(b'a\r\r', b'\n')
+        self.assertEqual(inst.recv(), 'a\r')
+
+    def test_leftover(self):
+        inst = ChunkedDriver(b'one\r\ntwo\r\nthr', b'ee\r\n')
+        self.assertEqual(inst.recv(), 'one')
+        # The rest of the chunk is kept for the next calls.
+        self.assertEqual(inst.recv(), 'two')
+        self.assertEqual(inst.calls, 1)
+        self.assertEqual(inst.recv(), 'three')
+        self.assertEqual(inst.calls, 2)
+        self.assertEqual(inst._received, b'')
+
+    def test_leftover_with_partial_termination(self):
+        inst = ChunkedDriver(b'one\r\ntwo\r', b'\n')
+        self.assertEqual(inst.recv(), 'one')
+        self.assertEqual(inst.recv(), 'two')
+
+    def test_timeout(self):
+        inst = ChunkedDriver(b'no termination')
+        self.assertRaises(LantzTimeoutError, inst.recv)
+
+
+if __name__ == '__main__':
+    unittest.main()
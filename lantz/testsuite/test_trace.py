@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+import ctypes
+import os
+import tempfile
+import unittest
+from array import array
+
+from lantz import Driver
+from lantz.errors import InstrumentError
+from lantz.foreign import LibraryDriver, RetStr, RetValue, Signature
+from lantz.trace import (traced, TraceRecorder, TraceReplayer, ReplayError, read_trace,
+                         CALL, READ, READ_INTO, WRITE)
+
+
+class TracedDriver(Driver):
+
+    def __init__(self, answers=(), *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.answers = list(answers)
+        self.sent = []
+
+    @traced(WRITE)
+    def raw_send(self, data):
+        self.sent.append(data)
+        return len(data)
+
+    @traced(READ)
+    def raw_recv(self, size):
+        if not self.answers:
+            raise InstrumentError('timeout')
+        return self.answers.pop(0)[:size]
+
+    @traced(READ_INTO)
+    def raw_recv_into(self, buffer):
+        data = self.answers.pop(0)
+        buffer[:len(data)] = array('B', data)
+        return len(data)
+
+    @traced(WRITE)
+    def write(self, command):
+        self.sent.append(command)
+
+    @traced(READ)
+    def read(self):
+        return self.answers.pop(0).decode('ascii')
+
+
+class FakeLibrary(object):
+
+    def add(self, x, y):
+        return x + y
+
+    def half(self, x, out):
+        out[0] = x / 2
+        return 0
+
+    def name(self, buffer, size):
+        buffer.value = b'fake'
+        return 0
+
+
+class UnpluggedLibrary(object):
+
+    def __getattr__(self, name):
+        def _fail(*args):
+            raise AssertionError('{} called while replaying'.format(name))
+        return _fail
+
+
+class TracedLibraryDriver(LibraryDriver):
+
+    SIGNATURES = {'add': Signature([ctypes.c_int, ctypes.c_int])}
+
+
+class TraceTest(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp('.trace')
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_disabled(self):
+        obj = TracedDriver([b'1.0'])
+        self.assertIsNone(obj.trace)
+        self.assertEqual(obj.raw_send(b'?FREQ\n'), 6)
+        self.assertEqual(obj.raw_recv(10), b'1.0')
+
+    def test_record(self):
+        obj = TracedDriver([b'1.0', b'\x01\x02', b'ID'], name='tracer')
+        with TraceRecorder(self.path, 1024) as recorder:
+            obj.trace = recorder
+            obj.raw_send(b'?FREQ\n')
+            obj.raw_recv(10)
+            buffer = array('B', bytes(8))
+            self.assertEqual(obj.raw_recv_into(buffer), 2)
+            obj.write('?IDN')
+            obj.read()
+            self.assertRaises(InstrumentError, obj.raw_recv, 10)
+
+        records = read_trace(self.path)
+        self.assertEqual([(r.kind, r.data, r.error) for r in records],
+                         [(WRITE, b'?FREQ\n', False), (READ, b'1.0', False),
+                          (READ_INTO, b'\x01\x02', False), (WRITE, '?IDN', False),
+                          (READ, 'ID', False), (READ, 'InstrumentError: timeout', True)])
+        self.assertEqual({r.name for r in records}, {'tracer'})
+        for previous, record in zip(records, records[1:]):
+            self.assertGreaterEqual(record.timestamp, previous.timestamp + previous.latency)
+
+    def test_ring(self):
+        with TraceRecorder(self.path, 256) as recorder:
+            for n in range(100):
+                recorder.record(WRITE, 'ring', bytes([n]) * (n % 13))
+
+        records = read_trace(self.path)
+        self.assertLess(len(records), 100)
+        self.assertEqual([r.data for r in records],
+                         [bytes([n]) * (n % 13) for n in range(100 - len(records), 100)])
+
+        with TraceRecorder(self.path, 64) as recorder:
+            recorder.record(READ, 'big', bytes(1000))
+        self.assertLessEqual(len(read_trace(self.path)[0].data), 64)
+
+    def test_replay(self):
+        obj = TracedDriver([b'1.0', b'\x01\x02', b'ID'], name='replayed')
+        with TraceRecorder(self.path) as recorder:
+            obj.trace = recorder
+            obj.raw_send(b'?FREQ\n')
+            obj.raw_recv(10)
+            obj.raw_recv_into(array('B', bytes(8)))
+            obj.write('?IDN')
+            obj.read()
+            self.assertRaises(InstrumentError, obj.raw_recv, 10)
+
+        other = TracedDriver(name='replayed')
+        other.trace = replayer = TraceReplayer(self.path)
+        self.assertEqual(replayer.remaining(), 6)
+        other.raw_send(b'?FREQ\n')
+        self.assertEqual(other.raw_recv(10), b'1.0')
+        buffer = array('B', bytes(8))
+        self.assertEqual(other.raw_recv_into(buffer), 2)
+        self.assertEqual(buffer[:2], array('B', [1, 2]))
+        other.write('?IDN')
+        self.assertEqual(other.read(), 'ID')
+        self.assertRaises(InstrumentError, other.raw_recv, 10)
+        self.assertEqual(replayer.remaining('replayed'), 0)
+        self.assertEqual(other.sent, [])
+
+        self.assertRaises(ReplayError, other.raw_recv, 10)
+
+        other.trace = TraceReplayer(self.path)
+        self.assertRaises(ReplayError, other.raw_send, b'?VOLT\n')
+        self.assertRaises(ReplayError, other.raw_send, b'?FREQ\n')
+
+    def test_replay_library(self):
+        obj = TracedLibraryDriver(name='library', library=FakeLibrary())
+        with TraceRecorder(self.path) as recorder:
+            obj.trace = recorder
+            self.assertEqual(obj.lib.add(1, 2), 3)
+            self.assertEqual(obj.lib.half(3, RetValue('d')), (0, 1.5))
+            self.assertEqual(obj.lib.name(*RetStr(8)), (0, 'fake'))
+
+        records = read_trace(self.path)
+        self.assertEqual([(r.kind, r.data) for r in records],
+                         [(CALL, 'add\n3'), (CALL, "half\n(0, 1.5)"), (CALL, "name\n(0, 'fake')")])
+
+        other = TracedLibraryDriver(name='library', library=UnpluggedLibrary())
+        other.trace = replayer = TraceReplayer(self.path)
+        self.assertEqual(other.lib.add(1, 2), 3)
+        self.assertEqual(other.lib.half(3, RetValue('d')), (0, 1.5))
+        self.assertEqual(other.lib.name(*RetStr(8)), (0, 'fake'))
+        self.assertEqual(replayer.remaining(), 0)
+
+        other.trace = TraceReplayer(self.path)
+        self.assertRaises(ReplayError, other.lib.half, 3, RetValue('d'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+import struct
+import threading
+import unittest
+from array import array
+from collections import deque
+from unittest import mock
+
+import numpy as np
+
+try:
+    import usb
+    from lantz.drivers.legacy.usb import USBDriver
+    from lantz.drivers.oceanoptics import usb4000
+    from lantz.drivers.oceanoptics.usb4000 import USB4000
+except ImportError:
+    usb = None
+
+from lantz.errors import InstrumentError
+
+
+class FakeSpectrometer(object):
+    """Stand-in for the USB4000 endpoints. Every requested spectrum has
+    all its pixels equal to the number of the request.
+    """
+
+    def __init__(self):
+        self.requested = 0
+        self.sync = 0x69
+        #: Number of spectra after which reads fail.
+        self.fail_after = None
+        #: Number of spectra after which reads wait for the gate.
+        self.block_after = None
+        self.gate = threading.Event()
+        self.blocked = threading.Event()
+        self.queues = {0x82: deque(), 0x86: deque()}
+
+    def command(self, data):
+        if data[0] != 0x09:
+            return len(data)
+        pixel = struct.pack('<H', self.requested)
+        self.requested += 1
+        self.queues[0x86].append(pixel * USB4000.PIXELS_LO)
+        self.queues[0x82].append(pixel * (USB4000.PIXELS - USB4000.PIXELS_LO))
+        self.queues[0x82].append(bytes([self.sync]))
+        return len(data)
+
+    def read(self, address, buffer):
+        if self.block_after is not None and self.requested > self.block_after:
+            self.blocked.set()
+            self.gate.wait()
+        if self.fail_after is not None and self.requested > self.fail_after:
+            raise usb.core.USBError('Operation timed out')
+        data = self.queues[address].popleft()
+        buffer[:len(data)] = array('B', data)
+        return len(data)
+
+
+class FakeEndpoint(object):
+
+    def __init__(self, address, device):
+        self.bEndpointAddress = address
+        self.device = device
+
+    def write(self, data):
+        return self.device.command(data)
+
+    def read(self, buffer, timeout=None):
+        return self.device.read(self.bEndpointAddress, buffer)
+
+
+@unittest.skipIf(usb is None, 'PyUSB is not installed')
+class USB4000Test(unittest.TestCase):
+
+    def setUp(self):
+        self.device = device = FakeSpectrometer()
+
+        def usb_init(drv, *args, **kwargs):
+            drv._recv_buffers = {}
+            drv.usb_intf = device
+            drv.usb_recv_ep = FakeEndpoint(0x81, device)
+            drv.usb_send_ep = FakeEndpoint(0x01, device)
+
+        for patcher in (mock.patch.object(USBDriver, '__init__', usb_init),
+                        mock.patch.object(usb4000, 'usb_find_desc',
+                                          lambda intf, bEndpointAddress: FakeEndpoint(bEndpointAddress, intf))):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.drv = USB4000()
+        self.addCleanup(self.drv.stop_acquisition)
+        self.addCleanup(device.gate.set)
+
+    def test_request_spectra(self):
+        self.device.requested = 7
+        out = np.zeros(USB4000.PIXELS, dtype='<u2')
+        self.assertIs(self.drv.request_spectra(out), out)
+        np.testing.assert_array_equal(out, 7)
+        np.testing.assert_array_equal(self.drv.request_spectra(), 8)
+
+    def test_not_synchronized(self):
+        self.device.sync = 0x00
+        self.assertRaises(InstrumentError, self.drv.request_spectra)
+
+    def test_usb_error(self):
+        self.device.fail_after = 0
+        self.assertRaises(InstrumentError, self.drv.request_spectra)
+
+    def test_acquisition_error(self):
+        self.device.fail_after = 2
+        self.drv.start_acquisition(4)
+        np.testing.assert_array_equal(self.drv.wait_spectrum(1, timeout=5), 1)
+        # The failed spectrum is not counted and the error reaches the waiters.
+        self.assertRaises(InstrumentError, self.drv.wait_spectrum, 2, timeout=5)
+        self.assertEqual(self.drv.acquired, 2)
+        np.testing.assert_array_equal(self.drv.wait_spectrum(0), 0)
+
+    def test_overwritten(self):
+        device = self.device
+        device.block_after = 3
+        self.drv.start_acquisition(2)
+        self.assertTrue(device.blocked.wait(5))
+        # Spectra 0 to 2 are acquired and the acquisition thread
+        # is filling the position of spectrum 1 with spectrum 3.
+        self.assertEqual(self.drv.acquired, 3)
+        self.assertRaises(IndexError, self.drv.wait_spectrum, 0)
+        self.assertRaises(IndexError, self.drv.wait_spectrum, 1)
+        np.testing.assert_array_equal(self.drv.wait_spectrum(2), 2)
+
+        out = np.zeros(USB4000.PIXELS, dtype='<u2')
+        self.assertIs(self.drv.wait_spectrum(2, out=out), out)
+        np.testing.assert_array_equal(out, 2)
+
+        device.fail_after = 4
+        device.gate.set()
+        np.testing.assert_array_equal(self.drv.wait_spectrum(3, timeout=5, out=out), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
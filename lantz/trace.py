@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+"""
+    lantz.trace
+    ~~~~~~~~~~~
+
+    Implements a low overhead recorder of the traffic between drivers and
+    instruments, and a replayer to run drivers against a recorded trace
+    without hardware.
+
+    Transport methods are decorated with `traced`, which calls the original
+    method when the driver `trace` attribute is None::
+
+        driver.trace = TraceRecorder('session.trace')
+        ...
+        records = read_trace('session.trace')
+
+        driver.trace = TraceReplayer('session.trace')
+
+    The trace file is a memory mapped ring: when it is full, the oldest
+    records are overwritten.
+
+    :copyright: 2015 by Lantz Authors, see AUTHORS for more details.
+    :license: BSD, see LICENSE for more details.
+"""
+
+import ast
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import defaultdict, deque, namedtuple
+from functools import wraps
+
+from .errors import InstrumentError
+
+#: Kinds of records.
+WRITE, READ, READ_INTO, CALL = 0, 1, 2, 3
+
+#: Flags combined with the kind.
+TEXT, ERROR = 0x40, 0x80
+
+_KIND_MASK = 0x3F
+
+#: File header: magic, version, capacity, head, tail, records.
+_HEADER = struct.Struct('<4sIQQQQ')
+_MAGIC = b'LZTR'
+_VERSION = 1
+
+#: Record header: data length, timestamp (ns), latency (ns), kind, name length.
+_RECORD = struct.Struct('<IqqBB')
+
+#: Data length marking that the next record is at the beginning of the ring.
+_WRAP = 0xFFFFFFFF
+
+#: A record of the trace.
+#: data is a str for text messages.
+TraceRecord = namedtuple('TraceRecord', 'timestamp latency kind name data error')
+
+
+def traced(kind):
+    """Decorator for transport methods of a driver.
+
+    The data of WRITE methods is the first argument, the data of READ
+    methods is the return value and READ_INTO methods fill the buffer
+    given as first argument and return the number of bytes received.
+    CALL methods take a function name as first argument and the data is
+    the name followed by a line with the repr of the return value.
+
+    When the driver `trace` is not None, the call is delegated to it.
+    """
+
+    def decorator(func):
+
+        @wraps(func)
+        def _inner(self, *args, **kwargs):
+            trace = self.trace
+            if trace is None:
+                return func(self, *args, **kwargs)
+            return trace.call(kind, self, func, args, kwargs)
+
+        return _inner
+
+    return decorator
+
+
+def _to_bytes(data):
+    """Return the bytes and the kind flags of the data of a record.
+    """
+    if isinstance(data, str):
+        return data.encode('utf-8'), TEXT
+    if data is None:
+        return b'', 0
+    return data, 0
+
+
+class TraceRecorder(object):
+    """Records the traffic of drivers in a memory mapped ring file.
+
+    Assign it to the `trace` attribute of a driver (or of a driver class).
+
+    :param path: file in which the trace is stored.
+    :param size: capacity of the ring in bytes.
+    """
+
+    def __init__(self, path, size=1 << 24):
+        self.path = path
+        self.capacity = size
+        self._lock = threading.Lock()
+
+        with open(path, 'wb') as fp:
+            fp.truncate(_HEADER.size + size)
+
+        self._file = open(path, 'r+b')
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        self.head = self.tail = self.records = 0
+        self._write_header()
+
+    def _write_header(self):
+        _HEADER.pack_into(self._map, 0, _MAGIC, _VERSION, self.capacity,
+                          self.head, self.tail, self.records)
+
+    def close(self):
+        """Flush and close the trace file.
+        """
+        with self._lock:
+            if self._map.closed:
+                return
+            self._map.flush()
+            self._map.close()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def call(self, kind, driver, func, args, kwargs):
+        timestamp = time.time_ns()
+        tic = time.perf_counter_ns()
+        try:
+            ret = func(driver, *args, **kwargs)
+        except Exception as e:
+            self.record(kind | ERROR, driver.name, '{}: {}'.format(type(e).__name__, e),
+                        timestamp, time.perf_counter_ns() - tic)
+            raise
+        latency = time.perf_counter_ns() - tic
+
+        if kind == READ:
+            data = ret
+        elif kind == READ_INTO:
+            data = memoryview(args[0]).cast('B')[:ret]
+        elif kind == CALL:
+            data = '{}\n{!r}'.format(args[0], ret)
+        else:
+            data = args[0]
+
+        self.record(kind, driver.name, data, timestamp, latency)
+        return ret
+
+    def record(self, kind, name, data, timestamp=None, latency=0):
+        """Add a record to the trace.
+
+        :param kind: WRITE, READ, READ_INTO or CALL, optionally combined with ERROR.
+        :param name: name of the driver.
+        :param data: bytes-like object or str.
+        :param timestamp: time in nanoseconds since the epoch (now by default).
+        :param latency: duration of the operation in nanoseconds.
+        """
+        if timestamp is None:
+            timestamp = time.time_ns()
+        data, flags = _to_bytes(data)
+        name = name.encode('utf-8')[:255]
+
+        header_size = _RECORD.size + len(name)
+        size = len(data)
+        if header_size + size > self.capacity:
+            size = self.capacity - header_size
+        total = header_size + size
+
+        with self._lock:
+            mm = self._map
+            position = self.head
+            if self.capacity - position < total:
+                # Records between the head and the end of the ring are dropped
+                # and the next record starts at the beginning.
+                self._free(position, self.capacity)
+                if self.capacity - position >= 4:
+                    struct.pack_into('<I', mm, _HEADER.size + position, _WRAP)
+                position = 0
+            self._free(position, position + total)
+
+            offset = _HEADER.size + position
+            _RECORD.pack_into(mm, offset, size, timestamp, latency, kind | flags, len(name))
+            offset += _RECORD.size
+            mm[offset:offset + len(name)] = name
+            offset += len(name)
+            mm[offset:offset + size] = data[:size]
+
+            if not self.records:
+                self.tail = position
+            self.records += 1
+            self.head = position + total
+            self._write_header()
+
+    def _free(self, start, stop):
+        """Drop the oldest records while they are in the region [start, stop) of the ring.
+        """
+        while self.records and start <= self.tail < stop:
+            self.tail = _next_record(self._map, self.capacity, self.tail)
+            self.records -= 1
+
+
+def _record_position(mm, capacity, position):
+    """Return the position of the record at or after position,
+    following the wrapping rules of the ring.
+    """
+    if capacity - position < _RECORD.size:
+        return 0
+    if struct.unpack_from('<I', mm, _HEADER.size + position)[0] == _WRAP:
+        return 0
+    return position
+
+
+def _next_record(mm, capacity, position):
+    """Return the position of the record after the record at position.
+    """
+    size, _, _, _, name_size = _RECORD.unpack_from(mm, _HEADER.size + position)
+    return _record_position(mm, capacity, position + _RECORD.size + name_size + size)
+
+
+def read_trace(path):
+    """Read the records of a trace file, from the oldest to the newest.
+
+    :rtype: list[TraceRecord]
+    """
+    with open(path, 'rb') as fp:
+        mm = fp.read()
+
+    magic, version, capacity, head, tail, records = _HEADER.unpack_from(mm, 0)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError('{} is not a Lantz trace file'.format(path))
+
+    out = []
+    position = tail
+    for _ in range(records):
+        size, timestamp, latency, kind, name_size = _RECORD.unpack_from(mm, _HEADER.size + position)
+        offset = _HEADER.size + position + _RECORD.size
+        name = mm[offset:offset + name_size].decode('utf-8')
+        data = mm[offset + name_size:offset + name_size + size]
+        if kind & (TEXT | ERROR):
+            data = data.decode('utf-8')
+        out.append(TraceRecord(timestamp, latency, kind & _KIND_MASK, name, data, bool(kind & ERROR)))
+        position = _next_record(mm, capacity, position)
+
+    return out
+
+
+class ReplayError(AssertionError):
+    """Raised when a driver does not behave as in the replayed trace.
+    """
+
+
+class TraceReplayer(object):
+    """Replays a trace to a driver: written data is compared to the
+    recorded one and read operations return the recorded data.
+
+    Records are consumed in order for each driver name,
+    so one replayer can be shared by several drivers.
+
+    :param trace: trace file or list of TraceRecord.
+    :param realtime: if True, each operation takes as long as it was recorded.
+    :param check_writes: if True, raise ReplayError if the written data
+                         differs from the recorded one.
+    """
+
+    def __init__(self, trace, realtime=False, check_writes=True):
+        if isinstance(trace, (str, bytes, os.PathLike)):
+            trace = read_trace(trace)
+
+        self.realtime = realtime
+        self.check_writes = check_writes
+
+        #: Records not yet replayed, by driver name.
+        #: :type: dict[str, deque[TraceRecord]]
+        self.pending = defaultdict(deque)
+        for record in trace:
+            self.pending[record.name].append(record)
+
+    def remaining(self, name=None):
+        """Return the number of records not yet replayed
+        (for a given driver name or in total).
+        """
+        if name is not None:
+            return len(self.pending[name])
+        return sum(len(records) for records in self.pending.values())
+
+    def call(self, kind, driver, func, args, kwargs):
+        try:
+            record = self.pending[driver.name].popleft()
+        except IndexError:
+            raise ReplayError('No more records for {}'.format(driver.name))
+
+        if record.kind != kind:
+            raise ReplayError('Expected kind {}, got {} in {}'.format(record.kind, kind, record))
+
+        if self.realtime:
+            time.sleep(record.latency / 1e9)
+
+        if record.error:
+            raise InstrumentError('Replayed {}'.format(record.data))
+
+        if kind == READ:
+            return record.data
+        elif kind == READ_INTO:
+            buffer = memoryview(args[0]).cast('B')
+            size = len(record.data)
+            buffer[:size] = record.data
+            return size
+        elif kind == CALL:
+            return _replay_call(record, args[0])
+
+        if self.check_writes:
+            data = args[0]
+            if not isinstance(data, str):
+                data = bytes(_to_bytes(data)[0])
+            if data != record.data:
+                raise ReplayError('{} wrote {!r}, expected {!r}'.format(driver.name, data, record.data))
+
+        return len(record.data)
+
+
+def _replay_call(record, name):
+    """Return the recorded result of a foreign call.
+
+    The results of the foreign functions, including the values of the
+    RetValue, RetStr and RetTuple outputs, are replayed. Memory written
+    through pointers given by the caller is not.
+    """
+    recorded, _, value = record.data.partition('\n')
+    if recorded != name:
+        raise ReplayError('Called {}, expected {}'.format(name, recorded))
+    try:
+        return ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        raise ReplayError('The result of {} cannot be replayed: {}'.format(name, value))